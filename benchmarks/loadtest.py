@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Load test of the running M-ERP services.
+
+Runs scripted scenarios against the services started with
+benchmarks/docker-compose.benchmark.yml and seeded by benchmarks/seed_data.py,
+then writes throughput and latency percentiles per scenario to a JSON report.
+Given a baseline report, it exits with status 1 when a scenario regressed
+beyond the thresholds, so CI can compare runs.
+
+Scenarios:
+    login_storm         POST /api/auth/login as many distinct users
+    token_validation    authenticated company-partner-service requests; each one
+                        is validated by user-auth-service (AuthClient fan-out)
+    partner_search      partner list pages and name searches over the seeded partners
+    registry_heartbeat  heartbeats from many registered service instances
+
+Every scenario runs closed-loop: --concurrency workers send requests back to
+back for --duration seconds after --warmup seconds that are not recorded.
+
+Usage:
+    python benchmarks/loadtest.py [--scenarios login_storm,partner_search]
+        [--duration S] [--warmup S] [--concurrency N] [--output report.json]
+        [--baseline previous.json] [--max-throughput-drop 0.10]
+        [--max-latency-increase 0.20]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from seed_data import COMPANY_CODE_PREFIX, PASSWORD, USER_EMAIL
+
+PERCENTILES = (50, 95, 99)
+# Compared against the baseline
+LATENCY_KEYS = ("p95_ms", "p99_ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma separated scenarios (default: all)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Recorded seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unrecorded seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the request mix")
+    parser.add_argument("--users", type=int, default=10000, help="Seeded users to log in as")
+    parser.add_argument("--token-users", type=int, default=100, help="Distinct tokens for token_validation")
+    parser.add_argument("--instances", type=int, default=500, help="Registered instances for registry_heartbeat")
+    parser.add_argument("--auth-url", default="http://localhost:8001")
+    parser.add_argument("--company-url", default="http://localhost:8002")
+    parser.add_argument("--registry-url", default="http://localhost:8004")
+    parser.add_argument("--output", default="loadtest-report.json")
+    parser.add_argument("--baseline", default=None, help="Report of a previous run to compare against")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.10,
+                        help="Allowed relative drop of requests/s against the baseline")
+    parser.add_argument("--max-latency-increase", type=float, default=0.20,
+                        help="Allowed relative increase of p95/p99 against the baseline")
+    return parser.parse_args()
+
+
+class Scenario:
+    """A request mix; ``request`` is called back to back by every worker."""
+
+    name = ""
+    expected_status = (200,)
+
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+
+    async def setup(self, client: httpx.AsyncClient) -> None:
+        pass
+
+    async def request(self, client: httpx.AsyncClient) -> httpx.Response:
+        raise NotImplementedError
+
+    async def teardown(self, client: httpx.AsyncClient) -> None:
+        pass
+
+    async def login(self, client: httpx.AsyncClient, user: int) -> str:
+        response = await client.post(
+            f"{self.args.auth_url}/api/auth/login",
+            json={"email": USER_EMAIL.format(user), "password": PASSWORD},
+        )
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+
+class LoginStorm(Scenario):
+    name = "login_storm"
+
+    async def request(self, client):
+        return await client.post(
+            f"{self.args.auth_url}/api/auth/login",
+            json={"email": USER_EMAIL.format(self.rng.randrange(self.args.users)), "password": PASSWORD},
+        )
+
+
+class TokenValidation(Scenario):
+    name = "token_validation"
+
+    async def setup(self, client):
+        users = self.rng.sample(range(self.args.users), min(self.args.token_users, self.args.users))
+        self.tokens = [await self.login(client, user) for user in users]
+
+    async def request(self, client):
+        return await client.get(
+            f"{self.args.company_url}/api/v1/companies/",
+            params={"limit": 10},
+            headers={"Authorization": f"Bearer {self.rng.choice(self.tokens)}"},
+        )
+
+
+class PartnerSearch(Scenario):
+    name = "partner_search"
+
+    async def setup(self, client):
+        self.headers = {"Authorization": f"Bearer {await self.login(client, 0)}"}
+        response = await client.get(
+            f"{self.args.company_url}/api/v1/companies/", params={"limit": 1000}, headers=self.headers
+        )
+        response.raise_for_status()
+        self.company_ids = [
+            company["id"] for company in response.json()["companies"]
+            if company["code"].startswith(COMPANY_CODE_PREFIX)
+        ]
+        if not self.company_ids:
+            raise RuntimeError("No seeded companies found; run benchmarks/seed_data.py first")
+
+    async def request(self, client):
+        params = {"company_id": self.rng.choice(self.company_ids), "limit": 50}
+        if self.rng.random() < 0.5:
+            # Page through a company's partners
+            params["skip"] = self.rng.randrange(0, 5000, 50)
+        else:
+            # Name search ("Partner 1234" matches the seeded names)
+            params["search"] = f"Partner {self.rng.randrange(1, 100000)}"
+        return await client.get(f"{self.args.company_url}/api/v1/partners/", params=params, headers=self.headers)
+
+
+class RegistryHeartbeat(Scenario):
+    name = "registry_heartbeat"
+
+    async def setup(self, client):
+        self.instance_ids = []
+        for i in range(self.args.instances):
+            response = await client.post(
+                f"{self.args.registry_url}/api/v1/services/register",
+                json={"name": "loadtest-service", "host": f"loadtest-{i}", "port": 8000, "tags": ["loadtest"]},
+            )
+            response.raise_for_status()
+            self.instance_ids.append(response.json()["id"])
+
+    async def request(self, client):
+        return await client.post(
+            f"{self.args.registry_url}/api/v1/services/heartbeat",
+            json={"service_id": self.rng.choice(self.instance_ids), "status": "healthy"},
+        )
+
+    async def teardown(self, client):
+        for instance_id in self.instance_ids:
+            await client.delete(f"{self.args.registry_url}/api/v1/services/{instance_id}")
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (LoginStorm, TokenValidation, PartnerSearch, RegistryHeartbeat)}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> dict:
+    latencies.sort()
+    requests = len(latencies)
+    summary = {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / requests * 1000, 3) if requests else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 3)
+    summary["max_ms"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    summary["statuses"] = dict(sorted(statuses.items()))
+    return summary
+
+
+async def run_scenario(scenario: Scenario, client: httpx.AsyncClient, args) -> dict:
+    await scenario.setup(client)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    started = time.perf_counter()
+    record_from = started + args.warmup
+    stop_at = record_from + args.duration
+
+    async def worker():
+        nonlocal errors
+        while True:
+            begin = time.perf_counter()
+            if begin >= stop_at:
+                return
+            try:
+                response = await scenario.request(client)
+                status = str(response.status_code)
+                failed = response.status_code not in scenario.expected_status
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+                failed = True
+            end = time.perf_counter()
+            if begin >= record_from:
+                latencies.append(end - begin)
+                statuses[status] = statuses.get(status, 0) + 1
+                errors += failed
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        await scenario.teardown(client)
+    elapsed = min(time.perf_counter(), stop_at) - record_from
+    return summarize(latencies, statuses, errors, elapsed)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, args) -> List[str]:
+    """Regressions of ``report`` against ``baseline`` beyond the thresholds."""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["throughput_rps"] and (
+            current["throughput_rps"] < previous["throughput_rps"] * (1 - args.max_throughput_drop)
+        ):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} rps < baseline {previous['throughput_rps']} rps"
+            )
+        for key in LATENCY_KEYS:
+            if previous[key] and current[key] > previous[key] * (1 + args.max_latency_increase):
+                regressions.append(f"{name}: {key} {current[key]} > baseline {previous[key]}")
+        if current["error_rate"] > previous["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']} > baseline {previous['error_rate']}")
+    return regressions
+
+
+async def main():
+    args = parse_args()
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(SCENARIOS)})")
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "parameters": {
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        for name in names:
+            scenario = SCENARIOS[name](args, random.Random(args.seed))
+            result = await run_scenario(scenario, client, args)
+            report["scenarios"][name] = result
+            print(
+                f"  {name:<20} {result['throughput_rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+                f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+            )
+
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,8 +1,15 @@
-from sqlalchemy import create_engine
+from functools import partial
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.core.config import settings
+from app.core.database_routing import DatabaseRouter
+from app.core.metrics import instrument_engine
+from app.core.tracing import trace_engine
 
 # Create async engine for database operations
 async_engine = create_async_engine(
@@ -13,6 +20,36 @@ async_engine = create_async_engine(
   pool_recycle=300,
 )
 
+# Read replica engines, empty when no replicas are configured
+replica_engines = [
+  create_async_engine(
+    url,
+    echo=settings.debug,
+    future=True,
+    pool_pre_ping=True,
+    pool_recycle=300,
+  )
+  for url in settings.database_replica_urls
+]
+
+# Query count and duration metrics, query spans
+for instrumented_engine in [async_engine, *replica_engines]:
+  instrument_engine(instrumented_engine)
+  trace_engine(instrumented_engine)
+
+# Router deciding which engine serves read-only sessions
+db_router = DatabaseRouter(
+  async_engine,
+  replica_engines,
+  max_lag_seconds=settings.replica_max_lag_seconds,
+  lag_check_interval=settings.replica_lag_check_interval,
+  sticky_seconds=settings.read_your_writes_seconds,
+  pin_secret=settings.service_key,
+)
+
+# Cookie carrying the signed read-your-writes pin back to the service
+READ_PIN_COOKIE = "partner_read_pin"
+
 # Create async session factory
 async_session_factory = sessionmaker(
   bind=async_engine,
@@ -22,16 +59,77 @@ async_session_factory = sessionmaker(
   autocommit=False,
 )
 
+# Session factory for read-only dependencies: no autoflush, never committed
+async_read_session_factory = sessionmaker(
+  bind=async_engine,
+  class_=AsyncSession,
+  expire_on_commit=False,
+  autoflush=False,
+  autocommit=False,
+  info={"read_only": True},
+)
+
+# Begin read sessions as READ ONLY transactions; PostgreSQL drivers fold
+# this into the BEGIN statement, other dialects ignore the option
+READ_ONLY_EXECUTION_OPTIONS = {"postgresql_readonly": True}
+
+# Read-only views of each engine, sharing its pool and instrumentation.
+# The option is applied when a connection is checked out, so a read
+# session only touches the pool once it runs its first query.
+read_only_engines = {
+  engine: engine.execution_options(**READ_ONLY_EXECUTION_OPTIONS)
+  for engine in [async_engine, *replica_engines]
+}
+
 # Base class for all models
 Base = declarative_base()
 
 
-async def get_db() -> AsyncSession:
+@event.listens_for(Session, "after_flush")
+def _pin_writer_to_primary(session, flush_context):
+  """
+  Hand the client that wrote a pin to the primary, for read-your-writes
+  stickiness. Set on the first flush, since the response may be sent
+  before get_db commits.
+  """
+  response = session.info.pop("response", None)
+  pin = db_router.pin_token()
+  if response is not None and pin:
+    response.set_cookie(
+      READ_PIN_COOKIE,
+      pin,
+      max_age=max(int(settings.read_your_writes_seconds), 1),
+      httponly=True,
+      samesite="lax",
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_read_only_writes(session, flush_context, instances):
+  """Fail fast when an endpoint tries to write through a read-only session."""
+  if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+    raise InvalidRequestError("Read-only session cannot persist changes, use get_db instead")
+
+
+def _take_replica_out_of_rotation(replica_engine, context):
+  """Route reads to the primary once a replica refuses connections."""
+  if context.connection is None:
+    db_router.mark_failed(replica_engine)
+
+
+for replica_engine in replica_engines:
+  event.listen(replica_engine.sync_engine, "handle_error", partial(_take_replica_out_of_rotation, replica_engine))
+
+
+async def get_db(response: Response = None) -> AsyncSession:
   """
   Dependency function to get database session.
   Yields an async database session and ensures it's closed after use.
+  Sessions are bound to the primary; a write pins the client to the
+  primary for subsequent reads (READ_PIN_COOKIE).
   """
   async with async_session_factory() as session:
+    session.info["response"] = response
     try:
       yield session
       await session.commit()
@@ -42,6 +140,28 @@ async def get_db() -> AsyncSession:
       await session.close()
 
 
+async def get_read_db(request: Request = None) -> AsyncSession:
+  """
+  Dependency function to get a session for read-only endpoints.
+  The session is bound to a healthy, caught-up read replica when one is
+  configured, otherwise to the primary. It runs in a READ ONLY
+  transaction, never autoflushes and is closed without a commit; no
+  connection is taken until the first query.
+  """
+  engine = await db_router.read_engine(request.cookies.get(READ_PIN_COOKIE) if request else None)
+  async with async_read_session_factory(bind=read_only_engines[engine]) as session:
+    yield session
+
+
+async def get_primary_read_db() -> AsyncSession:
+  """
+  Dependency function to get a read-only session on the primary, for
+  reads that must never observe replication lag.
+  """
+  async with async_read_session_factory(bind=read_only_engines[async_engine]) as session:
+    yield session
+
+
 async def init_db():
   """
   Initialize database by creating all tables.
@@ -56,4 +176,5 @@ async def close_db():
   Close database connections.
   This should be called during application shutdown.
   """
+  await db_router.dispose()
   await async_engine.dispose()
\ No newline at end of file
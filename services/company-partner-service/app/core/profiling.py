@@ -0,0 +1,262 @@
+"""
+Opt-in request profiling shared by the M-ERP services.
+
+The same module lives in user-auth-service and company-partner-service under
+app/core/profiling.py (keep the copies in sync). Nothing is installed unless
+PROFILING_SECRET is set, so disabled profiling costs nothing. Once enabled:
+
+- sampling: a fraction (PROFILING_SAMPLE_RATE) of requests turn on a stack
+  sampler that records the event loop thread's stack every few milliseconds;
+  the samples are served in folded format ("root;...;leaf count" lines) that
+  flamegraph.pl, speedscope and inferno read directly
+- per request: a request carrying a valid ``X-Profile-Token`` header (minted
+  by an admin, signed with PROFILING_SECRET) gets a ``Server-Timing`` response
+  header splitting its time into database, Redis, outgoing HTTP, bcrypt,
+  response serialization and the remaining application time
+
+Timings come from the request stats of app.core.metrics, so the profiling
+middleware has to run inside MetricsMiddleware.
+"""
+
+import hashlib
+import hmac
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import current_request_stats, record_timing
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+_PROFILE_TOKEN_HEADER = PROFILE_TOKEN_HEADER.lower().encode("latin-1")
+TRUNCATED_STACK = "[truncated]"
+
+
+def create_profile_token(secret: str, ttl_seconds: int) -> str:
+  """Signed profiling token valid for ``ttl_seconds``: ``<expires>.<signature>``."""
+  expires = str(int(time.time()) + ttl_seconds)
+  signature = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+  return f"{expires}.{signature}"
+
+
+def verify_profile_token(secret: str, token: str) -> bool:
+  """Whether ``token`` was signed with ``secret`` and has not expired."""
+  expires, _, signature = token.partition(".")
+  if not expires.isdigit() or int(expires) < time.time():
+    return False
+  expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+  return hmac.compare_digest(expected, signature)
+
+
+class StackSampler:
+  """
+  Samples the stack of the event loop thread while sampled requests run.
+
+  A daemon thread wakes every ``interval`` seconds while at least one sampled
+  request is in flight and counts the folded stack it finds. Requests share
+  the loop thread, so a sample shows whatever the loop was running at that
+  moment. Distinct stacks are capped at ``max_stacks``; further new stacks
+  are counted under ``[truncated]``.
+  """
+
+  def __init__(self, interval: float = 0.005, max_depth: int = 64, max_stacks: int = 10000):
+    self.interval = interval
+    self.max_depth = max_depth
+    self.max_stacks = max_stacks
+    self.samples = 0
+    self._counts: Dict[str, int] = {}
+    self._labels: Dict[object, str] = {}
+    self._lock = threading.Lock()
+    self._active = 0
+    self._running = threading.Event()
+    self._stopped = False
+    self._target: Optional[int] = None
+    self._thread: Optional[threading.Thread] = None
+
+  def begin(self) -> None:
+    """Start sampling for a request; called on the event loop thread."""
+    self._target = threading.get_ident()
+    self._active += 1
+    if self._thread is None:
+      self._stopped = False
+      self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+      self._thread.start()
+    self._running.set()
+
+  def end(self) -> None:
+    self._active -= 1
+    if self._active <= 0:
+      self._active = 0
+      self._running.clear()
+
+  def _label(self, frame) -> str:
+    code = frame.f_code
+    label = self._labels.get(code)
+    if label is None:
+      label = self._labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+    return label
+
+  def _run(self) -> None:
+    while not self._stopped:
+      self._running.wait()
+      if self._stopped:
+        break
+      frame = sys._current_frames().get(self._target)
+      if frame is not None:
+        self._record(frame)
+      time.sleep(self.interval)
+
+  def _record(self, frame) -> None:
+    labels = []
+    while frame is not None and len(labels) < self.max_depth:
+      labels.append(self._label(frame))
+      frame = frame.f_back
+    labels.reverse()
+    stack = ";".join(labels)
+    with self._lock:
+      self.samples += 1
+      if stack not in self._counts and len(self._counts) >= self.max_stacks:
+        stack = TRUNCATED_STACK
+      self._counts[stack] = self._counts.get(stack, 0) + 1
+
+  def folded(self, reset: bool = False) -> str:
+    """Collected samples in folded format, most frequent stacks first."""
+    with self._lock:
+      counts = self._counts
+      if reset:
+        self._counts = {}
+        self.samples = 0
+    ordered = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return "".join(f"{stack} {count}\n" for stack, count in ordered)
+
+  def stop(self) -> None:
+    self._stopped = True
+    self._running.set()
+    if self._thread is not None:
+      self._thread.join(timeout=1)
+      self._thread = None
+
+
+stack_sampler = StackSampler()
+
+
+def _server_timing(stats, total: float) -> bytes:
+  timings = stats.timings
+  parts = [
+    ("db", stats.db_seconds, f"{stats.db_queries} queries"),
+    ("redis", stats.redis_seconds, None),
+    ("http", stats.http_seconds, None),
+    ("bcrypt", timings.get("bcrypt", 0.0), None),
+    ("serialize", timings.get("serialize", 0.0), None),
+  ]
+  app = total - sum(seconds for _, seconds, _ in parts)
+  parts.append(("app", max(app, 0.0), None))
+  parts.append(("total", total, None))
+  return ", ".join(
+    f'{name};dur={seconds * 1000:.3f}' + (f';desc="{desc}"' if desc else "")
+    for name, seconds, desc in parts
+  ).encode("latin-1")
+
+
+class ProfilingMiddleware:
+  """
+  Pure ASGI middleware sampling requests and answering profiled ones with
+  a ``Server-Timing`` breakdown (measured until the response headers).
+  """
+
+  def __init__(self, app: ASGIApp, secret: str, sample_rate: float = 0.0, sampler: Optional[StackSampler] = None):
+    self.app = app
+    self.secret = secret
+    self.sample_rate = sample_rate
+    self.sampler = sampler or stack_sampler
+    instrument_serialization()
+
+  def _profiled_stats(self, scope: Scope):
+    for name, value in scope["headers"]:
+      if name == _PROFILE_TOKEN_HEADER:
+        if verify_profile_token(self.secret, value.decode("latin-1")):
+          return current_request_stats()
+        return None
+    return None
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    stats = self._profiled_stats(scope)
+    sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+    if stats is None and not sampled:
+      await self.app(scope, receive, send)
+      return
+
+    app_send = send
+    if stats is not None:
+      stats.timings = {}
+      started = time.perf_counter()
+
+      async def send_with_timing(message: Message) -> None:
+        if message["type"] == "http.response.start":
+          total = time.perf_counter() - started
+          message["headers"] = [*message.get("headers", ()), (b"server-timing", _server_timing(stats, total))]
+        await send(message)
+
+      app_send = send_with_timing
+
+    if sampled:
+      self.sampler.begin()
+    try:
+      await self.app(scope, receive, app_send)
+    finally:
+      if sampled:
+        self.sampler.end()
+
+
+def instrument_serialization() -> None:
+  """Record the time FastAPI spends validating and encoding responses."""
+  from fastapi import routing
+
+  serialize_response = routing.serialize_response
+  if getattr(serialize_response, "profiled", False):
+    return
+
+  async def timed_serialize_response(*args, **kwargs):
+    started = time.perf_counter()
+    try:
+      return await serialize_response(*args, **kwargs)
+    finally:
+      record_timing("serialize", time.perf_counter() - started)
+
+  timed_serialize_response.profiled = True
+  routing.serialize_response = timed_serialize_response
+
+
+def install_profiling(
+  application,
+  secret: str,
+  sample_rate: float = 0.0,
+  sample_interval: float = 0.005,
+  samples_path: Optional[str] = None
+) -> None:
+  """
+  Add the profiling middleware to ``application`` (before MetricsMiddleware,
+  so it runs inside it). With ``samples_path``, also serve the folded stack
+  samples there to requests carrying a valid profiling token; samples are
+  per process, so each response holds only the serving worker's samples.
+  """
+  stack_sampler.interval = sample_interval
+  application.add_middleware(ProfilingMiddleware, secret=secret, sample_rate=sample_rate)
+
+  if samples_path:
+    async def profiling_samples(request: Request, reset: bool = False) -> Response:
+      token = request.headers.get(PROFILE_TOKEN_HEADER, "")
+      if not verify_profile_token(secret, token):
+        return PlainTextResponse("Invalid or missing profiling token", status_code=403)
+      return PlainTextResponse(stack_sampler.folded(reset=reset))
+
+    application.add_api_route(samples_path, profiling_samples, include_in_schema=False)
@@ -7,6 +7,9 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.database import close_db, get_db
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.core.profiling import install_profiling, stack_sampler
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 from app.middleware.auth import auth_client
 
 # Configure logging
@@ -22,12 +25,21 @@ async def lifespan(app: FastAPI):
   # Startup
   logger.info("Starting up Company & Partner Management Service...")
   logger.info("Database migrations handled by startup script")
+  # Export spans from this worker
+  configure_tracing(
+    "company-partner-service",
+    settings.tracing_exporter,
+    sample_rate=settings.tracing_sample_rate,
+    file_path=settings.tracing_file,
+  )
   yield
   # Shutdown
   logger.info("Shutting down Company & Partner Management Service...")
+  stack_sampler.stop()
   await close_db()
   await auth_client.close()
   logger.info("Database connections and auth client closed")
+  shutdown_tracing()
 
 
 def create_application() -> FastAPI:
@@ -48,6 +60,23 @@ def create_application() -> FastAPI:
     allow_headers=["*"],
   )
   
+  # Opt-in profiling (runs inside the metrics middleware, whose request stats it reads)
+  if settings.profiling_secret:
+    install_profiling(
+      application,
+      settings.profiling_secret,
+      sample_rate=settings.profiling_sample_rate,
+      sample_interval=settings.profiling_sample_interval_ms / 1000,
+      samples_path="/profiling/samples",
+    )
+  
+  # Request metrics (the time includes the middleware added before)
+  application.add_middleware(MetricsMiddleware)
+  application.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+  
+  # Request spans continuing the caller's trace (outermost)
+  application.add_middleware(TracingMiddleware)
+  
   # Include API routers
   from app.routers import companies, partners
   application.include_router(companies.router, prefix="/api/v1")
@@ -9,6 +9,8 @@ from fastapi import HTTPException, status, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
+from app.core.metrics import instrument_http_client
+from app.core.tracing import trace_http_client
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
@@ -20,7 +22,7 @@ class AuthClient:
     def __init__(self):
         self.auth_service_url = settings.auth_service_url
         self.service_token = None
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = instrument_http_client(trace_http_client(httpx.AsyncClient(timeout=30.0)))
     
     async def validate_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Validate a JWT token with the auth service."""
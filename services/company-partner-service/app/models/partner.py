@@ -2,7 +2,7 @@
 Partner model for business partner management (customers, suppliers, vendors).
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, Text, CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, Text, CheckConstraint, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from app.models.base import CompanyBaseModel
@@ -69,6 +69,8 @@ class Partner(CompanyBaseModel):
         ),
         # Partner name cannot be empty
         CheckConstraint("LENGTH(name) >= 1", name="partners_name_check"),
+        # Covers the recursive step of hierarchy CTEs (children of a parent)
+        Index("ix_partners_parent_partner_id_id", "parent_partner_id", "id"),
         {'extend_existing': True}
     )
     
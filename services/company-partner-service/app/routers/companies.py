@@ -7,7 +7,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.middleware.auth import get_current_user, get_current_active_user
 from app.services.company_service import CompanyService
 from app.schemas.company import (
@@ -47,7 +47,7 @@ async def list_companies(
     limit: int = Query(100, ge=1, le=1000, description="Number of records to return"), 
     search: Optional[str] = Query(None, description="Search term for company name, legal name, or code"),
     active_only: bool = Query(False, description="Return only active companies"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -78,7 +78,7 @@ async def list_companies(
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(
     company_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -96,7 +96,7 @@ async def get_company(
 @router.get("/code/{code}", response_model=CompanyResponse)
 async def get_company_by_code(
     code: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
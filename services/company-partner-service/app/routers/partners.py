@@ -7,19 +7,32 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.middleware.auth import get_current_active_user, verify_company_access
 from app.services.partner_service import PartnerService
+from app.services.partner_hierarchy_service import PartnerHierarchyService
 from app.schemas.partner import (
     PartnerCreate,
     PartnerUpdate,
     PartnerResponse,
-    PartnerListResponse
+    PartnerListResponse,
+    PartnerHierarchyNode,
+    PartnerHierarchyResponse,
+    PartnerRollupResponse
 )
 
 router = APIRouter(prefix="/partners", tags=["partners"])
 
 
+def _to_hierarchy_response(partner_id: int, rows) -> PartnerHierarchyResponse:
+    """Convert (partner, depth) rows into a hierarchy response."""
+    nodes = [
+        PartnerHierarchyNode(**PartnerResponse.model_validate(partner).model_dump(), depth=depth)
+        for partner, depth in rows
+    ]
+    return PartnerHierarchyResponse(partner_id=partner_id, nodes=nodes, total=len(nodes))
+
+
 @router.post("/", response_model=PartnerResponse, status_code=status.HTTP_201_CREATED)
 async def create_partner(
     partner_data: PartnerCreate,
@@ -52,7 +65,7 @@ async def list_partners(
     search: Optional[str] = Query(None, description="Search term for partner name, code, or email"),
     partner_type: Optional[str] = Query(None, description="Filter by partner type (customer, supplier, vendor)"),
     active_only: bool = Query(True, description="Return only active partners"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -92,7 +105,7 @@ async def get_partners_by_company(
     company_id: int = Path(..., description="Company ID"),
     partner_type: Optional[str] = Query(None, description="Filter by partner type (customer, supplier, vendor)"),
     active_only: bool = Query(True, description="Return only active partners"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -115,7 +128,7 @@ async def get_partners_by_company(
 async def get_partner(
     partner_id: int,
     company_id: Optional[int] = Query(None, description="Company ID for access verification"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -136,11 +149,89 @@ async def get_partner(
     return partner
 
 
+@router.get("/{partner_id}/descendants", response_model=PartnerHierarchyResponse)
+async def get_partner_descendants(
+    partner_id: int,
+    company_id: Optional[int] = Query(None, description="Company ID for access verification"),
+    max_depth: Optional[int] = Query(None, ge=1, description="Maximum number of levels to return"),
+    active_only: bool = Query(False, description="Return only active partners"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the whole subtree below a partner in a single query.
+    
+    Each node carries its depth relative to the requested partner.
+    """
+    partner = await PartnerService.get_partner(db, partner_id, company_id)
+    if not partner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partner not found"
+        )
+    
+    # Verify user has access to the partner's company
+    await verify_company_access(partner.company_id, current_user)
+    
+    rows = await PartnerHierarchyService.get_subtree(
+        db, partner_id, max_depth=max_depth, active_only=active_only
+    )
+    return _to_hierarchy_response(partner_id, rows)
+
+
+@router.get("/{partner_id}/ancestors", response_model=PartnerHierarchyResponse)
+async def get_partner_ancestors(
+    partner_id: int,
+    company_id: Optional[int] = Query(None, description="Company ID for access verification"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get the ancestor chain of a partner, nearest parent first.
+    """
+    partner = await PartnerService.get_partner(db, partner_id, company_id)
+    if not partner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partner not found"
+        )
+    
+    # Verify user has access to the partner's company
+    await verify_company_access(partner.company_id, current_user)
+    
+    rows = await PartnerHierarchyService.get_ancestors(db, partner_id)
+    return _to_hierarchy_response(partner_id, rows)
+
+
+@router.get("/{partner_id}/hierarchy/summary", response_model=PartnerRollupResponse)
+async def get_partner_hierarchy_summary(
+    partner_id: int,
+    company_id: Optional[int] = Query(None, description="Company ID for access verification"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Get depth and roll-up counts for the subtree below a partner.
+    """
+    partner = await PartnerService.get_partner(db, partner_id, company_id)
+    if not partner:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Partner not found"
+        )
+    
+    # Verify user has access to the partner's company
+    await verify_company_access(partner.company_id, current_user)
+    
+    rollup = await PartnerHierarchyService.get_rollup(db, partner_id)
+    return PartnerRollupResponse(**rollup)
+
+
 @router.get("/company/{company_id}/code/{code}", response_model=PartnerResponse)
 async def get_partner_by_code(
     company_id: int = Path(..., description="Company ID"),
     code: str = Path(..., description="Partner code"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_active_user)
 ):
     """
@@ -3,7 +3,15 @@ Schemas package for request/response validation.
 """
 
 from .company import CompanyCreate, CompanyUpdate, CompanyResponse, CompanyListResponse
-from .partner import PartnerCreate, PartnerUpdate, PartnerResponse, PartnerListResponse
+from .partner import (
+    PartnerCreate,
+    PartnerUpdate,
+    PartnerResponse,
+    PartnerListResponse,
+    PartnerHierarchyNode,
+    PartnerHierarchyResponse,
+    PartnerRollupResponse,
+)
 
 __all__ = [
     "CompanyCreate",
@@ -14,4 +22,7 @@ __all__ = [
     "PartnerUpdate",
     "PartnerResponse", 
     "PartnerListResponse",
+    "PartnerHierarchyNode",
+    "PartnerHierarchyResponse",
+    "PartnerRollupResponse",
 ]
\ No newline at end of file
@@ -94,4 +94,28 @@ class PartnerListResponse(BaseModel):
     total: int
     page: int
     per_page: int
-    pages: int
\ No newline at end of file
+    pages: int
+
+class PartnerHierarchyNode(PartnerResponse):
+    """Schema for a partner within a hierarchy query result."""
+    depth: int
+
+
+class PartnerHierarchyResponse(BaseModel):
+    """Schema for partner subtree or ancestor chain response."""
+    partner_id: int
+    nodes: list[PartnerHierarchyNode]
+    total: int
+
+
+class PartnerRollupResponse(BaseModel):
+    """Schema for aggregated partner hierarchy counts."""
+    partner_id: int
+    depth: int
+    direct_children: int
+    total_descendants: int
+    active_descendants: int
+    customer_descendants: int
+    supplier_descendants: int
+    vendor_descendants: int
+    subtree_height: int
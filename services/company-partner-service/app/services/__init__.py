@@ -4,8 +4,10 @@ Services package for business logic operations.
 
 from .company_service import CompanyService
 from .partner_service import PartnerService
+from .partner_hierarchy_service import PartnerHierarchyService
 
 __all__ = [
     "CompanyService",
     "PartnerService",
+    "PartnerHierarchyService",
 ]
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Partner hierarchy service for corporate group queries.
+
+Hierarchies are resolved with recursive CTEs over ``partners.parent_partner_id``
+so a whole subtree or ancestor chain is fetched in a single round-trip instead
+of walking the tree one level per query.
+"""
+
+from typing import Optional, List, Tuple, Dict, Any
+from sqlalchemy import and_, func, case, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.partner import Partner
+
+
+class PartnerHierarchyService:
+    """Service class for partner hierarchy operations."""
+
+    @staticmethod
+    def _subtree_cte(partner_id: int, max_depth: int):
+        """Build a recursive CTE of (id, parent_partner_id, depth) below a partner."""
+        subtree = (
+            select(
+                Partner.id.label("id"),
+                Partner.parent_partner_id.label("parent_partner_id"),
+                literal(0).label("depth")
+            )
+            .where(Partner.id == partner_id)
+            .cte(name="partner_subtree", recursive=True)
+        )
+        child = aliased(Partner, name="child")
+        return subtree.union_all(
+            select(
+                child.id,
+                child.parent_partner_id,
+                subtree.c.depth + 1
+            ).where(
+                and_(
+                    child.parent_partner_id == subtree.c.id,
+                    # Depth bound doubles as a guard against cyclic data
+                    subtree.c.depth < max_depth
+                )
+            )
+        )
+
+    @staticmethod
+    def _ancestors_cte(partner_id: int, max_depth: int):
+        """Build a recursive CTE of (id, parent_partner_id, depth) above a partner."""
+        ancestors = (
+            select(
+                Partner.id.label("id"),
+                Partner.parent_partner_id.label("parent_partner_id"),
+                literal(0).label("depth")
+            )
+            .where(Partner.id == partner_id)
+            .cte(name="partner_ancestors", recursive=True)
+        )
+        parent = aliased(Partner, name="parent")
+        return ancestors.union_all(
+            select(
+                parent.id,
+                parent.parent_partner_id,
+                ancestors.c.depth + 1
+            ).where(
+                and_(
+                    parent.id == ancestors.c.parent_partner_id,
+                    ancestors.c.depth < max_depth
+                )
+            )
+        )
+
+    @staticmethod
+    async def get_subtree(
+        db: AsyncSession,
+        partner_id: int,
+        max_depth: Optional[int] = None,
+        active_only: bool = False,
+        include_root: bool = False
+    ) -> List[Tuple[Partner, int]]:
+        """Get all descendants of a partner with their depth relative to it."""
+        limit = min(max_depth or settings.partner_hierarchy_max_depth, settings.partner_hierarchy_max_depth)
+        subtree = PartnerHierarchyService._subtree_cte(partner_id, limit)
+
+        query = select(Partner, subtree.c.depth).join(subtree, Partner.id == subtree.c.id)
+        if not include_root:
+            query = query.where(subtree.c.depth > 0)
+        if active_only:
+            query = query.where(Partner.is_active == True)
+        query = query.order_by(subtree.c.depth, Partner.name, Partner.id)
+
+        result = await db.execute(query)
+        return [(partner, depth) for partner, depth in result.all()]
+
+    @staticmethod
+    async def get_ancestors(
+        db: AsyncSession,
+        partner_id: int
+    ) -> List[Tuple[Partner, int]]:
+        """Get the ancestor chain of a partner, nearest parent first."""
+        ancestors = PartnerHierarchyService._ancestors_cte(
+            partner_id, settings.partner_hierarchy_max_depth
+        )
+        query = (
+            select(Partner, ancestors.c.depth)
+            .join(ancestors, Partner.id == ancestors.c.id)
+            .where(ancestors.c.depth > 0)
+            .order_by(ancestors.c.depth)
+        )
+        result = await db.execute(query)
+        return [(partner, depth) for partner, depth in result.all()]
+
+    @staticmethod
+    async def get_depth(
+        db: AsyncSession,
+        partner_id: int
+    ) -> int:
+        """Get the depth of a partner in its hierarchy (0 for a root partner)."""
+        ancestors = PartnerHierarchyService._ancestors_cte(
+            partner_id, settings.partner_hierarchy_max_depth
+        )
+        result = await db.execute(select(func.max(ancestors.c.depth)))
+        return result.scalar() or 0
+
+    @staticmethod
+    async def get_rollup(
+        db: AsyncSession,
+        partner_id: int
+    ) -> Dict[str, Any]:
+        """Get aggregated counts over the subtree below a partner in one query."""
+        subtree = PartnerHierarchyService._subtree_cte(
+            partner_id, settings.partner_hierarchy_max_depth
+        )
+
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        query = (
+            select(
+                func.count(Partner.id),
+                count_if(subtree.c.depth == 1),
+                count_if(Partner.is_active == True),
+                count_if(Partner.is_customer == True),
+                count_if(Partner.is_supplier == True),
+                count_if(Partner.is_vendor == True),
+                func.coalesce(func.max(subtree.c.depth), 0)
+            )
+            .select_from(subtree)
+            .join(Partner, Partner.id == subtree.c.id)
+            .where(subtree.c.depth > 0)
+        )
+        result = await db.execute(query)
+        row = result.one()
+
+        return {
+            "partner_id": partner_id,
+            "depth": await PartnerHierarchyService.get_depth(db, partner_id),
+            "direct_children": int(row[1]),
+            "total_descendants": int(row[0]),
+            "active_descendants": int(row[2]),
+            "customer_descendants": int(row[3]),
+            "supplier_descendants": int(row[4]),
+            "vendor_descendants": int(row[5]),
+            "subtree_height": int(row[6]),
+        }
+
+    @staticmethod
+    async def validate_parent(
+        db: AsyncSession,
+        parent_partner_id: int,
+        company_id: int,
+        partner_id: Optional[int] = None
+    ) -> None:
+        """
+        Validate that a partner may be attached below the given parent.
+
+        Rejects unknown parents, parents from another company, assignments
+        that would create a cycle and trees deeper than the configured limit.
+        Raises ValueError with a user-facing message on failure.
+        """
+        if partner_id is not None and parent_partner_id == partner_id:
+            raise ValueError("Partner cannot be its own parent")
+
+        result = await db.execute(
+            select(Partner.company_id).where(Partner.id == parent_partner_id)
+        )
+        parent_company_id = result.scalar_one_or_none()
+        if parent_company_id is None:
+            raise ValueError(f"Parent partner {parent_partner_id} not found")
+        if parent_company_id != company_id:
+            raise ValueError("Parent partner must belong to the same company")
+
+        max_depth = settings.partner_hierarchy_max_depth
+        ancestors = PartnerHierarchyService._ancestors_cte(parent_partner_id, max_depth)
+        result = await db.execute(select(ancestors.c.id, ancestors.c.depth))
+        chain = result.all()
+
+        if partner_id is not None and any(row.id == partner_id for row in chain):
+            raise ValueError("Parent assignment would create a cycle in the partner hierarchy")
+
+        parent_depth = max(row.depth for row in chain)
+        subtree_height = 0
+        if partner_id is not None:
+            subtree = PartnerHierarchyService._subtree_cte(partner_id, max_depth)
+            result = await db.execute(select(func.max(subtree.c.depth)))
+            subtree_height = result.scalar() or 0
+
+        if parent_depth + 1 + subtree_height > max_depth:
+            raise ValueError(
+                f"Partner hierarchy cannot be deeper than {max_depth} levels"
+            )
@@ -11,6 +11,7 @@ from sqlalchemy.exc import IntegrityError
 
 from app.models.partner import Partner
 from app.schemas.partner import PartnerCreate, PartnerUpdate
+from app.services.partner_hierarchy_service import PartnerHierarchyService
 
 
 class PartnerService:
@@ -22,6 +23,11 @@ class PartnerService:
         partner_data: PartnerCreate
     ) -> Partner:
         """Create a new partner."""
+        if partner_data.parent_partner_id is not None:
+            await PartnerHierarchyService.validate_parent(
+                db, partner_data.parent_partner_id, partner_data.company_id
+            )
+
         try:
             partner = Partner(**partner_data.dict())
             db.add(partner)
@@ -132,8 +138,14 @@ class PartnerService:
         if not partner:
             return None
 
+        update_data = partner_data.dict(exclude_unset=True)
+        new_parent_id = update_data.get("parent_partner_id")
+        if new_parent_id is not None and new_parent_id != partner.parent_partner_id:
+            await PartnerHierarchyService.validate_parent(
+                db, new_parent_id, partner.company_id, partner_id=partner.id
+            )
+
         try:
-            update_data = partner_data.dict(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(partner, field, value)
             
@@ -0,0 +1,61 @@
+"""
+Micro-benchmarks of the partner response schemas: validating Partner rows
+into PartnerResponse, alone and as a full PartnerListResponse page.
+
+Run with benchmarks/run_micro_benchmarks.sh.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.models.partner import Partner
+from app.schemas.partner import PartnerListResponse, PartnerResponse
+
+PAGE_SIZE = 100
+
+
+def make_partner(i: int) -> Partner:
+    return Partner(
+        id=i,
+        company_id=1,
+        name=f"Partner {i}",
+        code=f"P{i}",
+        partner_type=("customer", "supplier", "vendor", "both")[i % 4],
+        email=f"partner{i}@example.com",
+        phone="+1 555 0100",
+        website="https://example.com",
+        tax_id=f"TAX-{i:08d}",
+        industry="Manufacturing",
+        parent_partner_id=None if i % 10 == 0 else i - i % 10,
+        is_company=i % 5 == 0,
+        is_customer=i % 4 in (0, 3),
+        is_supplier=i % 4 in (1, 3),
+        is_vendor=i % 4 == 2,
+        is_active=True,
+        created_at=datetime(2024, 1, 1, 12, 0),
+        updated_at=datetime(2024, 6, 1, 12, 0),
+    )
+
+
+def test_partner_response(benchmark):
+    partner = make_partner(1)
+    assert benchmark(PartnerResponse.model_validate, partner).id == 1
+
+
+def test_partner_list_response_page(benchmark):
+    partners = [make_partner(i) for i in range(1, PAGE_SIZE + 1)]
+
+    # As the list endpoint builds it: ORM rows validated by the response model
+    def build_page():
+        return PartnerListResponse(
+            partners=partners,
+            total=PAGE_SIZE,
+            page=1,
+            per_page=PAGE_SIZE,
+            pages=1,
+        )
+
+    assert len(benchmark(build_page).partners) == PAGE_SIZE
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark for partner hierarchy queries on deep and wide trees.
+
+Compares the recursive CTE queries in PartnerHierarchyService with a naive
+level-by-level walk (one query per tree level, the pattern the lazy parent /
+child relationships lead to).
+
+Usage:
+    python benchmarks/partner_hierarchy_benchmark.py [--database-url URL] [--repeat N]
+
+Defaults to an in-memory SQLite database; pass a PostgreSQL URL of a scratch
+database to measure against the production engine (all tables are dropped).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import Company, Partner
+from app.services.partner_hierarchy_service import PartnerHierarchyService
+
+
+async def build_tree(db: AsyncSession, company_id: int, prefix: str, fanout: list) -> int:
+    """Insert a tree with the given fanout per level and return its root id."""
+    now = datetime.utcnow()
+    result = await db.execute(
+        insert(Partner).values(
+            company_id=company_id, name=f"{prefix}-root", partner_type="customer",
+            created_at=now, updated_at=now
+        ).returning(Partner.id)
+    )
+    root_id = result.scalar_one()
+    level = [root_id]
+    for depth, width in enumerate(fanout, start=1):
+        rows = [
+            {
+                "company_id": company_id,
+                "name": f"{prefix}-{depth}-{parent_id}-{i}",
+                "partner_type": "customer",
+                "parent_partner_id": parent_id,
+                "is_customer": True,
+                "is_supplier": False,
+                "is_vendor": False,
+                "is_company": False,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for parent_id in level
+            for i in range(width)
+        ]
+        await db.execute(insert(Partner), rows)
+        result = await db.execute(select(Partner.id).where(Partner.name.like(f"{prefix}-{depth}-%")))
+        level = [row[0] for row in result.all()]
+    await db.commit()
+    return root_id
+
+
+async def naive_subtree(db: AsyncSession, root_id: int) -> int:
+    """Walk the tree one level per query."""
+    total = 0
+    level = [root_id]
+    while level:
+        result = await db.execute(select(Partner).where(Partner.parent_partner_id.in_(level)))
+        children = result.scalars().all()
+        total += len(children)
+        level = [child.id for child in children]
+    return total
+
+
+async def naive_ancestors(db: AsyncSession, partner_id: int) -> int:
+    """Follow parent pointers one query at a time."""
+    count = 0
+    partner = await db.get(Partner, partner_id)
+    while partner.parent_partner_id is not None:
+        partner = await db.get(Partner, partner.parent_partner_id)
+        count += 1
+    return count
+
+
+async def measure(label: str, engine, func, repeat: int):
+    """Run func repeat times and print mean latency and query count."""
+    counter = {"queries": 0}
+
+    def count_query(*args):
+        counter["queries"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        async with session_factory() as db:
+            size = await func(db)
+    elapsed = (time.perf_counter() - start) / repeat
+    event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+    print(
+        f"  {label:<28} {elapsed * 1000:9.2f} ms  "
+        f"{counter['queries'] / repeat:7.1f} queries  result={size}"
+    )
+
+
+async def main(database_url: str, repeat: int):
+    engine_options = {"poolclass": StaticPool} if ":memory:" in database_url else {}
+    engine = create_async_engine(database_url, echo=False, **engine_options)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        company = Company(name="Benchmark", legal_name="Benchmark LLC", code="BENCH")
+        db.add(company)
+        await db.commit()
+        deep_root = await build_tree(db, company.id, "deep", [1] * 30)
+        wide_root = await build_tree(db, company.id, "wide", [50, 20, 5])
+        result = await db.execute(
+            select(Partner.id).where(Partner.name.like("deep-30-%"))
+        )
+        deep_leaf = result.scalar_one()
+
+    scenarios = [
+        ("Deep tree (30 levels)", deep_root, deep_leaf),
+        ("Wide tree (50x20x5)", wide_root, None),
+    ]
+    for title, root_id, leaf_id in scenarios:
+        print(title)
+        await measure("naive subtree walk", engine, lambda db: naive_subtree(db, root_id), repeat)
+        await measure(
+            "CTE subtree", engine,
+            lambda db: _count(PartnerHierarchyService.get_subtree(db, root_id)), repeat
+        )
+        await measure(
+            "CTE rollup", engine,
+            lambda db: _total(PartnerHierarchyService.get_rollup(db, root_id)), repeat
+        )
+        if leaf_id:
+            await measure("naive ancestor walk", engine, lambda db: naive_ancestors(db, leaf_id), repeat)
+            await measure(
+                "CTE ancestors", engine,
+                lambda db: _count(PartnerHierarchyService.get_ancestors(db, leaf_id)), repeat
+            )
+
+    await engine.dispose()
+
+
+async def _count(coro) -> int:
+    return len(await coro)
+
+
+async def _total(coro) -> int:
+    return (await coro)["total_descendants"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.repeat))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark of per-request database round-trips for GET endpoints.
+
+Serves the company and partner GET endpoints in-process and compares the
+read-only session dependency (get_read_db: READ ONLY transaction, no
+autoflush, no commit) with the read-write dependency GET endpoints used
+before (get_db: autoflush plus an unconditional COMMIT).
+
+Usage:
+    python benchmarks/read_session_benchmark.py [--database-url URL] [--requests N]
+
+Defaults to a temporary SQLite file; pass a PostgreSQL URL of a scratch
+database to count real server round-trips (all tables are dropped).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--requests", type=int, default=200)
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+if ARGS.database_url is None:
+    ARGS.database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/read_session_benchmark.db"
+# The engines are built from settings at import time
+os.environ["DATABASE_URL"] = ARGS.database_url
+os.environ.setdefault("DEBUG", "false")
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+
+from app.core.database import Base, async_engine, async_session_factory, get_db, get_read_db
+from app.main import app
+from app.middleware.auth import get_current_active_user
+from app.models import Company, Partner
+
+logging.disable(logging.INFO)
+
+
+class RoundTripCounter:
+    """Count statements, commits and rollbacks sent on an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.counts = {"statements": 0, "commits": 0, "rollbacks": 0}
+
+    def _statement(self, *args):
+        self.counts["statements"] += 1
+
+    def _commit(self, *args):
+        self.counts["commits"] += 1
+
+    def _rollback(self, *args):
+        self.counts["rollbacks"] += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._statement)
+        event.listen(self.engine, "commit", self._commit)
+        event.listen(self.engine, "rollback", self._rollback)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._statement)
+        event.remove(self.engine, "commit", self._commit)
+        event.remove(self.engine, "rollback", self._rollback)
+
+
+async def seed() -> tuple:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session_factory() as db:
+        company = Company(name="Benchmark", legal_name="Benchmark LLC", code="BENCH")
+        db.add(company)
+        await db.flush()
+        partners = [
+            Partner(company_id=company.id, name=f"Partner {i}", partner_type="customer")
+            for i in range(50)
+        ]
+        db.add_all(partners)
+        await db.commit()
+        return company.id, partners[0].id
+
+
+async def run(label: str, client: AsyncClient, paths: list, total: int):
+    with RoundTripCounter(async_engine) as counter:
+        start = time.perf_counter()
+        for i in range(total):
+            response = await client.get(paths[i % len(paths)])
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+
+    per_request = {key: value / total for key, value in counter.counts.items()}
+    print(
+        f"  {label:<34} {elapsed / total * 1000:8.3f} ms/req  "
+        f"{per_request['statements']:5.2f} statements  "
+        f"{per_request['commits']:5.2f} commits  "
+        f"{per_request['rollbacks']:5.2f} rollbacks"
+    )
+
+
+async def main():
+    company_id, partner_id = await seed()
+    paths = [
+        "/api/v1/companies/",
+        f"/api/v1/companies/{company_id}",
+        f"/api/v1/partners/?company_id={company_id}",
+        f"/api/v1/partners/{partner_id}",
+    ]
+
+    app.dependency_overrides[get_current_active_user] = lambda: {
+        "id": 1, "is_active": True, "is_superuser": True, "permissions": []
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+        print(f"GET endpoints, {ARGS.requests} requests ({async_engine.dialect.name})")
+
+        # Before: GET endpoints on the read-write session
+        app.dependency_overrides[get_read_db] = get_db
+        await run("read-write session (get_db)", client, paths, ARGS.requests)
+
+        # After: read-only session
+        del app.dependency_overrides[get_read_db]
+        await run("read-only session (get_read_db)", client, paths, ARGS.requests)
+
+    app.dependency_overrides.clear()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
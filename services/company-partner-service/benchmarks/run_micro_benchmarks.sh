@@ -0,0 +1,41 @@
+#!/bin/bash
+# Micro-benchmarks of hot pure-Python code paths (benchmarks/micro).
+#
+#   benchmarks/run_micro_benchmarks.sh          compare with the latest baseline
+#                                               recorded on this machine; fails
+#                                               when a median regressed
+#   benchmarks/run_micro_benchmarks.sh --save   store a new baseline
+#
+# Baselines are only comparable on the machine (and Python) that recorded
+# them, so none are committed: without a baseline the comparison fails, so a
+# CI runner must restore one (or record it with --save from the target
+# branch) first. BENCHMARK_BASELINE compares with a specific saved run
+# (e.g. 0001) instead of the latest, BENCHMARK_FAIL_THRESHOLD sets the
+# allowed regression (default median:20%). Extra arguments are passed on
+# to pytest.
+set -e
+
+cd "$(dirname "$0")/.."
+
+BASELINES="benchmarks/micro/baselines"
+# bench_*.py, so the regular test run does not pick them up
+ARGS=(
+  benchmarks/micro -p no:cacheprovider -o python_files="bench_*.py"
+  --benchmark-only --benchmark-storage="file://$BASELINES" --benchmark-sort=name
+  --benchmark-warmup=on --benchmark-min-time=0.0002
+)
+
+if [ "$1" = "--save" ]; then
+  shift
+  exec python -m pytest "${ARGS[@]}" --benchmark-save=baseline "$@"
+fi
+
+if ! compgen -G "$BASELINES/*/*.json" > /dev/null; then
+  echo "No baseline in $BASELINES; record one with --save first" >&2
+  exit 1
+fi
+
+exec python -m pytest "${ARGS[@]}" \
+  --benchmark-compare${BENCHMARK_BASELINE:+=$BENCHMARK_BASELINE} \
+  --benchmark-compare-fail="${BENCHMARK_FAIL_THRESHOLD:-median:20%}" \
+  "$@"
@@ -0,0 +1,28 @@
+"""Add partner hierarchy index
+
+Revision ID: 20261018_0900
+Revises: 20250729_1001
+Create Date: 2026-10-18 09:00:00
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_0900'
+down_revision = '20250729_1001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Covering index for the recursive step of partner hierarchy queries
+    op.create_index(
+        'ix_partners_parent_partner_id_id',
+        'partners',
+        ['parent_partner_id', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_partners_parent_partner_id_id', table_name='partners')
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_read_db
 from app.main import app
 
 
@@ -61,6 +61,7 @@ async def test_client(test_db_session):
     yield test_db_session
   
   app.dependency_overrides[get_db] = override_get_db
+  app.dependency_overrides[get_read_db] = override_get_db
   
   from httpx import ASGITransport
   async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
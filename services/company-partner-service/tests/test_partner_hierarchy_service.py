@@ -0,0 +1,132 @@
+"""
+Tests for Partner hierarchy service operations.
+"""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.company_service import CompanyService
+from app.services.partner_service import PartnerService
+from app.services.partner_hierarchy_service import PartnerHierarchyService
+from app.schemas.company import CompanyCreate
+from app.schemas.partner import PartnerCreate, PartnerUpdate
+
+
+async def _create_company(db: AsyncSession, code: str = "HIERCO"):
+    return await CompanyService.create_company(
+        db, CompanyCreate(name=f"Company {code}", legal_name=f"Company {code} LLC", code=code)
+    )
+
+
+async def _create_partner(db: AsyncSession, company_id: int, name: str, parent_id=None, **kwargs):
+    return await PartnerService.create_partner(
+        db,
+        PartnerCreate(company_id=company_id, name=name, parent_partner_id=parent_id, **kwargs)
+    )
+
+
+async def _build_group(db: AsyncSession):
+    """Build: holding -> (sub_a -> (leaf_1, leaf_2), sub_b)."""
+    company = await _create_company(db)
+    holding = await _create_partner(db, company.id, "Holding", is_company=True)
+    sub_a = await _create_partner(db, company.id, "Sub A", holding.id, is_supplier=True)
+    sub_b = await _create_partner(db, company.id, "Sub B", holding.id, is_active=False)
+    leaf_1 = await _create_partner(db, company.id, "Leaf 1", sub_a.id)
+    leaf_2 = await _create_partner(db, company.id, "Leaf 2", sub_a.id, is_vendor=True)
+    return company, holding, sub_a, sub_b, leaf_1, leaf_2
+
+
+@pytest.mark.asyncio
+async def test_get_subtree(test_db_session: AsyncSession):
+    """Test fetching all descendants with their depth."""
+    _, holding, sub_a, sub_b, leaf_1, leaf_2 = await _build_group(test_db_session)
+
+    rows = await PartnerHierarchyService.get_subtree(test_db_session, holding.id)
+
+    assert [(p.id, depth) for p, depth in rows] == [
+        (sub_a.id, 1), (sub_b.id, 1), (leaf_1.id, 2), (leaf_2.id, 2)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_subtree_filters(test_db_session: AsyncSession):
+    """Test max_depth and active_only filters on subtree queries."""
+    _, holding, sub_a, sub_b, _, _ = await _build_group(test_db_session)
+
+    rows = await PartnerHierarchyService.get_subtree(test_db_session, holding.id, max_depth=1)
+    assert {p.id for p, _ in rows} == {sub_a.id, sub_b.id}
+
+    rows = await PartnerHierarchyService.get_subtree(test_db_session, holding.id, active_only=True)
+    assert sub_b.id not in {p.id for p, _ in rows}
+
+
+@pytest.mark.asyncio
+async def test_get_ancestors_and_depth(test_db_session: AsyncSession):
+    """Test ancestor chain ordering and depth calculation."""
+    _, holding, sub_a, _, leaf_1, _ = await _build_group(test_db_session)
+
+    rows = await PartnerHierarchyService.get_ancestors(test_db_session, leaf_1.id)
+
+    assert [(p.id, depth) for p, depth in rows] == [(sub_a.id, 1), (holding.id, 2)]
+    assert await PartnerHierarchyService.get_depth(test_db_session, leaf_1.id) == 2
+    assert await PartnerHierarchyService.get_depth(test_db_session, holding.id) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_rollup(test_db_session: AsyncSession):
+    """Test aggregated subtree counts."""
+    _, holding, _, _, _, _ = await _build_group(test_db_session)
+
+    rollup = await PartnerHierarchyService.get_rollup(test_db_session, holding.id)
+
+    assert rollup["depth"] == 0
+    assert rollup["direct_children"] == 2
+    assert rollup["total_descendants"] == 4
+    assert rollup["active_descendants"] == 3
+    assert rollup["supplier_descendants"] == 1
+    assert rollup["vendor_descendants"] == 1
+    assert rollup["subtree_height"] == 2
+
+
+@pytest.mark.asyncio
+async def test_update_parent_rejects_cycle(test_db_session: AsyncSession):
+    """Test that moving a partner below its own descendant is rejected."""
+    _, holding, _, _, leaf_1, _ = await _build_group(test_db_session)
+
+    with pytest.raises(ValueError) as exc_info:
+        await PartnerService.update_partner(
+            test_db_session, holding.id, PartnerUpdate(parent_partner_id=leaf_1.id)
+        )
+    assert "cycle" in str(exc_info.value)
+
+    with pytest.raises(ValueError):
+        await PartnerService.update_partner(
+            test_db_session, holding.id, PartnerUpdate(parent_partner_id=holding.id)
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_rejects_parent_from_other_company(test_db_session: AsyncSession):
+    """Test that parents must exist and belong to the same company."""
+    company, holding, _, _, _, _ = await _build_group(test_db_session)
+    other = await _create_company(test_db_session, code="OTHERCO")
+
+    with pytest.raises(ValueError) as exc_info:
+        await _create_partner(test_db_session, other.id, "Foreign", holding.id)
+    assert "same company" in str(exc_info.value)
+
+    with pytest.raises(ValueError) as exc_info:
+        await _create_partner(test_db_session, company.id, "Orphan", 999999)
+    assert "not found" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_create_rejects_excessive_depth(test_db_session: AsyncSession, monkeypatch):
+    """Test that the configured maximum depth is enforced."""
+    monkeypatch.setattr(settings, "partner_hierarchy_max_depth", 2)
+    _, _, _, _, leaf_1, _ = await _build_group(test_db_session)
+
+    with pytest.raises(ValueError) as exc_info:
+        await _create_partner(test_db_session, leaf_1.company_id, "Too Deep", leaf_1.id)
+    assert "deeper than 2" in str(exc_info.value)
@@ -0,0 +1,131 @@
+"""
+Read/write routing between the primary database and read replicas.
+
+Reads are spread round-robin over replicas that are reachable and within
+the configured replication lag; everything else (and every read when no
+replica qualifies) goes to the primary. Clients that just wrote are pinned
+to the primary for a short window so they always read their own writes: the
+pin is a signed, short-lived token the client sends back (as a cookie), so
+it holds on every worker and instance of the service.
+"""
+
+import hashlib
+import hmac
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when fully caught up
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaState:
+    """Health and lag bookkeeping for one replica engine."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class DatabaseRouter:
+    """Choose the engine a session should be bound to."""
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag_seconds: float = 5.0,
+        lag_check_interval: float = 2.0,
+        sticky_seconds: float = 5.0,
+        retry_after_seconds: float = 30.0,
+        pin_secret: str = ""
+    ):
+        self.primary = primary
+        self.replicas = [ReplicaState(engine) for engine in replicas]
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.sticky_seconds = sticky_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._next = 0
+        self._pin_key = pin_secret.encode()
+
+    def _sign(self, expires_ms: str) -> str:
+        return hmac.new(self._pin_key, expires_ms.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def pin_token(self) -> Optional[str]:
+        """Signed token pinning its bearer to the primary for the read-your-writes window."""
+        if not self.replicas:
+            return None
+        expires_ms = str(int((time.time() + self.sticky_seconds) * 1000))
+        return f"{expires_ms}.{self._sign(expires_ms)}"
+
+    def is_pinned(self, pin: Optional[str]) -> bool:
+        """Check whether a pin is genuine and still inside its read-your-writes window."""
+        if not pin:
+            return False
+        expires_ms, _, signature = pin.partition(".")
+        if not expires_ms.isdigit() or not hmac.compare_digest(signature, self._sign(expires_ms)):
+            return False
+        return int(expires_ms) > time.time() * 1000
+
+    def mark_failed(self, engine: AsyncEngine) -> None:
+        """Take a replica out of rotation after a connection failure."""
+        for state in self.replicas:
+            if state.engine is engine:
+                state.down_until = time.monotonic() + self.retry_after_seconds
+                logger.warning(f"Read replica {state.name} unavailable, routing reads to primary")
+
+    async def _check_lag(self, state: ReplicaState) -> None:
+        """Refresh the lag of a replica, at most once per check interval."""
+        now = time.monotonic()
+        if now - state.checked_at < self.lag_check_interval:
+            return
+        state.checked_at = now
+
+        if state.engine.dialect.name != "postgresql":
+            state.lag = 0.0
+            return
+
+        try:
+            async with state.engine.connect() as conn:
+                state.lag = float((await conn.execute(POSTGRES_LAG_QUERY)).scalar() or 0)
+        except Exception as e:
+            logger.warning(f"Lag check failed for read replica {state.name}: {e}")
+            state.lag = None
+            state.down_until = now + self.retry_after_seconds
+
+    async def read_engine(self, pin: Optional[str] = None) -> AsyncEngine:
+        """Pick the engine for a read-only session, given the client's pin if any."""
+        if not self.replicas or self.is_pinned(pin):
+            return self.primary
+
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            state = self.replicas[(self._next + offset) % len(self.replicas)]
+            if state.down_until > now:
+                continue
+            await self._check_lag(state)
+            if state.lag is not None and state.lag <= self.max_lag_seconds:
+                self._next = (self._next + offset + 1) % len(self.replicas)
+                return state.engine
+
+        return self.primary
+
+    async def dispose(self) -> None:
+        """Dispose all replica engines (the primary is owned by the caller)."""
+        for state in self.replicas:
+            await state.engine.dispose()
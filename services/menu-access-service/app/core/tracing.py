@@ -0,0 +1,260 @@
+"""
+Distributed tracing shared by the M-ERP services.
+
+The same module lives in every Python service under app/core/tracing.py
+(keep the copies in sync). Traces follow W3C trace context: TracingMiddleware
+continues the ``traceparent``/``tracestate`` of incoming requests (set by Kong
+or the calling service) and traced httpx clients inject them into outgoing
+requests, so one UI action can be followed across every service it reaches.
+Database queries and Redis commands become child spans of the request.
+
+Tracing is off until configure_tracing() is given an exporter: "otlp" sends
+spans to an OTLP/HTTP collector (OTEL_EXPORTER_OTLP_ENDPOINT, default
+http://localhost:4318), "file" appends them as JSON lines to a file. While off,
+every hook costs a flag check. While on:
+
+- only ``sample_rate`` of new traces are recorded; requests arriving with a
+  trace context keep its sampling decision, so a trace is complete or absent
+- database and Redis spans are only created inside recorded traces
+- spans are exported in batches from a bounded queue that drops spans rather
+  than blocking requests when the collector falls behind
+"""
+
+import asyncio
+from typing import Any, Optional
+
+from opentelemetry import context, trace
+from opentelemetry.propagate import extract, inject
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROPAGATION_HEADERS = (b"traceparent", b"tracestate", b"baggage")
+MAX_STATEMENT_LENGTH = 1000
+
+_tracer = trace.NoOpTracer()
+_provider = None
+_enabled = False
+
+
+def configure_tracing(
+    service_name: str,
+    exporter: Any,
+    sample_rate: float = 0.1,
+    file_path: str = "traces.jsonl",
+    max_queue_size: int = 2048
+) -> bool:
+    """
+    Start exporting spans of this process. ``exporter`` is "otlp", "file",
+    "none"/"" (tracing stays off) or a SpanExporter instance. Call it in
+    each worker process (e.g. at startup), not before forking.
+    """
+    global _tracer, _provider, _enabled
+    if not exporter or exporter == "none":
+        return False
+
+    # Imported here: the SDK is only loaded when tracing is enabled
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif exporter == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(file_path, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif isinstance(exporter, str):
+        raise ValueError(f"Unknown tracing exporter: {exporter}")
+
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_rate)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter, max_queue_size=max_queue_size))
+    _tracer = _provider.get_tracer(__name__)
+    _enabled = True
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush the pending spans and turn tracing off."""
+    global _tracer, _provider, _enabled
+    _enabled = False
+    _tracer = trace.NoOpTracer()
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def _recording() -> bool:
+    return _enabled and trace.get_current_span().is_recording()
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a server span per request, continuing the
+    incoming trace context. The span is named after the route template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not _enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {}
+        for name, value in scope["headers"]:
+            if name in PROPAGATION_HEADERS:
+                carrier[name.decode("latin-1")] = value.decode("latin-1")
+        parent = extract(carrier) if carrier else None
+
+        method = scope["method"]
+        span = _tracer.start_span(
+            method,
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": scope["path"]},
+        )
+        token = context.attach(trace.set_span_in_context(span, parent))
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            if span.is_recording():
+                route = getattr(scope.get("route"), "path_format", None)
+                if route is not None:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+            context.detach(token)
+            span.end()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+    if not _enabled:
+        return
+    # A None entry keeps the stack aligned for statements outside recorded traces
+    span = None
+    if _recording():
+        span = _tracer.start_span(
+            statement[:6].upper().strip() or "SQL",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": conn.dialect.name, "db.statement": statement[:MAX_STATEMENT_LENGTH]},
+        )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        if span is not None:
+            span.end()
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for failed statements
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def trace_engine(engine) -> None:
+    """Open a span per query of a (sync or async) SQLAlchemy engine."""
+    # Imported here: the service registry has no database
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _redis_span(command):
+    name = command.decode() if isinstance(command, bytes) else str(command)
+    return _tracer.start_as_current_span(
+        f"redis {name.upper()}", kind=SpanKind.CLIENT, attributes={"db.system": "redis"}
+    )
+
+
+def _traced(call, command: Optional[str] = None):
+    """Wrap a Redis client method, named by ``command`` or its first argument."""
+    if asyncio.iscoroutinefunction(call):
+        async def traced(*args, **kwargs):
+            if not _recording():
+                return await call(*args, **kwargs)
+            with _redis_span(command or args[0]):
+                return await call(*args, **kwargs)
+    else:
+        def traced(*args, **kwargs):
+            if not _recording():
+                return call(*args, **kwargs)
+            with _redis_span(command or args[0]):
+                return call(*args, **kwargs)
+    return traced
+
+
+def trace_redis(client):
+    """Open a span per command (and pipeline execution) of a redis client instance."""
+    client.execute_command = _traced(client.execute_command)
+    pipeline = client.pipeline
+
+    def traced_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        pipe.execute = _traced(pipe.execute, "PIPELINE")
+        return pipe
+
+    client.pipeline = traced_pipeline
+    return client
+
+
+def trace_http_client(client):
+    """
+    Open a client span per request of an httpx.AsyncClient and propagate the
+    trace context to the called service.
+    """
+    send = client.send
+
+    async def traced_send(request, **kwargs):
+        if not _enabled:
+            return await send(request, **kwargs)
+        with _tracer.start_as_current_span(
+            f"{request.method} {request.url.host}",
+            kind=SpanKind.CLIENT,
+            attributes={"http.request.method": request.method, "server.address": request.url.host},
+        ) as span:
+            # Also for unrecorded traces, so the called service keeps the decision
+            inject(request.headers)
+            response = await send(request, **kwargs)
+            if span.is_recording():
+                span.set_attribute("http.response.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+            return response
+
+    client.send = traced_send
+    return client
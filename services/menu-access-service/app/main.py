@@ -8,6 +8,8 @@ from sqlalchemy import text
 
 from app.core.config import settings
 from app.core.database import close_db, get_db
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 from app.middleware.auth import auth_client
 
 # Configure logging
@@ -23,12 +25,20 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up Menu & Access Rights Service...")
     logger.info("Database migrations handled by startup script")
+    # Export spans from this worker
+    configure_tracing(
+        "menu-access-service",
+        settings.tracing_exporter,
+        sample_rate=settings.tracing_sample_rate,
+        file_path=settings.tracing_file,
+    )
     yield
     # Shutdown
     logger.info("Shutting down Menu & Access Rights Service...")
     await close_db()
     await auth_client.close()
     logger.info("Database connections and auth client closed")
+    shutdown_tracing()
 
 
 def create_application() -> FastAPI:
@@ -49,11 +59,21 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # TODO: Include API routers when implemented
-    # from app.routers import permissions, roles, menus
+    # Request metrics (the time includes the middleware added before)
+    application.add_middleware(MetricsMiddleware)
+    application.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+    
+    # Request spans continuing the caller's trace (outermost)
+    application.add_middleware(TracingMiddleware)
+    
+    # Include API routers
+    from app.routers import menus
+    application.include_router(menus.router, prefix="/api/v1")
+    
+    # TODO: Include remaining API routers when implemented
+    # from app.routers import permissions, roles
     # application.include_router(permissions.router, prefix="/api/v1")
     # application.include_router(roles.router, prefix="/api/v1")
-    # application.include_router(menus.router, prefix="/api/v1")
     
     return application
 
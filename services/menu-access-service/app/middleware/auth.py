@@ -5,10 +5,12 @@ Authentication middleware for inter-service communication.
 import httpx
 import logging
 from typing import Optional, Dict, Any
-from fastapi import HTTPException, status
+from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
+from app.core.metrics import instrument_http_client
+from app.core.tracing import trace_http_client
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer()
@@ -20,7 +22,7 @@ class AuthClient:
     def __init__(self):
         self.auth_service_url = settings.auth_service_url
         self.service_token = None
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = instrument_http_client(trace_http_client(httpx.AsyncClient(timeout=30.0)))
     
     async def validate_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Validate a JWT token with the auth service."""
@@ -84,7 +86,7 @@ auth_client = AuthClient()
 
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = security
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
     """
     Dependency to get the current user from JWT token.
@@ -108,7 +110,7 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: Dict[str, Any] = None
+    current_user: Dict[str, Any] = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
     Dependency to get the current active user.
@@ -52,7 +52,7 @@ class MenuItem(BaseModel):
     css_class = Column(String(255))  # Custom CSS classes
     
     # Relationships
-    parent = relationship("MenuItem", remote_side=[id], back_populates="children")
+    parent = relationship("MenuItem", remote_side="MenuItem.id", back_populates="children")
     children = relationship(
         "MenuItem", 
         back_populates="parent",
@@ -0,0 +1,7 @@
+"""
+API routers package.
+"""
+
+from . import menus
+
+__all__ = ["menus"]
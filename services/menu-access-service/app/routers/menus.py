@@ -0,0 +1,52 @@
+"""
+Menu API endpoints.
+"""
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Header, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_primary_read_db
+from app.middleware.auth import get_current_active_user
+from app.schemas.menu import MenuTreeResponse
+from app.services.menu_tree import DEFAULT_ROLE_LEVEL, menu_tree_cache
+
+router = APIRouter(prefix="/menus", tags=["menus"])
+
+
+def _etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an If-None-Match header against an entity tag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@router.get(
+    "/tree",
+    response_model=MenuTreeResponse,
+    responses={304: {"description": "Menu unchanged since the supplied ETag"}}
+)
+async def get_menu_tree(
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_primary_read_db),
+    current_user: Dict[str, Any] = Depends(get_current_active_user)
+):
+    """
+    Get the navigation tree visible to the current user.
+    
+    Served from the in-memory menu cache; the database is only queried for
+    the menu's change stamp (at most every MENU_CACHE_CHECK_SECONDS) and for
+    the tree itself when it changed. Supports conditional requests via ETag.
+    """
+    menu = await menu_tree_cache.get_menu(
+        db,
+        current_user.get("permissions", []),
+        current_user.get("role_level", DEFAULT_ROLE_LEVEL)
+    )
+    headers = {"ETag": menu.etag, "Cache-Control": "private, no-cache"}
+    
+    if _etag_matches(menu.etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=menu.body, media_type="application/json", headers=headers)
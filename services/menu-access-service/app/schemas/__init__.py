@@ -0,0 +1,10 @@
+"""
+Schemas package for request/response validation.
+"""
+
+from .menu import MenuNodeResponse, MenuTreeResponse
+
+__all__ = [
+    "MenuNodeResponse",
+    "MenuTreeResponse",
+]
@@ -0,0 +1,28 @@
+"""
+Menu schemas for API response serialization.
+"""
+
+from typing import Optional, Any
+from pydantic import BaseModel
+
+
+class MenuNodeResponse(BaseModel):
+    """Schema for a menu item visible to the current user."""
+    id: int
+    code: str
+    title: str
+    url: Optional[str] = None
+    icon: Optional[str] = None
+    target: Optional[str] = None
+    item_type: str
+    is_external: bool
+    css_class: Optional[str] = None
+    full_path: str
+    metadata_info: dict[str, Any] = {}
+    children: list["MenuNodeResponse"] = []
+
+
+class MenuTreeResponse(BaseModel):
+    """Schema for the permission-filtered navigation tree."""
+    version: str
+    items: list[MenuNodeResponse]
@@ -0,0 +1,10 @@
+"""
+Services package for business logic operations.
+"""
+
+from .menu_tree import MenuTreeCache, menu_tree_cache
+
+__all__ = [
+    "MenuTreeCache",
+    "menu_tree_cache",
+]
@@ -0,0 +1,318 @@
+"""
+Precompiled menu tree with permission-filtered result caching.
+
+The active menu is loaded in a single query and compiled into an immutable
+in-memory tree. Filtered, pre-serialized menus are cached per
+(permission-set hash, role level), so serving navigation for a user is a
+dictionary lookup (plus, at most once a second, a change-stamp query) instead of an N+1 walk
+over ``menu_items``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.menu import MenuItem
+from app.models.permission import Permission
+from app.models.role import Role
+from app.schemas.menu import MenuTreeResponse
+
+logger = logging.getLogger(__name__)
+
+# Default role level used when a token does not carry one (lowest privilege)
+DEFAULT_ROLE_LEVEL = 999
+
+
+@dataclass(frozen=True)
+class MenuNode:
+    """Immutable menu tree node compiled from a ``MenuItem`` row."""
+
+    id: int
+    code: str
+    title: str
+    url: Optional[str]
+    icon: Optional[str]
+    target: Optional[str]
+    item_type: str
+    is_external: bool
+    css_class: Optional[str]
+    full_path: str
+    metadata_info: Any
+    required_permission: Optional[str]
+    required_role_level: Optional[int]
+    children: tuple["MenuNode", ...]
+
+    def can_access(self, user_permissions: frozenset, user_role_level: int) -> bool:
+        """Check access the same way as ``MenuItem.can_access`` for an active item."""
+        if self.required_permission and self.required_permission not in user_permissions:
+            return False
+        if self.required_role_level is not None and user_role_level > self.required_role_level:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class MenuTree:
+    """Compiled menu tree plus a digest of its content."""
+
+    roots: tuple[MenuNode, ...]
+    digest: str
+    size: int
+
+
+@dataclass(frozen=True)
+class CachedMenu:
+    """Filtered menu for one permission set, serialized once."""
+
+    etag: str
+    body: bytes
+
+
+_MENU_COLUMNS = (
+    MenuItem.id,
+    MenuItem.parent_id,
+    MenuItem.code,
+    MenuItem.title,
+    MenuItem.url,
+    MenuItem.icon,
+    MenuItem.target,
+    MenuItem.item_type,
+    MenuItem.is_external,
+    MenuItem.css_class,
+    MenuItem.metadata_info,
+    MenuItem.required_permission,
+    MenuItem.required_role_level,
+)
+
+
+def compile_menu_tree(rows: Iterable[Any]) -> MenuTree:
+    """
+    Compile active menu rows into an immutable tree.
+
+    Rows must be ordered by ``order_index``. Items whose parent is not part
+    of the row set (inactive or hidden parent) are unreachable and dropped;
+    nesting is capped at ``settings.max_menu_depth`` levels.
+    """
+    rows = list(rows)
+    children_by_parent: dict[Optional[int], list[Any]] = {}
+    for row in rows:
+        children_by_parent.setdefault(row.parent_id, []).append(row)
+
+    size = 0
+
+    def build(parent_id: Optional[int], parent_path: Optional[str], depth: int) -> tuple[MenuNode, ...]:
+        nonlocal size
+        if depth > settings.max_menu_depth:
+            return ()
+        nodes = []
+        for row in children_by_parent.get(parent_id, ()):
+            full_path = f"{parent_path} > {row.title}" if parent_path else row.title
+            size += 1
+            nodes.append(MenuNode(
+                id=row.id,
+                code=row.code,
+                title=row.title,
+                url=row.url,
+                icon=row.icon,
+                target=row.target,
+                item_type=row.item_type,
+                is_external=row.is_external,
+                css_class=row.css_class,
+                full_path=full_path,
+                metadata_info=row.metadata_info or {},
+                required_permission=row.required_permission,
+                required_role_level=row.required_role_level,
+                children=build(row.id, full_path, depth + 1),
+            ))
+        return tuple(nodes)
+
+    roots = build(None, None, 0)
+    digest = hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()
+    return MenuTree(roots=roots, digest=digest, size=size)
+
+
+def filter_menu_tree(
+    nodes: Iterable[MenuNode],
+    user_permissions: frozenset,
+    user_role_level: int
+) -> list[dict[str, Any]]:
+    """Return the accessible part of the tree as plain dictionaries."""
+    visible = []
+    for node in nodes:
+        if not node.can_access(user_permissions, user_role_level):
+            continue
+        children = filter_menu_tree(node.children, user_permissions, user_role_level)
+        # Dropdowns without any accessible entry would render empty
+        if node.item_type == "dropdown" and node.children and not children:
+            continue
+        visible.append({
+            "id": node.id,
+            "code": node.code,
+            "title": node.title,
+            "url": node.url,
+            "icon": node.icon,
+            "target": node.target,
+            "item_type": node.item_type,
+            "is_external": node.is_external,
+            "css_class": node.css_class,
+            "full_path": node.full_path,
+            "metadata_info": node.metadata_info,
+            "children": children,
+        })
+    return visible
+
+
+def permission_set_hash(permissions: Iterable[str]) -> str:
+    """Stable short hash of a permission set, independent of order and duplicates."""
+    return hashlib.sha1("\n".join(sorted(set(permissions))).encode()).hexdigest()[:16]
+
+
+class MenuTreeCache:
+    """
+    Process-local cache of the compiled menu tree and per-user filtered menus.
+
+    ``version`` is bumped whenever menus, roles or permissions are committed
+    through this process, which drops every cached tree and filtered result.
+    Changes committed by other workers or replicas are picked up through the
+    menu's change stamp (row count and latest ``updated_at`` of
+    ``menu_items``), read from the database at most every ``check_interval``
+    seconds, so lookups in between never touch the pool. The compiled tree is
+    additionally reloaded after ``ttl`` seconds, for changes that bypass
+    ``updated_at``.
+    """
+
+    def __init__(self, ttl: int, max_entries: int, check_interval: float = 1.0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.version = 0
+        self._tree: Optional[MenuTree] = None
+        self._tree_version = -1
+        self._tree_stamp: Optional[tuple] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._filtered: "OrderedDict[tuple[str, int], CachedMenu]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Bump the version, dropping the compiled tree and filtered results."""
+        self.version += 1
+        self._tree = None
+        self._filtered.clear()
+        logger.debug(f"Menu cache invalidated (version {self.version})")
+
+    @staticmethod
+    async def _change_stamp(db: AsyncSession) -> tuple:
+        """Shared view of the menu's state: changes with any insert, update or delete."""
+        result = await db.execute(select(func.count(MenuItem.id), func.max(MenuItem.updated_at)))
+        return tuple(result.one())
+
+    def _is_fresh(self, now: float) -> bool:
+        return (
+            self._tree is not None
+            and self._tree_version == self.version
+            and now - self._loaded_at <= self.ttl
+        )
+
+    async def get_tree(self, db: AsyncSession) -> MenuTree:
+        """Get the compiled tree, loading it with a single query when stale."""
+        now = time.monotonic()
+        if self._is_fresh(now) and now - self._checked_at < self.check_interval:
+            return self._tree
+
+        stamp = await self._change_stamp(db)
+        if self._is_fresh(now) and self._tree_stamp == stamp:
+            self._checked_at = now
+            return self._tree
+
+        async with self._lock:
+            if self._is_fresh(time.monotonic()) and self._tree_stamp == stamp:
+                return self._tree
+
+            version = self.version
+            result = await db.execute(
+                select(*_MENU_COLUMNS)
+                .where(MenuItem.is_active == True, MenuItem.is_visible == True)
+                .order_by(MenuItem.order_index, MenuItem.id)
+            )
+            tree = compile_menu_tree(result.all())
+
+            if self._tree is None or tree.digest != self._tree.digest:
+                self._filtered.clear()
+            if version == self.version:
+                self._tree = tree
+                self._tree_version = version
+                self._tree_stamp = stamp
+                self._loaded_at = self._checked_at = time.monotonic()
+            logger.debug(f"Menu tree compiled with {tree.size} items")
+            return tree
+
+    async def get_menu(
+        self,
+        db: AsyncSession,
+        user_permissions: Iterable[str],
+        user_role_level: int = DEFAULT_ROLE_LEVEL
+    ) -> CachedMenu:
+        """Get the filtered, serialized menu for a permission set and role level."""
+        user_permissions = frozenset(user_permissions)
+        key = (permission_set_hash(user_permissions), user_role_level)
+
+        tree = await self.get_tree(db)
+        cached = self._filtered.get(key)
+        if cached is not None:
+            self._filtered.move_to_end(key)
+            return cached
+
+        items = filter_menu_tree(tree.roots, user_permissions, user_role_level)
+        body = MenuTreeResponse(version=tree.digest[:16], items=items).model_dump_json().encode()
+        cached = CachedMenu(
+            etag=f'"{tree.digest[:16]}-{key[0]}-{user_role_level}"',
+            body=body,
+        )
+
+        if tree is self._tree:
+            self._filtered[key] = cached
+            if len(self._filtered) > self.max_entries:
+                self._filtered.popitem(last=False)
+        return cached
+
+
+menu_tree_cache = MenuTreeCache(
+    ttl=settings.default_menu_cache_ttl,
+    max_entries=settings.menu_cache_max_entries,
+    check_interval=settings.menu_cache_check_seconds
+)
+
+
+_INVALIDATING_MODELS = (MenuItem, Role, Permission)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_menu_changes(session, flush_context):
+    """Flag sessions that wrote menu, role or permission rows."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _INVALIDATING_MODELS):
+            session.info["menu_cache_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    """Bump the menu cache version once the change is durable."""
+    if session.info.pop("menu_cache_dirty", False):
+        menu_tree_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("menu_cache_dirty", None)
@@ -0,0 +1,61 @@
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_db, get_primary_read_db, get_read_db
+from app.main import app
+from app.middleware.auth import get_current_active_user
+from app.services.menu_tree import menu_tree_cache
+
+
+# Test database URL - using in-memory SQLite for tests
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+@pytest_asyncio.fixture
+async def test_db_engine():
+    """Create a test database engine for each test function."""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        echo=False,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield engine
+    
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def test_db_session(test_db_engine):
+    """Create a test database session and start from an empty menu cache."""
+    session_factory = async_sessionmaker(test_db_engine, class_=AsyncSession, expire_on_commit=False)
+    menu_tree_cache.invalidate()
+    
+    async with session_factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def test_client(test_db_session):
+    """Create a test client with database and user dependency overrides."""
+    current_user = {"id": 1, "is_active": True, "permissions": [], "role_level": 999}
+    
+    async def override_get_db():
+        yield test_db_session
+    
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_primary_read_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: current_user
+    
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        client.current_user = current_user
+        yield client
+    
+    app.dependency_overrides.clear()
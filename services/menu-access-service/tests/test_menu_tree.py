@@ -0,0 +1,147 @@
+"""
+Tests for the precompiled, cached menu tree.
+"""
+
+import pytest
+from sqlalchemy import event, insert
+
+from app.core import database
+from app.main import app
+from app.models import MenuItem
+from app.services.menu_tree import menu_tree_cache, permission_set_hash
+
+
+async def _seed_menu(db):
+    """Create: Dashboard, Admin (dropdown) -> Users, Roles; plus a hidden item."""
+    dashboard = MenuItem(code="dashboard", title="Dashboard", url="/", order_index=0)
+    admin = MenuItem(code="admin", title="Admin", item_type="dropdown", order_index=1)
+    db.add_all([dashboard, admin])
+    await db.flush()
+    db.add_all([
+        MenuItem(code="users", title="Users", url="/users", parent_id=admin.id,
+                 required_permission="manage_users", level=1, order_index=0),
+        MenuItem(code="roles", title="Roles", url="/roles", parent_id=admin.id,
+                 required_role_level=1, level=1, order_index=1),
+        MenuItem(code="hidden", title="Hidden", url="/hidden", is_visible=False, order_index=2),
+    ])
+    await db.commit()
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self)
+
+
+def test_permission_set_hash_ignores_order_and_duplicates():
+    assert permission_set_hash(["b", "a", "a"]) == permission_set_hash(["a", "b"])
+    assert permission_set_hash(["a"]) != permission_set_hash(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_menu_filtered_by_permissions_and_role_level(test_db_session):
+    await _seed_menu(test_db_session)
+
+    menu = await menu_tree_cache.get_menu(test_db_session, [], 999)
+    assert b'"dashboard"' in menu.body
+    assert b'"admin"' not in menu.body  # dropdown without accessible children
+    assert b'"hidden"' not in menu.body
+
+    menu = await menu_tree_cache.get_menu(test_db_session, ["manage_users"], 1)
+    assert b'"users"' in menu.body
+    assert b'"roles"' in menu.body
+    assert b'"Admin > Users"' in menu.body
+
+
+@pytest.mark.asyncio
+async def test_menu_served_from_memory_after_first_load(test_db_engine, test_db_session):
+    await _seed_menu(test_db_session)
+    await menu_tree_cache.get_menu(test_db_session, ["manage_users"], 5)
+
+    with QueryCounter(test_db_engine) as counter:
+        first = await menu_tree_cache.get_menu(test_db_session, ["manage_users"], 5)
+        other = await menu_tree_cache.get_menu(test_db_session, ["other"], 5)
+        again = await menu_tree_cache.get_menu(test_db_session, ["manage_users", "manage_users"], 5)
+
+    assert counter.count == 0
+    assert first is again
+    assert first.etag != other.etag
+
+
+@pytest.mark.asyncio
+async def test_menu_change_bumps_version(test_db_session):
+    await _seed_menu(test_db_session)
+    before = await menu_tree_cache.get_menu(test_db_session, [], 999)
+    version = menu_tree_cache.version
+
+    test_db_session.add(MenuItem(code="reports", title="Reports", url="/reports", order_index=3))
+    await test_db_session.commit()
+
+    after = await menu_tree_cache.get_menu(test_db_session, [], 999)
+    assert menu_tree_cache.version == version + 1
+    assert after.etag != before.etag
+    assert b'"reports"' in after.body
+
+
+@pytest.mark.asyncio
+async def test_menu_change_by_other_worker_is_picked_up(test_db_session, monkeypatch):
+    monkeypatch.setattr(menu_tree_cache, "check_interval", 0)
+    await _seed_menu(test_db_session)
+    before = await menu_tree_cache.get_menu(test_db_session, [], 999)
+    version = menu_tree_cache.version
+
+    # A Core insert skips the ORM flush, like a commit made by another worker
+    await test_db_session.execute(
+        insert(MenuItem).values(code="reports", title="Reports", url="/reports", order_index=3,
+                                level=0, item_type="link", is_external=False, is_active=True,
+                                is_visible=True)
+    )
+    await test_db_session.commit()
+
+    after = await menu_tree_cache.get_menu(test_db_session, [], 999)
+    assert menu_tree_cache.version == version
+    assert after.etag != before.etag
+    assert b'"reports"' in after.body
+
+
+@pytest.mark.asyncio
+async def test_menu_endpoint_supports_etag(test_client, test_db_session):
+    await _seed_menu(test_db_session)
+
+    response = await test_client.get("/api/v1/menus/tree")
+    assert response.status_code == 200
+    assert [item["code"] for item in response.json()["items"]] == ["dashboard"]
+    etag = response.headers["etag"]
+
+    response = await test_client.get("/api/v1/menus/tree", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_menu_endpoint_cache_hits_leave_the_pool_alone(test_client, test_db_engine, test_db_session, monkeypatch):
+    await _seed_menu(test_db_session)
+    monkeypatch.setitem(
+        database.read_only_engines,
+        database.engine,
+        test_db_engine.execution_options(**database.READ_ONLY_EXECUTION_OPTIONS)
+    )
+    del app.dependency_overrides[database.get_primary_read_db]
+    checkouts = []
+    event.listen(test_db_engine.sync_engine, "checkout", lambda *args: checkouts.append(args))
+
+    assert (await test_client.get("/api/v1/menus/tree")).status_code == 200
+    assert len(checkouts) == 1
+
+    assert (await test_client.get("/api/v1/menus/tree")).status_code == 200
+    assert len(checkouts) == 1
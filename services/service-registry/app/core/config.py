@@ -34,6 +34,12 @@ class Settings(BaseSettings):
     # Authentication Service
     AUTH_SERVICE_URL: str = "http://user-auth-service:8000"
     
+    # Distributed tracing: "none", "otlp" (OTLP/HTTP collector at
+    # OTEL_EXPORTER_OTLP_ENDPOINT) or "file" (JSON lines at TRACING_FILE)
+    TRACING_EXPORTER: str = "none"
+    TRACING_SAMPLE_RATE: float = 0.1
+    TRACING_FILE: str = "traces.jsonl"
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
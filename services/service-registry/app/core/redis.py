@@ -6,19 +6,21 @@ import json
 import redis
 from typing import Optional, Dict, Any, List
 from app.core.config import settings
+from app.core.metrics import instrument_redis
+from app.core.tracing import trace_redis
 
 
 class RedisClient:
     """Redis client for service registry operations."""
     
     def __init__(self):
-        self.redis = redis.Redis(
+        self.redis = instrument_redis(trace_redis(redis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
             decode_responses=True
-        )
+        )))
     
     async def ping(self) -> bool:
         """Test Redis connection."""
@@ -8,6 +8,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
 from app.core.redis import redis_client
 from app.routers import services
 from app.services.registry import registry_service
@@ -39,6 +41,15 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting Service Registry...")
     
+    # Export spans from this worker
+    if configure_tracing(
+        "service-registry",
+        settings.TRACING_EXPORTER.lower(),
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        file_path=settings.TRACING_FILE,
+    ):
+        print(f"✓ Tracing enabled ({settings.TRACING_EXPORTER} exporter)")
+    
     # Test Redis connection
     if await redis_client.ping():
         print("✓ Redis connection established")
@@ -64,6 +75,7 @@ async def lifespan(app: FastAPI):
     
     # Close HTTP client
     await registry_service.close()
+    shutdown_tracing()
     
     print("✓ Service Registry stopped")
 
@@ -85,6 +97,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics, served at /metrics
+app.add_middleware(MetricsMiddleware)
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# Request spans continuing the caller's trace (outermost)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(services.router, prefix="/api/v1")
 
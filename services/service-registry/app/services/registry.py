@@ -7,6 +7,8 @@ import httpx
 import asyncio
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+from app.core.metrics import instrument_http_client
+from app.core.tracing import trace_http_client
 from app.core.redis import redis_client
 from app.schemas.service import (
     ServiceInstance, 
@@ -23,7 +25,7 @@ class ServiceRegistryService:
     """Service registry business logic."""
     
     def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=10.0)
+        self.http_client = instrument_http_client(trace_http_client(httpx.AsyncClient(timeout=10.0)))
     
     async def register_service(self, registration: ServiceRegistration) -> ServiceInstance:
         """Register a new service instance."""
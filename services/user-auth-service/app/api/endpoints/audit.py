@@ -3,17 +3,21 @@ Audit log API endpoints for security monitoring and compliance.
 Provides read-only access to audit logs for administrators.
 """
 
-from typing import Optional, List
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Optional, List
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.routers.auth import get_current_user, get_admin_user
 from app.models.user import User
 from app.models.audit_log import AuditLog, AuditAction, AuditSeverity
-from app.services.audit_service import AuditService
+from app.services.audit_service import AuditService, resolve_audit_log_fields
 
 
 router = APIRouter()
@@ -61,31 +65,34 @@ class AuditLogListResponse(BaseModel):
     limit: int
     offset: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
-@router.get(
-    "/logs",
-    response_model=AuditLogListResponse,
-    summary="Get audit logs",
-    description="Retrieve audit logs with filtering and pagination options"
-)
-async def get_audit_logs(
-    user_id: Optional[int] = Query(None, description="Filter by user ID"),
-    action: Optional[str] = Query(None, description="Filter by action type"),
-    severity: Optional[str] = Query(None, description="Filter by severity level"),
-    start_date: Optional[datetime] = Query(None, description="Filter by start date"),
-    end_date: Optional[datetime] = Query(None, description="Filter by end date"),
-    ip_address: Optional[str] = Query(None, description="Filter by IP address"),
-    success: Optional[bool] = Query(None, description="Filter by success status"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
-    offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
-):
-    """
-    Get audit logs with filtering options.
-    Requires 'audit:read' permission.
-    """
+# Columns selected for AuditLogResponse (metadata is stored as additional_data)
+RESPONSE_FIELDS = [
+    "id", "action", "severity", "description", "user_id", "target_user_id",
+    "service_id", "service_name", "ip_address", "endpoint", "http_method",
+    "response_status", "success", "error_message", "additional_data", "tags",
+    "created_at",
+]
+
+# Rows fetched per server-side cursor batch by the export
+EXPORT_BATCH_SIZE = 1000
+
+
+def _log_response(row: Dict[str, Any]) -> AuditLogResponse:
+    """Build a response from an audit log row selected with RESPONSE_FIELDS."""
+    fields = {name: value for name, value in row.items() if name != "additional_data"}
+    return AuditLogResponse(**fields, metadata=row["additional_data"])
+
+
+def _validate_filters(
+    action: Optional[str],
+    severity: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> None:
+    """Reject inconsistent date ranges and unknown actions or severities."""
     # Validate date range
     if start_date and end_date and start_date > end_date:
         raise HTTPException(
@@ -112,56 +119,164 @@ async def get_audit_logs(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid severity level: {severity}"
             )
+
+
+@router.get(
+    "/logs",
+    response_model=AuditLogListResponse,
+    summary="Get audit logs",
+    description="Retrieve audit logs with filtering and pagination options"
+)
+async def get_audit_logs(
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    action: Optional[str] = Query(None, description="Filter by action type"),
+    severity: Optional[str] = Query(None, description="Filter by severity level"),
+    start_date: Optional[datetime] = Query(None, description="Filter by start date"),
+    end_date: Optional[datetime] = Query(None, description="Filter by end date"),
+    ip_address: Optional[str] = Query(None, description="Filter by IP address"),
+    success: Optional[bool] = Query(None, description="Filter by success status"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Number of results to skip (ignored with a cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Get audit logs with filtering options.
+    Requires 'audit:read' permission.
+    
+    Pass the returned next_cursor to fetch the following page; unlike
+    offset, cursor pagination costs the same on every page.
+    """
+    _validate_filters(action, severity, start_date, end_date)
     
     # Get logs
-    logs = await AuditService.get_audit_logs(
+    try:
+        rows, next_cursor = await AuditService.get_audit_log_page(
+            db=db,
+            fields=RESPONSE_FIELDS,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            user_id=user_id,
+            action=action,
+            severity=severity,
+            start_date=start_date,
+            end_date=end_date,
+            ip_address=ip_address,
+            success=success
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    log_responses = [_log_response(row) for row in rows]
+    
+    return AuditLogListResponse(
+        logs=log_responses,
+        total=len(log_responses),
+        limit=limit,
+        offset=0 if cursor else offset,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor
+    )
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def _ndjson_lines(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[str]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps({name: _export_value(value) for name, value in row.items()}) + "\n"
+            for row in rows
+        )
+
+
+async def _csv_lines(batches: AsyncIterator[List[Dict[str, Any]]], fields: List[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue()
+    
+    async for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([
+                json.dumps(value) if isinstance(value, (dict, list)) else _export_value(value)
+                for value in row.values()
+            ])
+        yield buffer.getvalue()
+
+
+@router.get(
+    "/logs/export",
+    summary="Export audit logs",
+    description="Stream all matching audit logs as NDJSON or CSV"
+)
+async def export_audit_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated columns; defaults to all but user_agent, client_info, request_data and additional_data"
+    ),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    action: Optional[str] = Query(None, description="Filter by action type"),
+    severity: Optional[str] = Query(None, description="Filter by severity level"),
+    start_date: Optional[datetime] = Query(None, description="Filter by start date"),
+    end_date: Optional[datetime] = Query(None, description="Filter by end date"),
+    ip_address: Optional[str] = Query(None, description="Filter by IP address"),
+    success: Optional[bool] = Query(None, description="Filter by success status"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Export matching audit logs, newest first, for compliance reviews.
+    Requires 'audit:read' permission.
+    
+    Rows are read through a server-side cursor and streamed as they are
+    fetched, so exports of any size run in constant memory.
+    """
+    _validate_filters(action, severity, start_date, end_date)
+    
+    try:
+        columns = resolve_audit_log_fields(
+            [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    batches = AuditService.stream_audit_logs(
         db=db,
+        fields=columns,
+        batch_size=EXPORT_BATCH_SIZE,
         user_id=user_id,
         action=action,
         severity=severity,
         start_date=start_date,
         end_date=end_date,
         ip_address=ip_address,
-        success=success,
-        limit=limit + 1,  # Get one extra to check if there are more
-        offset=offset
+        success=success
     )
     
-    # Check if there are more results
-    has_more = len(logs) > limit
-    if has_more:
-        logs = logs[:limit]  # Remove the extra log
-    
-    # Convert to response models
-    log_responses = [
-        AuditLogResponse(
-            id=log.id,
-            action=log.action,
-            severity=log.severity,
-            description=log.description,
-            user_id=log.user_id,
-            target_user_id=log.target_user_id,
-            service_id=log.service_id,
-            service_name=log.service_name,
-            ip_address=log.ip_address,
-            endpoint=log.endpoint,
-            http_method=log.http_method,
-            response_status=log.response_status,
-            success=log.success,
-            error_message=log.error_message,
-            metadata=log.metadata,
-            tags=log.tags,
-            created_at=log.created_at
+    if format == "csv":
+        return StreamingResponse(
+            _csv_lines(batches, columns),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="audit_logs.csv"'}
         )
-        for log in logs
-    ]
-    
-    return AuditLogListResponse(
-        logs=log_responses,
-        total=len(log_responses),
-        limit=limit,
-        offset=offset,
-        has_more=has_more
+    return StreamingResponse(
+        _ndjson_lines(batches),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="audit_logs.ndjson"'}
     )
 
 
@@ -172,8 +287,8 @@ async def get_audit_logs(
     description="Get security metrics and summary for specified time period"
 )
 async def get_security_summary(
-    hours: int = Query(24, ge=1, le=168, description="Number of hours to analyze (max 7 days)"),
-    db: AsyncSession = Depends(get_db),
+    hours: int = Query(24, ge=1, le=720, description="Number of hours to analyze (max 30 days)"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_admin_user)
 ):
     """
@@ -227,7 +342,7 @@ async def get_user_recent_audit_logs(
     user_id: int,
     limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_admin_user)
 ):
     """
@@ -236,36 +351,15 @@ async def get_user_recent_audit_logs(
     """
     start_date = datetime.utcnow() - timedelta(hours=hours)
     
-    logs = await AuditService.get_audit_logs(
+    rows, _ = await AuditService.get_audit_log_page(
         db=db,
+        fields=RESPONSE_FIELDS,
         user_id=user_id,
         start_date=start_date,
-        limit=limit,
-        offset=0
+        limit=limit
     )
     
-    return [
-        AuditLogResponse(
-            id=log.id,
-            action=log.action,
-            severity=log.severity,
-            description=log.description,
-            user_id=log.user_id,
-            target_user_id=log.target_user_id,
-            service_id=log.service_id,
-            service_name=log.service_name,
-            ip_address=log.ip_address,
-            endpoint=log.endpoint,
-            http_method=log.http_method,
-            response_status=log.response_status,
-            success=log.success,
-            error_message=log.error_message,
-            metadata=log.metadata,
-            tags=log.tags,
-            created_at=log.created_at
-        )
-        for log in logs
-    ]
+    return [_log_response(row) for row in rows]
 
 
 @router.get(
@@ -278,7 +372,7 @@ async def get_failed_login_attempts(
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
     ip_address: Optional[str] = Query(None, description="Filter by IP address"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of results"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_admin_user)
 ):
     """
@@ -287,38 +381,17 @@ async def get_failed_login_attempts(
     """
     start_date = datetime.utcnow() - timedelta(hours=hours)
     
-    logs = await AuditService.get_audit_logs(
+    rows, _ = await AuditService.get_audit_log_page(
         db=db,
+        fields=RESPONSE_FIELDS,
         action=AuditAction.LOGIN_FAILED.value,
         start_date=start_date,
         ip_address=ip_address,
         success=False,
-        limit=limit,
-        offset=0
+        limit=limit
     )
     
-    return [
-        AuditLogResponse(
-            id=log.id,
-            action=log.action,
-            severity=log.severity,
-            description=log.description,
-            user_id=log.user_id,
-            target_user_id=log.target_user_id,
-            service_id=log.service_id,
-            service_name=log.service_name,
-            ip_address=log.ip_address,
-            endpoint=log.endpoint,
-            http_method=log.http_method,
-            response_status=log.response_status,
-            success=log.success,
-            error_message=log.error_message,
-            metadata=log.metadata,
-            tags=log.tags,
-            created_at=log.created_at
-        )
-        for log in logs
-    ]
+    return [_log_response(row) for row in rows]
 
 
 @router.get(
@@ -331,7 +404,7 @@ async def get_suspicious_activities(
     hours: int = Query(24, ge=1, le=168, description="Number of hours to look back"),
     severity: Optional[str] = Query(None, description="Filter by severity level"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of results"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_admin_user)
 ):
     """
@@ -350,34 +423,13 @@ async def get_suspicious_activities(
     
     start_date = datetime.utcnow() - timedelta(hours=hours)
     
-    logs = await AuditService.get_audit_logs(
+    rows, _ = await AuditService.get_audit_log_page(
         db=db,
+        fields=RESPONSE_FIELDS,
         action=AuditAction.SUSPICIOUS_ACTIVITY.value,
         start_date=start_date,
         severity=severity,
-        limit=limit,
-        offset=0
+        limit=limit
     )
     
-    return [
-        AuditLogResponse(
-            id=log.id,
-            action=log.action,
-            severity=log.severity,
-            description=log.description,
-            user_id=log.user_id,
-            target_user_id=log.target_user_id,
-            service_id=log.service_id,
-            service_name=log.service_name,
-            ip_address=log.ip_address,
-            endpoint=log.endpoint,
-            http_method=log.http_method,
-            response_status=log.response_status,
-            success=log.success,
-            error_message=log.error_message,
-            metadata=log.metadata,
-            tags=log.tags,
-            created_at=log.created_at
-        )
-        for log in logs
-    ]
\ No newline at end of file
+    return [_log_response(row) for row in rows]
\ No newline at end of file
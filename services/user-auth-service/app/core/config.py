@@ -1,3 +1,4 @@
+import json
 import os
 from typing import Optional
 
@@ -15,11 +16,21 @@ class Settings(BaseModel):
     "sqlite+aiosqlite:///./user_auth.db"
   )
   
+  # Read replicas (comma separated URLs); reads fall back to the primary
+  database_replica_urls: list = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+  ]
+  replica_max_lag_seconds: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+  replica_lag_check_interval: float = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+  read_your_writes_seconds: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+  
   # JWT Settings
   secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
   algorithm: str = "HS256"
   access_token_expire_minutes: int = 15
   refresh_token_expire_days: int = 7
+  # Embed permissions as a registry bitmask ("pbits") instead of a code list
+  compact_permission_tokens: bool = os.getenv("COMPACT_PERMISSION_TOKENS", "false").lower() == "true"
   
   # Environment
   environment: str = os.getenv("ENVIRONMENT", "development")
@@ -31,9 +42,81 @@ class Settings(BaseModel):
   # Redis (for rate limiting and caching)
   redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
   
+  # Resolved permission cache: "none", "memory" (single worker) or "redis"
+  permission_cache: str = os.getenv("PERMISSION_CACHE", "none").lower()
+  permission_cache_ttl_seconds: int = int(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "300"))
+  
+  # Refresh-token sessions: "database" (user_sessions table) or "redis"
+  session_store: str = os.getenv("SESSION_STORE", "database").lower()
+  session_redis_url: str = os.getenv("SESSION_REDIS_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+  # With the Redis store, replay session changes to user_sessions in the background
+  session_db_write_behind: bool = os.getenv("SESSION_DB_WRITE_BEHIND", "true").lower() == "true"
+  
+  # Background cleanup of expired sessions, service tokens and password history
+  gc_enabled: bool = os.getenv("GC_ENABLED", "true").lower() == "true"
+  gc_interval_seconds: float = float(os.getenv("GC_INTERVAL_SECONDS", "3600"))
+  gc_batch_size: int = int(os.getenv("GC_BATCH_SIZE", "1000"))
+  gc_batch_pause_seconds: float = float(os.getenv("GC_BATCH_PAUSE_SECONDS", "0.1"))
+  gc_revoked_retention_days: int = int(os.getenv("GC_REVOKED_RETENTION_DAYS", "30"))
+  
+  # Partition maintenance of audit_logs (PostgreSQL): "month" or "day" partitions,
+  # retention in days (0 keeps everything), optional archive directory for
+  # expired partitions
+  audit_partitioning_enabled: bool = os.getenv("AUDIT_PARTITIONING_ENABLED", "true").lower() == "true"
+  audit_partition_interval: str = os.getenv("AUDIT_PARTITION_INTERVAL", "month").lower()
+  audit_partition_premake: int = int(os.getenv("AUDIT_PARTITION_PREMAKE", "3"))
+  audit_retention_days: int = int(os.getenv("AUDIT_RETENTION_DAYS", "365"))
+  audit_archive_dir: str = os.getenv("AUDIT_ARCHIVE_DIR", "")
+  audit_partition_check_seconds: float = float(os.getenv("AUDIT_PARTITION_CHECK_SECONDS", "21600"))
+  # Hourly audit rollups read by the security summary
+  audit_rollups_enabled: bool = os.getenv("AUDIT_ROLLUPS_ENABLED", "true").lower() == "true"
+  audit_rollup_interval_seconds: float = float(os.getenv("AUDIT_ROLLUP_INTERVAL_SECONDS", "300"))
+  audit_rollup_recompute_hours: int = int(os.getenv("AUDIT_ROLLUP_RECOMPUTE_HOURS", "2"))
+  audit_rollup_backfill_days: int = int(os.getenv("AUDIT_ROLLUP_BACKFILL_DAYS", "31"))
+  
   # Security settings
   rate_limiting_enabled: bool = os.getenv("RATE_LIMITING_ENABLED", "true").lower() == "true"
   audit_logging_enabled: bool = os.getenv("AUDIT_LOGGING_ENABLED", "true").lower() == "true"
+  # Proxies (JSON list of addresses/CIDRs) whose X-Forwarded-For is trusted
+  # for the rate-limited client address, e.g. Kong on the container network
+  trusted_proxies: list = json.loads(
+    os.getenv("TRUSTED_PROXIES", '["127.0.0.1/32", "10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16"]')
+  )
+  # Route policy overrides as JSON, path prefix -> {"limit", "window", "audit_class",
+  # "sensitive", "exact"}, merged over the defaults in app/middleware/route_policy.py
+  route_policies: dict = json.loads(os.getenv("ROUTE_POLICIES", "{}"))
+  # Substrings flagging suspicious requests (JSON lists, matched case-insensitively)
+  suspicious_user_agents: list = json.loads(
+    os.getenv("SUSPICIOUS_USER_AGENTS", '["sqlmap", "nikto", "dirb", "gobuster", "scanner"]')
+  )
+  attack_path_patterns: list = json.loads(
+    os.getenv("ATTACK_PATH_PATTERNS", '["../", "script>", "select ", "union ", "drop ", "exec("]')
+  )
+  
+  # Threads comparing password history hashes off the event loop (per worker)
+  bcrypt_workers: int = int(os.getenv("BCRYPT_WORKERS", "4"))
+  
+  # Breached passwords rejected like the built-in common passwords: an index
+  # built by app/scripts/build_breached_index.py (memory-mapped, shared by the
+  # workers) or a plain list held in a Bloom filter with the given false
+  # positive rate
+  breached_passwords_file: str = os.getenv("BREACHED_PASSWORDS_FILE", "")
+  breached_passwords_false_positive_rate: float = float(
+    os.getenv("BREACHED_PASSWORDS_FALSE_POSITIVE_RATE", "0.000001")
+  )
+  
+  # Opt-in profiling (off unless PROFILING_SECRET is set): fraction of requests
+  # whose stacks are sampled, and the sampling interval
+  profiling_secret: str = os.getenv("PROFILING_SECRET", "")
+  profiling_sample_rate: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+  profiling_sample_interval_ms: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+  
+  # Distributed tracing: "none", "otlp" (OTLP/HTTP collector at
+  # OTEL_EXPORTER_OTLP_ENDPOINT) or "file" (JSON lines at TRACING_FILE); fraction
+  # of new traces recorded (incoming trace contexts keep their decision)
+  tracing_exporter: str = os.getenv("TRACING_EXPORTER", "none").lower()
+  tracing_sample_rate: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+  tracing_file: str = os.getenv("TRACING_FILE", "traces.jsonl")
   
 
 
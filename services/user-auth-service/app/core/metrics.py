@@ -0,0 +1,318 @@
+"""
+Prometheus instrumentation shared by the M-ERP services.
+
+The same module lives in every Python service under app/core/metrics.py
+(keep the copies in sync). It records:
+
+- per route template: request latency, responses by status class, database
+  queries per request and time spent in them
+- requests in flight
+- database query durations by statement type (SQLAlchemy engine events)
+- Redis command and outgoing HTTP call latencies
+
+and serves them at /metrics. Label children are bound once per route,
+command or host and cached, so a request costs a few dictionary lookups
+and histogram observations. With several worker processes set
+PROMETHEUS_MULTIPROC_DIR (to an empty directory) so /metrics aggregates
+all workers.
+"""
+
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from prometheus_client import (
+  CONTENT_TYPE_LATEST,
+  REGISTRY,
+  CollectorRegistry,
+  Counter,
+  Gauge,
+  Histogram,
+  generate_latest,
+  multiprocess,
+)
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "<unmatched>"
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+DB_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+REQUEST_LATENCY = Histogram(
+  "http_request_duration_seconds",
+  "Request latency by route template",
+  ["method", "route"],
+)
+REQUESTS = Counter(
+  "http_requests_total",
+  "Responses by route template and status class",
+  ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+  "http_request_db_queries",
+  "Database queries issued per request",
+  ["method", "route"],
+  buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+REQUEST_DB_SECONDS = Counter(
+  "http_request_db_seconds",
+  "Time spent in database queries while serving requests",
+  ["method", "route"],
+)
+IN_FLIGHT = Gauge(
+  "http_requests_in_flight",
+  "Requests being served",
+  multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+  "db_query_duration_seconds",
+  "Database query duration by statement type",
+  ["operation"],
+  buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REDIS_LATENCY = Histogram(
+  "redis_command_duration_seconds",
+  "Redis command latency",
+  ["command"],
+  buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+HTTP_CLIENT_LATENCY = Histogram(
+  "http_client_request_duration_seconds",
+  "Outgoing HTTP request latency (until response headers) by host",
+  ["host"],
+)
+
+_DB_QUERY_CHILDREN = {operation: DB_QUERY_DURATION.labels(operation.lower()) for operation in DB_OPERATIONS}
+_DB_QUERY_OTHER = DB_QUERY_DURATION.labels("other")
+_REDIS_CHILDREN: Dict[str, Any] = {}
+_HTTP_CLIENT_CHILDREN: Dict[str, Any] = {}
+
+
+class RequestStats:
+  """
+  Time the request being served spent in databases, Redis and HTTP calls.
+
+  ``timings`` holds further named timings (see record_timing); it is only
+  set, and filled, for requests being profiled.
+  """
+
+  __slots__ = ("db_queries", "db_seconds", "redis_seconds", "http_seconds", "timings")
+
+  def __init__(self):
+    self.db_queries = 0
+    self.db_seconds = 0.0
+    self.redis_seconds = 0.0
+    self.http_seconds = 0.0
+    self.timings: Optional[Dict[str, float]] = None
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+  """Stats of the request being served, None outside requests."""
+  return _request_stats.get()
+
+
+def record_timing(name: str, seconds: float) -> None:
+  """Add ``seconds`` to a named timing of the request, if it is being profiled."""
+  stats = _request_stats.get()
+  if stats is not None and stats.timings is not None:
+    stats.timings[name] = stats.timings.get(name, 0.0) + seconds
+
+
+class RouteMetrics:
+  """Metric children bound to one route template and method."""
+
+  __slots__ = ("latency", "db_queries", "db_seconds", "responses")
+
+  def __init__(self, method: str, route: str):
+    self.latency = REQUEST_LATENCY.labels(method, route)
+    self.db_queries = REQUEST_DB_QUERIES.labels(method, route)
+    self.db_seconds = REQUEST_DB_SECONDS.labels(method, route)
+    self.responses = tuple(REQUESTS.labels(method, route, status) for status in STATUS_CLASSES)
+
+  def observe(self, elapsed: float, status_code: int, stats: RequestStats) -> None:
+    self.latency.observe(elapsed)
+    self.db_queries.observe(stats.db_queries)
+    self.db_seconds.inc(stats.db_seconds)
+    self.responses[min(max(status_code // 100, 1), 5) - 1].inc()
+
+
+class MetricsMiddleware:
+  """
+  Pure ASGI middleware recording request metrics per route template.
+
+  The route template comes from the route FastAPI matched (``scope["route"]``),
+  so paths with IDs share one series; unmatched paths share a single
+  ``<unmatched>`` series.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+    self._routes: Dict[str, Dict[str, RouteMetrics]] = {}
+
+  def _route_metrics(self, scope: Scope) -> RouteMetrics:
+    template = getattr(scope.get("route"), "path_format", UNMATCHED_ROUTE)
+    by_method = self._routes.get(template)
+    if by_method is None:
+      by_method = self._routes[template] = {}
+    method = scope["method"]
+    metrics = by_method.get(method)
+    if metrics is None:
+      metrics = by_method[method] = RouteMetrics(method, template)
+    return metrics
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    status_code = 500
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal status_code
+      if message["type"] == "http.response.start":
+        status_code = message["status"]
+      await send(message)
+
+    IN_FLIGHT.inc()
+    started = time.perf_counter()
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      elapsed = time.perf_counter() - started
+      IN_FLIGHT.dec()
+      _request_stats.reset(token)
+      self._route_metrics(scope).observe(elapsed, status_code, stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+  starts = conn.info.get("metrics_query_start")
+  if not starts:
+    return
+  elapsed = time.perf_counter() - starts.pop()
+  _DB_QUERY_CHILDREN.get(statement[:6].upper(), _DB_QUERY_OTHER).observe(elapsed)
+  stats = _request_stats.get()
+  if stats is not None:
+    stats.db_queries += 1
+    stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+  # after_cursor_execute does not run for failed statements
+  connection = exception_context.connection
+  if connection is not None:
+    starts = connection.info.get("metrics_query_start")
+    if starts:
+      starts.pop()
+
+
+def instrument_engine(engine) -> None:
+  """Record query metrics for a (sync or async) SQLAlchemy engine."""
+  # Imported here: the service registry has no database
+  from sqlalchemy import event
+
+  sync_engine = getattr(engine, "sync_engine", engine)
+  if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+    return
+  event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+  event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+  event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _redis_child(command) -> Any:
+  child = _REDIS_CHILDREN.get(command)
+  if child is None:
+    name = command.decode() if isinstance(command, bytes) else str(command)
+    child = _REDIS_CHILDREN[command] = REDIS_LATENCY.labels(name.upper())
+  return child
+
+
+def _observe_redis(command, elapsed: float) -> None:
+  _redis_child(command).observe(elapsed)
+  stats = _request_stats.get()
+  if stats is not None:
+    stats.redis_seconds += elapsed
+
+
+def _timed(call, command: Optional[str] = None):
+  """Wrap a Redis client method, labelled by ``command`` or its first argument."""
+  if asyncio.iscoroutinefunction(call):
+    async def timed(*args, **kwargs):
+      started = time.perf_counter()
+      try:
+        return await call(*args, **kwargs)
+      finally:
+        _observe_redis(command or args[0], time.perf_counter() - started)
+  else:
+    def timed(*args, **kwargs):
+      started = time.perf_counter()
+      try:
+        return call(*args, **kwargs)
+      finally:
+        _observe_redis(command or args[0], time.perf_counter() - started)
+  return timed
+
+
+def instrument_redis(client):
+  """Time every command (and pipeline execution) of a redis client instance."""
+  client.execute_command = _timed(client.execute_command)
+  pipeline = client.pipeline
+
+  def timed_pipeline(*args, **kwargs):
+    pipe = pipeline(*args, **kwargs)
+    pipe.execute = _timed(pipe.execute, "PIPELINE")
+    return pipe
+
+  client.pipeline = timed_pipeline
+  return client
+
+
+def _http_client_child(host: str) -> Any:
+  child = _HTTP_CLIENT_CHILDREN.get(host)
+  if child is None:
+    child = _HTTP_CLIENT_CHILDREN[host] = HTTP_CLIENT_LATENCY.labels(host)
+  return child
+
+
+async def _on_http_request(request) -> None:
+  request.extensions["metrics_start"] = time.perf_counter()
+
+
+async def _on_http_response(response) -> None:
+  started = response.request.extensions.get("metrics_start")
+  if started is not None:
+    elapsed = time.perf_counter() - started
+    _http_client_child(response.request.url.host).observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+      stats.http_seconds += elapsed
+
+
+def instrument_http_client(client):
+  """Time the requests of an httpx.AsyncClient through its event hooks."""
+  hooks = client.event_hooks
+  client.event_hooks = {
+    "request": [*hooks["request"], _on_http_request],
+    "response": [*hooks["response"], _on_http_response],
+  }
+  return client
+
+
+async def metrics_endpoint() -> Response:
+  """Prometheus text exposition of all metrics."""
+  if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+  else:
+    registry = REGISTRY
+  return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
@@ -5,12 +6,27 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.core.database import close_db
+from app.core.database import close_db, async_session_factory
+from app.core.metrics import MetricsMiddleware, instrument_http_client, metrics_endpoint
+from app.core.profiling import install_profiling, stack_sampler
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing, trace_http_client
 from app.core.service_registry_client import ServiceRegistryClient
 from app.routers import auth, service_auth, token_validation, audit, password_policy
-# from app.middleware.rate_limiting import rate_limit_middleware
-from app.middleware.security_headers import security_headers_middleware, request_id_middleware
-# from app.middleware.audit_middleware import audit_middleware
+from app.services.audit_partitions import audit_partition_manager
+from app.services.audit_rollups import audit_rollup_job
+from app.services.audit_writer import audit_writer
+from app.services.garbage_collector import garbage_collector
+from app.services.password_service import PasswordService
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import permission_registry
+from app.services.session_store import session_store
+from app.middleware.security_pipeline import (
+  AuditStage,
+  RateLimitStage,
+  RequestIdStage,
+  SecurityHeadersStage,
+  SecurityPipelineMiddleware,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +47,53 @@ async def lifespan(app: FastAPI):
   logger.info("Starting up User Authentication Service...")
   logger.info("Database migrations handled by startup script")
   
+  # Export spans from this worker
+  if configure_tracing(
+    "user-auth-service",
+    settings.tracing_exporter,
+    sample_rate=settings.tracing_sample_rate,
+    file_path=settings.tracing_file,
+  ):
+    logger.info(f"Tracing enabled ({settings.tracing_exporter} exporter)")
+  
+  # Load permission bit assignments shared by all workers
+  try:
+    async with async_session_factory() as db:
+      await permission_registry.sync_from_roles(db)
+    logger.info(f"Permission registry loaded with {len(permission_registry)} permissions")
+  except Exception as e:
+    logger.error(f"Permission registry sync error: {e}")
+  
+  # Breached password list behind the common password rule
+  if settings.breached_passwords_file:
+    try:
+      count = await asyncio.to_thread(
+        PasswordService.load_breached_passwords,
+        settings.breached_passwords_file,
+        settings.breached_passwords_false_positive_rate,
+      )
+      logger.info(f"Loaded {count} breached passwords")
+    except OSError as e:
+      logger.error(f"Breached password list error: {e}")
+  
+  # Persist audit entries from hot paths (login) off the request path
+  audit_writer.start()
+  
+  # Start the session store (write-behind persistence for the Redis store)
+  await session_store.start()
+  
+  # Periodic batched cleanup of expired sessions, tokens and password history
+  if settings.gc_enabled:
+    garbage_collector.start()
+  
+  # Pre-create upcoming audit_logs partitions and drop expired ones
+  if settings.audit_partitioning_enabled:
+    audit_partition_manager.start()
+  
+  # Hourly audit rollups behind the security summary
+  if settings.audit_rollups_enabled:
+    audit_rollup_job.start()
+  
   # Register with service registry
   try:
     registry_client = ServiceRegistryClient(
@@ -44,6 +107,7 @@ async def lifespan(app: FastAPI):
         "capabilities": ["login", "registration", "jwt-tokens", "user-management"]
       }
     )
+    instrument_http_client(trace_http_client(registry_client.http_client))
     
     success = await registry_client.register()
     if success:
@@ -67,8 +131,16 @@ async def lifespan(app: FastAPI):
     except Exception as e:
       logger.error(f"Service registry deregistration error: {e}")
   
+  stack_sampler.stop()
+  await garbage_collector.stop()
+  await audit_partition_manager.stop()
+  await audit_rollup_job.stop()
+  await audit_writer.stop()
+  await session_store.close()
+  await permission_cache.close()
   await close_db()
   logger.info("Database connections closed")
+  shutdown_tracing()
 
 
 def create_application() -> FastAPI:
@@ -80,11 +152,14 @@ def create_application() -> FastAPI:
     lifespan=lifespan,
   )
   
-  # Security middleware (order is important)
-  application.middleware("http")(request_id_middleware)
-  application.middleware("http")(security_headers_middleware)
-  # application.middleware("http")(rate_limit_middleware)
-  # application.middleware("http")(audit_middleware)
+  # Security middleware: one raw ASGI middleware, stages run in order
+  security_stages = [RequestIdStage(), SecurityHeadersStage()]
+  if settings.audit_logging_enabled:
+    # Before rate limiting, so rejected requests are audited too
+    security_stages.append(AuditStage())
+  if settings.rate_limiting_enabled:
+    security_stages.append(RateLimitStage())
+  application.add_middleware(SecurityPipelineMiddleware, stages=security_stages)
   
   # CORS middleware
   application.add_middleware(
@@ -95,6 +170,22 @@ def create_application() -> FastAPI:
     allow_headers=["*"],
   )
   
+  # Opt-in profiling (runs inside the metrics middleware, whose request stats it reads)
+  if settings.profiling_secret:
+    install_profiling(
+      application,
+      settings.profiling_secret,
+      sample_rate=settings.profiling_sample_rate,
+      sample_interval=settings.profiling_sample_interval_ms / 1000,
+    )
+  
+  # Request metrics (the time includes the middleware added before)
+  application.add_middleware(MetricsMiddleware)
+  application.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+  
+  # Request spans continuing the caller's trace (outermost)
+  application.add_middleware(TracingMiddleware)
+  
   # Include routers
   application.include_router(auth.router)
   application.include_router(auth.admin_router)
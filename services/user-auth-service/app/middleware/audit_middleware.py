@@ -13,14 +13,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.audit_service import AuditService
 from app.models.audit_log import AuditAction, AuditSeverity
 from app.core.database import get_db
+from app.middleware.route_policy import RoutePolicy, route_policies
 
 
 class AuditContext:
     """Context manager for audit logging during request processing."""
     
-    def __init__(self, request: Request, db: AsyncSession):
+    def __init__(self, request: Request, db: AsyncSession, defer: bool = False):
         self.request = request
         self.db = db
+        # Hand events to the background audit writer instead of committing them
+        self.defer = defer
         self.start_time = time.time()
         self.user_id: Optional[int] = None
         self.service_id: Optional[int] = None
@@ -61,7 +64,8 @@ class AuditContext:
             success=success,
             error_message=error_message,
             metadata=metadata,
-            severity=severity
+            severity=severity,
+            defer=self.defer
         )
         
         self.logged_events.append(event_key)
@@ -81,11 +85,12 @@ async def audit_middleware(request: Request, call_next: Callable) -> Response:
         request.state.audit_context = audit_ctx
         
         # Determine if this is a security-relevant endpoint
-        is_security_endpoint = _is_security_endpoint(request.url.path)
+        policy = route_policies.lookup(request.url.path)
+        is_security_endpoint = policy.audited
         
         # Log request start for security endpoints
         if is_security_endpoint:
-            await _log_request_start(audit_ctx, request)
+            await _log_request_start(audit_ctx, request, policy)
         
         try:
             # Process request
@@ -96,7 +101,7 @@ async def audit_middleware(request: Request, call_next: Callable) -> Response:
                 await _log_request_success(audit_ctx, request, response, start_time)
             
             # Log specific endpoint actions
-            await _log_endpoint_specific_events(audit_ctx, request, response)
+            await _log_endpoint_specific_events(audit_ctx, request, response, policy)
             
             return response
             
@@ -114,36 +119,17 @@ async def audit_middleware(request: Request, call_next: Callable) -> Response:
 
 def _is_security_endpoint(path: str) -> bool:
     """Determine if endpoint is security-relevant and should be audited."""
-    security_paths = [
-        "/api/auth/",
-        "/api/admin/",
-        "/api/services/",
-        "/api/validate/"
-    ]
-    return any(path.startswith(sp) for sp in security_paths)
+    return route_policies.lookup(path).audited
 
 
-async def _log_request_start(audit_ctx: AuditContext, request: Request):
+async def _log_request_start(audit_ctx: AuditContext, request: Request, policy: Optional[RoutePolicy] = None):
     """Log the start of a security-relevant request."""
     endpoint = request.url.path
     method = request.method
     
-    # Don't log routine operations
-    routine_endpoints = ["/health", "/docs", "/openapi.json", "/redoc"]
-    if any(endpoint.endswith(re) for re in routine_endpoints):
-        return
-    
-    # Log request initiation for sensitive endpoints
-    sensitive_endpoints = [
-        "/api/auth/login",
-        "/api/auth/register", 
-        "/api/auth/change-password",
-        "/api/admin/",
-        "/api/services/token",
-        "/api/services/register"
-    ]
-    
-    if any(endpoint.startswith(se) for se in sensitive_endpoints):
+    # Log request initiation for sensitive endpoints only
+    policy = policy or route_policies.lookup(endpoint)
+    if policy.sensitive:
         await audit_ctx.log_event(
             action=AuditAction.ADMIN_ACTION,  # Generic action for request start
             description=f"Security endpoint accessed: {method} {endpoint}",
@@ -210,29 +196,19 @@ async def _log_request_failure(
 async def _log_endpoint_specific_events(
     audit_ctx: AuditContext,
     request: Request,
-    response: Response
+    response: Response,
+    policy: Optional[RoutePolicy] = None
 ):
     """Log specific events based on endpoint and response."""
     endpoint = request.url.path
     status_code = response.status_code
+    audit_class = (policy or route_policies.lookup(endpoint)).audit_class
     
     # Authentication endpoints
     if endpoint == "/api/auth/login":
-        if status_code == 200:
-            # Login success will be logged by the login endpoint itself
-            pass
-        elif status_code in [400, 401, 422]:
-            # Login failure - extract email from request if possible
-            await audit_ctx.log_event(
-                action=AuditAction.LOGIN_FAILED,
-                description="Login attempt failed",
-                success=False,
-                severity=AuditSeverity.MEDIUM,
-                metadata={
-                    "status_code": status_code,
-                    "endpoint": endpoint
-                }
-            )
+        # Login success and failure are logged by the login endpoint itself
+        # (failures count towards the IP lockout, so never log them twice)
+        pass
     
     elif endpoint == "/api/auth/register":
         if status_code == 201:
@@ -269,7 +245,7 @@ async def _log_endpoint_specific_events(
             )
     
     # Admin endpoints
-    elif endpoint.startswith("/api/admin/"):
+    elif audit_class == "admin":
         if status_code in [200, 201]:
             await audit_ctx.log_event(
                 action=AuditAction.ADMIN_ACTION,
@@ -283,7 +259,7 @@ async def _log_endpoint_specific_events(
             )
     
     # Service endpoints
-    elif endpoint.startswith("/api/services/"):
+    elif audit_class == "service":
         if endpoint == "/api/services/register" and status_code == 201:
             await audit_ctx.log_event(
                 action=AuditAction.SERVICE_REGISTERED,
@@ -299,8 +275,8 @@ async def _log_endpoint_specific_events(
                 metadata={"status_code": status_code}
             )
     
-    # Unauthorized access attempts
-    if status_code == 401:
+    # Unauthorized access attempts (failed logins are logged by the endpoint)
+    if status_code == 401 and endpoint != "/api/auth/login":
         await audit_ctx.log_event(
             action=AuditAction.UNAUTHORIZED_ACCESS,
             description=f"Unauthorized access attempt: {endpoint}",
@@ -3,6 +3,7 @@ Rate limiting middleware for API endpoints.
 Implements sliding window rate limiting with Redis backend.
 """
 
+import ipaddress
 import time
 import json
 from typing import Optional, Dict, Any, Callable
@@ -18,6 +19,10 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
 from app.core.config import settings
+from app.core.metrics import instrument_redis
+from app.core.tracing import trace_redis
+from app.middleware.route_policy import route_policies
+from app.services.jwt_service import JWTService
 
 
 class RateLimitConfig:
@@ -48,7 +53,7 @@ class SecurityRateLimiter:
     def __init__(self, redis_url: Optional[str] = None):
         """Initialize rate limiter with Redis backend."""
         if redis_url:
-            self.redis_client = redis.from_url(redis_url)
+            self.redis_client = instrument_redis(trace_redis(redis.from_url(redis_url)))
         else:
             # In-memory fallback (not recommended for production)
             self.redis_client = None
@@ -187,41 +192,63 @@ class SecurityRateLimiter:
 rate_limiter = SecurityRateLimiter(settings.redis_url if hasattr(settings, 'redis_url') else None)
 
 
+TRUSTED_PROXY_NETWORKS = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.trusted_proxies]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
+
+
+def get_client_address(request: Request) -> str:
+    """
+    Client IP address. Behind trusted proxies (the gateway), the nearest
+    X-Forwarded-For hop that is not a trusted proxy; otherwise the peer.
+    """
+    peer = get_remote_address(request)
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or not _is_trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
 def get_rate_limit_key(request: Request) -> str:
     """Generate rate limit key based on request context."""
     # Use authenticated user ID if available
     if hasattr(request.state, 'user_id'):
         return f"user:{request.state.user_id}"
     
+    # Then the principal of a valid bearer token, so clients sharing an
+    # address (NAT, the gateway) do not share a budget
+    token = _bearer_token(request)
+    if token:
+        payload = JWTService.verify_access_token(token)
+        if payload:
+            return f"user:{payload['user_id']}"
+        payload = JWTService.verify_service_token(token)
+        if payload:
+            return f"service:{payload['service_id']}"
+    
     # Fall back to IP address
-    return f"ip:{get_remote_address(request)}"
+    return f"ip:{get_client_address(request)}"
 
 
 def get_endpoint_limits(path: str, method: str) -> tuple[int, int]:
-    """Get rate limit configuration for specific endpoint."""
-    # Authentication endpoints (more restrictive)
-    if path.startswith("/api/auth/login"):
-        return 5, 60  # 5 requests per minute
-    elif path.startswith("/api/auth/register"):
-        return 3, 60  # 3 requests per minute
-    elif path.startswith("/api/auth/change-password"):
-        return 3, 300  # 3 requests per 5 minutes
-    
-    # Admin endpoints
-    elif path.startswith("/api/admin/"):
-        return 200, 60  # 200 requests per minute
-    
-    # Service endpoints
-    elif path.startswith("/api/services/"):
-        return 50, 60  # 50 requests per minute
-    
-    # Health check
-    elif path == "/health":
-        return 60, 60  # 60 requests per minute
-    
-    # General API
-    else:
-        return 100, 60  # 100 requests per minute
+    """Get rate limit configuration (limit, window seconds) for specific endpoint."""
+    policy = route_policies.lookup(path)
+    return policy.limit, policy.window
 
 
 async def rate_limit_middleware(request: Request, call_next: Callable) -> Response:
@@ -272,6 +299,13 @@ def should_skip_rate_limiting(request: Request) -> bool:
     if "healthcheck" in user_agent or "monitoring" in user_agent:
         return True
     
+    # Skip token validation calls made by authenticated services, which
+    # carry the traffic of every user of the calling service
+    if request.url.path.startswith("/api/validate/"):
+        token = _bearer_token(request)
+        if token and JWTService.verify_service_token(token):
+            return True
+    
     # Skip for localhost in development
     if settings.debug and get_remote_address(request) in ["127.0.0.1", "localhost"]:
         # Still apply rate limiting but with higher limits
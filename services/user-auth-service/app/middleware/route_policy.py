@@ -0,0 +1,127 @@
+"""
+Route policy registry for rate limits and audit classification.
+
+Every request path resolves to one RoutePolicy: its rate limit and window,
+its audit class (None for paths that are not audited) and whether the
+request is sensitive enough to log its start. Policies are declared per
+path prefix (or exact path), merged with the settings overrides and
+compiled at startup into a character trie in which every node already
+holds the merged policy of its longest matching prefix, so a lookup is a
+single walk over the path.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+
+class RoutePolicy(NamedTuple):
+    """Resolved policy of a request path."""
+
+    limit: int
+    window: int
+    audit_class: Optional[str]
+    sensitive: bool
+
+    @property
+    def audited(self) -> bool:
+        return self.audit_class is not None
+
+
+DEFAULT_POLICY = RoutePolicy(limit=100, window=60, audit_class=None, sensitive=False)
+
+# (path, exact, overridden fields); fields not given are inherited from
+# the longest shorter prefix
+DEFAULT_RULES: List[Tuple[str, bool, Dict[str, Any]]] = [
+    # Authentication endpoints (more restrictive)
+    ("/api/auth/", False, {"audit_class": "auth"}),
+    ("/api/auth/login", False, {"limit": 5, "window": 60, "sensitive": True}),
+    ("/api/auth/register", False, {"limit": 3, "window": 60, "sensitive": True}),
+    ("/api/auth/change-password", False, {"limit": 3, "window": 300, "sensitive": True}),
+    # Admin endpoints
+    ("/api/admin/", False, {"limit": 200, "window": 60, "audit_class": "admin", "sensitive": True}),
+    # Service endpoints
+    ("/api/services/", False, {"limit": 50, "window": 60, "audit_class": "service"}),
+    ("/api/services/token", False, {"sensitive": True}),
+    ("/api/services/register", False, {"sensitive": True}),
+    # Token validation for other services
+    ("/api/validate/", False, {"audit_class": "validation"}),
+    # Health check
+    ("/health", True, {"limit": 60, "window": 60}),
+]
+
+
+class _Node:
+    __slots__ = ("children", "policy", "exact_policy", "rule", "exact_rule")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.policy: Optional[RoutePolicy] = None
+        self.exact_policy: Optional[RoutePolicy] = None
+        self.rule: Optional[Dict[str, Any]] = None
+        self.exact_rule: Optional[Dict[str, Any]] = None
+
+
+class RoutePolicyRegistry:
+    """Prefix trie of route policies, compiled once."""
+
+    def __init__(
+        self,
+        rules: Iterable[Tuple[str, bool, Dict[str, Any]]] = DEFAULT_RULES,
+        overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+        default: RoutePolicy = DEFAULT_POLICY
+    ):
+        self.root = _Node()
+        for path, exact, fields in rules:
+            self._add(path, exact, fields)
+        for path, fields in (overrides or {}).items():
+            fields = dict(fields)
+            exact = bool(fields.pop("exact", False))
+            self._add(path, exact, fields)
+        self._compile(self.root, default)
+
+    def _add(self, path: str, exact: bool, fields: Dict[str, Any]) -> None:
+        unknown = set(fields) - set(RoutePolicy._fields)
+        if unknown:
+            raise ValueError(f"Unknown route policy fields for {path}: {sorted(unknown)}")
+        node = self.root
+        for char in path:
+            node = node.children.setdefault(char, _Node())
+        attr = "exact_rule" if exact else "rule"
+        # Later rules (settings overrides) win over earlier ones
+        setattr(node, attr, {**(getattr(node, attr) or {}), **fields})
+
+    def _compile(self, node: _Node, inherited: RoutePolicy) -> None:
+        stack = [(node, inherited)]
+        while stack:
+            node, inherited = stack.pop()
+            node.policy = inherited._replace(**node.rule) if node.rule else inherited
+            node.exact_policy = node.policy._replace(**node.exact_rule) if node.exact_rule else None
+            stack.extend((child, node.policy) for child in node.children.values())
+
+    def lookup(self, path: str) -> RoutePolicy:
+        """Policy of the longest matching prefix (or the exact path)."""
+        node = self.root
+        children = node.children
+        for char in path:
+            child = children.get(char)
+            if child is None:
+                return node.policy
+            node = child
+            children = node.children
+        return node.exact_policy or node.policy
+
+
+def compile_patterns(patterns: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    """One case-insensitive regex matching any of the literal substrings."""
+    patterns = [pattern for pattern in patterns if pattern]
+    if not patterns:
+        return None
+    return re.compile("|".join(re.escape(pattern) for pattern in patterns), re.IGNORECASE)
+
+
+# Compiled at startup from settings
+route_policies = RoutePolicyRegistry(overrides=settings.route_policies)
+SUSPICIOUS_USER_AGENT_PATTERN = compile_patterns(settings.suspicious_user_agents)
+ATTACK_PATH_PATTERN = compile_patterns(settings.attack_path_patterns)
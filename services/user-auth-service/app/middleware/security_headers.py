@@ -8,6 +8,7 @@ from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.middleware.route_policy import ATTACK_PATH_PATTERN, SUSPICIOUS_USER_AGENT_PATTERN
 
 
 class SecurityHeaders:
@@ -194,15 +195,12 @@ def detect_suspicious_activity(request: Request) -> list[str]:
     patterns = []
     
     # Check user agent
-    user_agent = request.headers.get("user-agent", "").lower()
-    suspicious_agents = ["sqlmap", "nikto", "dirb", "gobuster", "scanner"]
-    if any(agent in user_agent for agent in suspicious_agents):
+    user_agent = request.headers.get("user-agent", "")
+    if SUSPICIOUS_USER_AGENT_PATTERN and SUSPICIOUS_USER_AGENT_PATTERN.search(user_agent):
         patterns.append("suspicious_user_agent")
     
     # Check for common attack patterns in path
-    path = request.url.path.lower()
-    attack_patterns = ["../", "script>", "select ", "union ", "drop ", "exec("]
-    if any(pattern in path for pattern in attack_patterns):
+    if ATTACK_PATH_PATTERN and ATTACK_PATH_PATTERN.search(request.url.path):
         patterns.append("potential_injection_attempt")
     
     # Check for excessive header size
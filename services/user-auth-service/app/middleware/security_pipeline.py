@@ -0,0 +1,398 @@
+"""
+Pure-ASGI security middleware pipeline.
+
+The ``@app.middleware("http")`` functions in security_headers.py,
+rate_limiting.py and audit_middleware.py each wrap
+the request in Starlette's call_next machinery, which costs an extra task
+and a response stream per middleware and request. This module runs the
+same concerns as stages of a single raw ASGI middleware:
+
+- a stage's ``on_request`` may reject the request with a ready response
+- a stage's ``on_response_start`` adds headers to the ``http.response.start``
+  message
+- a stage's ``on_finish`` runs once the response was sent or the app raised
+
+Header blocks that only depend on the path class (API, docs, other) and
+the scheme are encoded once at startup and appended as bytes.
+"""
+
+import json
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.middleware.audit_middleware import (
+    AuditContext,
+    _log_endpoint_specific_events,
+    _log_request_failure,
+    _log_request_start,
+    _log_request_success,
+)
+from app.middleware.rate_limiting import (
+    SecurityRateLimiter,
+    get_rate_limit_key,
+    rate_limiter,
+    should_skip_rate_limiting,
+)
+from app.middleware.route_policy import ATTACK_PATH_PATTERN, SUSPICIOUS_USER_AGENT_PATTERN, route_policies
+from app.middleware.security_headers import SecurityConfig, SecurityHeaders
+
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+PATH_CLASS_API = "api"
+PATH_CLASS_DOCS = "docs"
+PATH_CLASS_OTHER = "other"
+
+DOCS_PATHS = frozenset(["/docs", "/redoc", "/openapi.json"])
+
+DOCS_CSP_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net; "
+    "style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net; "
+    "img-src 'self' data: https:; "
+    "font-src 'self' https://fonts.gstatic.com; "
+    "connect-src 'self'"
+)
+
+
+def classify_path(path: str) -> str:
+    """Path class selecting the precomputed header block."""
+    if path in DOCS_PATHS:
+        return PATH_CLASS_DOCS
+    if path.startswith("/api/"):
+        return PATH_CLASS_API
+    return PATH_CLASS_OTHER
+
+
+def encode_headers(headers: Dict[str, str]) -> Headers:
+    """Encode a header dict as raw ASGI header pairs."""
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+def _header(scope: Scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+class PipelineStage:
+    """Base stage: no-op hooks. ``state`` is a dict shared per request."""
+
+    async def on_request(self, scope: Scope, state: dict) -> Optional[Tuple[int, bytes]]:
+        """Return (status, JSON body) to answer the request without calling the app."""
+        return None
+
+    def on_response_start(self, scope: Scope, message: Message, state: dict) -> None:
+        """Adjust the ``http.response.start`` message in place."""
+
+    async def on_finish(
+        self,
+        scope: Scope,
+        state: dict,
+        status_code: Optional[int],
+        error: Optional[BaseException]
+    ) -> None:
+        """Run after the response; ``error`` is set when the app raised."""
+
+
+class RequestIdStage(PipelineStage):
+    """Assign a request ID (request.state.request_id) and echo it as X-Request-ID."""
+
+    async def on_request(self, scope: Scope, state: dict) -> None:
+        request_id = str(uuid.uuid4())
+        state["request_id"] = request_id
+        # Starlette exposes scope["state"] as request.state
+        scope.setdefault("state", {})["request_id"] = request_id
+
+    def on_response_start(self, scope: Scope, message: Message, state: dict) -> None:
+        message["headers"].append((b"x-request-id", state["request_id"].encode("latin-1")))
+
+
+class SecurityHeadersStage(PipelineStage):
+    """
+    OWASP security headers, precomputed per path class and scheme.
+
+    Headers the application already set under the same names are replaced,
+    as with the previous ``response.headers[name] = value`` assignments.
+    """
+
+    def __init__(self, debug: bool = settings.debug):
+        self.debug = debug
+        self.blocks: Dict[Tuple[str, bool], Headers] = {}
+        for path_class in (PATH_CLASS_API, PATH_CLASS_DOCS, PATH_CLASS_OTHER):
+            for https in (False, True):
+                self.blocks[(path_class, https)] = encode_headers(self.build_headers(path_class, https))
+        self.names = frozenset(name for block in self.blocks.values() for name, _ in block)
+
+    def build_headers(self, path_class: str, https: bool) -> Dict[str, str]:
+        """Security headers of a response for the path class and scheme."""
+        headers = {
+            # Prevent MIME sniffing
+            "X-Content-Type-Options": "nosniff",
+            # Enable XSS protection
+            "X-XSS-Protection": "1; mode=block",
+            # Prevent clickjacking
+            "X-Frame-Options": "DENY",
+            # Referrer policy
+            "Referrer-Policy": "strict-origin-when-cross-origin",
+            # Permissions policy
+            "Permissions-Policy": SecurityHeaders.PERMISSIONS_POLICY,
+            # Remove server information
+            "Server": "UserAuthService/1.0",
+            # Cache control for security
+            "Cache-Control": "no-store, no-cache, must-revalidate, private",
+            "Pragma": "no-cache",
+            "Expires": "0",
+        }
+
+        # HTTPS-only headers (only in production or when using HTTPS)
+        if not self.debug or https:
+            headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
+            headers["Content-Security-Policy"] = (
+                DOCS_CSP_POLICY if path_class == PATH_CLASS_DOCS else SecurityHeaders.CSP_POLICY
+            )
+
+        if path_class == PATH_CLASS_API:
+            headers["API-Version"] = "1.0"
+            headers["X-RateLimit-Policy"] = "applied"
+
+        return headers
+
+    def on_response_start(self, scope: Scope, message: Message, state: dict) -> None:
+        block = self.blocks[(classify_path(scope["path"]), scope.get("scheme") == "https")]
+        headers = message["headers"]
+        if any(name in self.names for name, _ in headers):
+            headers[:] = [header for header in headers if header[0] not in self.names]
+        headers.extend(block)
+
+
+class SecurityMonitoringStage(PipelineStage):
+    """Flag suspicious requests and report the response time as X-Response-Time."""
+
+    async def on_request(self, scope: Scope, state: dict) -> None:
+        state["started"] = time.perf_counter()
+        patterns = self.detect(scope)
+        if patterns:
+            logger.warning(f"Suspicious activity detected on {scope['method']} {scope['path']}: {patterns}")
+
+    def detect(self, scope: Scope) -> List[str]:
+        """Suspicious patterns of a request, as detect_suspicious_activity."""
+        patterns = []
+        user_agent = (_header(scope, b"user-agent") or b"").decode("latin-1")
+        if SUSPICIOUS_USER_AGENT_PATTERN and SUSPICIOUS_USER_AGENT_PATTERN.search(user_agent):
+            patterns.append("suspicious_user_agent")
+        if ATTACK_PATH_PATTERN and ATTACK_PATH_PATTERN.search(scope["path"]):
+            patterns.append("potential_injection_attempt")
+        if sum(len(key) + len(value) for key, value in scope["headers"]) > SecurityConfig.MAX_HEADER_SIZE:
+            patterns.append("excessive_header_size")
+        if not user_agent:
+            patterns.append("missing_user_agent")
+        return patterns
+
+    def on_response_start(self, scope: Scope, message: Message, state: dict) -> None:
+        elapsed = time.perf_counter() - state["started"]
+        message["headers"].append((b"x-response-time", f"{elapsed:.3f}s".encode("latin-1")))
+
+
+class ContentSecurityStage(PipelineStage):
+    """Reject oversized bodies and unsupported content types."""
+
+    ALLOWED_CONTENT_TYPES = frozenset(
+        content_type.encode("latin-1") for content_type in SecurityConfig.ALLOWED_CONTENT_TYPES
+    )
+    TOO_LARGE_BODY = json.dumps({
+        "detail": "Request entity too large",
+        "max_size": SecurityConfig.MAX_REQUEST_SIZE
+    }).encode()
+    UNSUPPORTED_BODY = json.dumps({
+        "detail": "Unsupported media type",
+        "allowed_types": SecurityConfig.ALLOWED_CONTENT_TYPES
+    }).encode()
+    INVALID_LENGTH_BODY = json.dumps({"detail": "Invalid Content-Length header"}).encode()
+
+    async def on_request(self, scope: Scope, state: dict) -> Optional[Tuple[int, bytes]]:
+        content_length = _header(scope, b"content-length")
+        if content_length:
+            if not content_length.isdigit():
+                return 400, self.INVALID_LENGTH_BODY
+            if int(content_length) > SecurityConfig.MAX_REQUEST_SIZE:
+                return 413, self.TOO_LARGE_BODY
+
+        if scope["method"] in ("POST", "PUT", "PATCH"):
+            content_type = (_header(scope, b"content-type") or b"").split(b";")[0]
+            if content_type and content_type not in self.ALLOWED_CONTENT_TYPES:
+                return 415, self.UNSUPPORTED_BODY
+        return None
+
+
+class RateLimitStage(PipelineStage):
+    """Sliding-window rate limits from the route policies, reported as X-RateLimit-* headers."""
+
+    def __init__(self, limiter: SecurityRateLimiter = rate_limiter):
+        self.limiter = limiter
+
+    async def on_request(self, scope: Scope, state: dict) -> Optional[Tuple[int, bytes]]:
+        request = Request(scope)
+        if should_skip_rate_limiting(request):
+            return None
+
+        policy = route_policies.lookup(scope["path"])
+        is_limited, info = await self.limiter.is_rate_limited(
+            get_rate_limit_key(request), policy.limit, policy.window
+        )
+        state["rate_limit"] = (is_limited, info)
+        if not is_limited:
+            return None
+        return 429, json.dumps({
+            "detail": "Rate limit exceeded",
+            "error": "too_many_requests",
+            "limit": info["limit"],
+            "reset": info["reset"],
+            "retry_after": info["retry_after"]
+        }).encode()
+
+    def on_response_start(self, scope: Scope, message: Message, state: dict) -> None:
+        if "rate_limit" not in state:
+            return
+        is_limited, info = state["rate_limit"]
+        headers = message["headers"]
+        headers.append((b"x-ratelimit-limit", str(info["limit"]).encode("latin-1")))
+        headers.append((b"x-ratelimit-remaining", str(info["remaining"]).encode("latin-1")))
+        headers.append((b"x-ratelimit-reset", str(info["reset"]).encode("latin-1")))
+        if is_limited:
+            headers.append((b"retry-after", str(info["retry_after"]).encode("latin-1")))
+
+
+class AuditStage(PipelineStage):
+    """
+    Log security-relevant requests and their outcome, as audit_middleware.
+
+    Events go to the background audit writer, so requests never wait for
+    an audit INSERT; without a running writer they are committed once the
+    response was sent. The audit context is exposed to handlers as
+    request.state.audit_context.
+    """
+
+    async def on_request(self, scope: Scope, state: dict) -> None:
+        request = Request(scope)
+        audit_ctx = AuditContext(request, async_session_factory(), defer=True)
+        scope.setdefault("state", {})["audit_context"] = audit_ctx
+        policy = route_policies.lookup(scope["path"])
+        state["audit"] = (audit_ctx, policy, time.time())
+
+        if policy.audited:
+            try:
+                await _log_request_start(audit_ctx, request, policy)
+            except BaseException:
+                await audit_ctx.db.close()
+                raise
+
+    async def on_finish(
+        self,
+        scope: Scope,
+        state: dict,
+        status_code: Optional[int],
+        error: Optional[BaseException]
+    ) -> None:
+        audit_ctx, policy, start_time = state["audit"]
+        try:
+            if error is not None:
+                if policy.audited:
+                    await _log_request_failure(audit_ctx, audit_ctx.request, error, start_time)
+            elif status_code is not None:
+                response = Response(status_code=status_code)
+                if policy.audited:
+                    await _log_request_success(audit_ctx, audit_ctx.request, response, start_time)
+                await _log_endpoint_specific_events(audit_ctx, audit_ctx.request, response, policy)
+            if audit_ctx.db.new:
+                await audit_ctx.db.commit()
+        finally:
+            await audit_ctx.db.close()
+
+
+class SecurityPipelineMiddleware:
+    """
+    Run security stages around an ASGI app in a single middleware.
+
+    Stages see requests in order and response starts in the same order;
+    non-HTTP scopes (lifespan, websockets) pass straight through.
+    """
+
+    def __init__(self, app: ASGIApp, stages: Sequence[PipelineStage]):
+        self.app = app
+        self.stages = list(stages)
+        # Only stages overriding on_finish are awaited after the response
+        self.finishing = [stage for stage in self.stages if type(stage).on_finish is not PipelineStage.on_finish]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state: dict = {}
+        for index, stage in enumerate(self.stages):
+            rejection = await stage.on_request(scope, state)
+            if rejection is not None:
+                status_code, body = rejection
+                seen = self.stages[:index + 1]
+                await self._send_rejection(scope, send, seen, state, status_code, body)
+                for finishing in self.finishing:
+                    if finishing in seen:
+                        await finishing.on_finish(scope, state, status_code, None)
+                return
+
+        response_status: List[int] = []
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_status.append(message["status"])
+                message["headers"] = list(message.get("headers", []))
+                for stage in self.stages:
+                    stage.on_response_start(scope, message, state)
+            await send(message)
+
+        if not self.finishing:
+            await self.app(scope, receive, send_wrapper)
+            return
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as error:
+            for stage in self.finishing:
+                await stage.on_finish(scope, state, None, error)
+            raise
+        for stage in self.finishing:
+            await stage.on_finish(scope, state, response_status[0] if response_status else None, None)
+
+    async def _send_rejection(
+        self,
+        scope: Scope,
+        send: Send,
+        stages: List[PipelineStage],
+        state: dict,
+        status_code: int,
+        body: bytes
+    ) -> None:
+        message = {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+        # Only the stages that saw the request
+        for stage in stages:
+            stage.on_response_start(scope, message, state)
+        await send(message)
+        await send({"type": "http.response.body", "body": body})
@@ -7,7 +7,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_primary_read_db
 from app.services.service_auth import ServiceAuthService
 from app.schemas.service_auth import CurrentService
 
@@ -17,10 +17,11 @@ security = HTTPBearer()
 
 async def get_current_service(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_primary_read_db)]
 ) -> CurrentService:
     """
     Dependency to extract and validate current service from service token.
+    The service is read in a read-only session on the primary.
     """
     token = credentials.credentials
     
@@ -103,7 +104,7 @@ require_admin_services = require_service_scope("admin:services")
 
 async def validate_service_token_endpoint(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_primary_read_db)],
     required_scopes: Optional[List[str]] = None
 ) -> dict:
     """
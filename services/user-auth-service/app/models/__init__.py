@@ -6,5 +6,7 @@ from app.models.role import Role, UserRole, UserSession
 from app.models.service import Service, ServiceToken
 from app.models.password_history import PasswordHistory
 from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup, AuditRollupState
+from app.models.permission_bit import PermissionBit
 
-__all__ = ["Base", "User", "Role", "UserRole", "UserSession", "Service", "ServiceToken", "PasswordHistory", "AuditLog"]
\ No newline at end of file
+__all__ = ["Base", "User", "Role", "UserRole", "UserSession", "Service", "ServiceToken", "PasswordHistory", "AuditLog", "AuditRollup", "AuditRollupState", "PermissionBit"]
\ No newline at end of file
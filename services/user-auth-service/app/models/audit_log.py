@@ -69,6 +69,11 @@ class AuditLog(Base):
     """
     Audit log model for tracking all security-relevant actions.
     Implements comprehensive logging for compliance and security monitoring.
+    
+    On PostgreSQL the table is range partitioned by month on created_at
+    (primary key (id, created_at)); filter on created_at so queries only
+    scan the partitions of their date range. Partitions are managed by
+    app.services.audit_partitions.
     """
     __tablename__ = "audit_logs"
 
@@ -109,7 +114,7 @@ class AuditLog(Base):
     error_message = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Indexes for performance
     __table_args__ = (
@@ -118,6 +123,8 @@ class AuditLog(Base):
         Index('idx_audit_severity_created', 'severity', 'created_at'),
         Index('idx_audit_action_created', 'action', 'created_at'),
         Index('idx_audit_success_created', 'success', 'created_at'),
+        # Keyset pagination on (created_at, id), also serves created_at ranges
+        Index('idx_audit_created_id', 'created_at', 'id'),
     )
 
     def __repr__(self):
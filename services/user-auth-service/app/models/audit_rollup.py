@@ -0,0 +1,52 @@
+"""
+Pre-aggregated audit event counters for security dashboards.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index
+
+from app.core.database import Base
+
+
+class AuditRollup(Base):
+    """
+    Hourly count of audit events per action, severity, outcome and IP.
+    
+    Maintained by app.services.audit_rollups from audit_logs; an empty
+    ip_address stands for events without a client IP.
+    """
+    
+    __tablename__ = "audit_rollups"
+    
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    action = Column(String(100), primary_key=True)
+    severity = Column(String(20), primary_key=True)
+    success = Column(Boolean, primary_key=True)
+    ip_address = Column(String(45), primary_key=True, default="")
+    event_count = Column(Integer, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_audit_rollup_success_bucket', 'success', 'bucket_start'),
+    )
+    
+    def __repr__(self):
+        return (
+            f"<AuditRollup(bucket_start={self.bucket_start}, action='{self.action}', "
+            f"ip_address='{self.ip_address}', event_count={self.event_count})>"
+        )
+
+
+class AuditRollupState(Base):
+    """
+    Range of hours covered by audit_rollups: [rolled_from, rolled_until).
+    
+    A single row; events outside the range are counted from audit_logs.
+    """
+    
+    __tablename__ = "audit_rollup_state"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    rolled_from = Column(DateTime(timezone=True), nullable=False)
+    rolled_until = Column(DateTime(timezone=True), nullable=False)
+    
+    def __repr__(self):
+        return f"<AuditRollupState(rolled_from={self.rolled_from}, rolled_until={self.rolled_until})>"
@@ -0,0 +1,26 @@
+"""
+Permission bit model for compact, bitset-encoded permission sets.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.core.database import Base
+
+
+class PermissionBit(Base):
+    """
+    Stable mapping of a permission code to a bit index.
+    
+    Rows are append-only: once a code has been assigned a bit it keeps it,
+    so masks embedded in issued tokens stay decodable by every worker.
+    """
+    
+    __tablename__ = "permission_bits"
+    
+    bit_index = Column(Integer, primary_key=True, autoincrement=False)
+    code = Column(String(100), unique=True, index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<PermissionBit(bit_index={self.bit_index}, code='{self.code}')>"
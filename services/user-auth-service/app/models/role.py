@@ -1,7 +1,8 @@
+import hashlib
 from datetime import datetime
 from typing import Optional, List
 
-from sqlalchemy import DateTime, String, ForeignKey, func, JSON, UniqueConstraint, Integer
+from sqlalchemy import DateTime, String, ForeignKey, func, JSON, UniqueConstraint, Integer, LargeBinary
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -153,8 +154,9 @@ class UserSession(Base):
     index=True
   )
   
-  # Session information
-  refresh_token: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+  # Session information; refresh tokens are only stored as a SHA-256 digest,
+  # keeping the unique index fixed-width and small
+  token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), unique=True, index=True, nullable=False)
   expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
   
   # Session metadata
@@ -173,6 +175,23 @@ class UserSession(Base):
     back_populates="sessions"
   )
   
+  @staticmethod
+  def hash_token(refresh_token: str) -> bytes:
+    """Digest under which a refresh token is stored and looked up."""
+    return hashlib.sha256(refresh_token.encode()).digest()
+  
+  @property
+  def refresh_token(self) -> Optional[str]:
+    """Raw refresh token, known only on instances created or looked up with it."""
+    return getattr(self, "_refresh_token", None)
+  
+  @refresh_token.setter
+  def refresh_token(self, value: str) -> None:
+    token_hash = self.hash_token(value)
+    if self.token_hash != token_hash:
+      self.token_hash = token_hash
+    self._refresh_token = value
+  
   @property
   def is_expired(self) -> bool:
     """Check if session is expired."""
@@ -2,7 +2,7 @@ import re
 from datetime import datetime, timedelta
 from typing import Optional, List
 
-from sqlalchemy import Boolean, DateTime, String, Integer, func, select
+from sqlalchemy import Boolean, DateTime, String, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column, validates, relationship
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,6 +11,9 @@ from app.core.database import Base
 
 class User(Base):
   __tablename__ = "users"
+  # Fetch server-generated timestamps with RETURNING in the same statement,
+  # so updated rows stay usable after commit without a refresh round-trip
+  __mapper_args__ = {"eager_defaults": True}
   
   # Primary key
   id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -158,31 +161,21 @@ class User(Base):
     self.last_failed_login = None
   
   async def get_permissions(self, db: AsyncSession) -> List[str]:
-    """Get all permissions from user's roles."""
-    from app.models.role import Role, UserRole
+    """Get all permissions from user's roles (served from the permission cache)."""
+    from app.services.permission_cache import permission_cache
     
-    # Query to get all roles for this user
-    stmt = (
-      select(Role.permissions)
-      .join(UserRole, Role.id == UserRole.role_id)
-      .where(UserRole.user_id == self.id)
-    )
-    
-    result = await db.execute(stmt)
-    role_permissions = result.scalars().all()
-    
-    # Flatten and deduplicate permissions
-    all_permissions = set()
-    for permissions in role_permissions:
-      if permissions:
-        all_permissions.update(permissions)
+    return await permission_cache.get_permissions(db, self.id)
+  
+  async def get_permission_set(self, db: AsyncSession):
+    """Get the user's permissions as a registry bitset."""
+    from app.services.permission_registry import permission_registry
     
-    return list(all_permissions)
+    return permission_registry.build(await self.get_permissions(db))
   
   async def has_permission(self, db: AsyncSession, permission: str) -> bool:
     """Check if user has a specific permission."""
-    permissions = await self.get_permissions(db)
-    return permission in permissions
+    permission_set = await self.get_permission_set(db)
+    return permission in permission_set
   
   def __repr__(self) -> str:
     return f"<User(id={self.id}, email='{self.email}', active={self.is_active})>"
\ No newline at end of file
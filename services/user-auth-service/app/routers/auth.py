@@ -2,19 +2,28 @@
 Authentication API endpoints for user registration, login, token refresh, and logout.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
 from typing import Annotated, Optional
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_primary_read_db, get_read_db
+from app.core.profiling import PROFILE_TOKEN_HEADER, create_profile_token, stack_sampler
 from app.models.user import User
 from app.models.role import Role, UserRole, UserSession
 from app.services.password_service import PasswordService
 from app.services.jwt_service import JWTService
 from app.services.session_service import SessionService
 from app.services.account_lockout_service import AccountLockoutService
+from app.services.audit_partitions import audit_partition_manager
+from app.services.audit_rollups import audit_rollup_job
+from app.services.garbage_collector import garbage_collector
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import permission_registry
+from app.services.user_role_loader import UserRoleLoader
 from app.schemas.auth import (
     UserRegistrationRequest, 
     UserLoginRequest, 
@@ -44,10 +53,12 @@ security = HTTPBearer()
 # Dependency for getting current user from access token
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_primary_read_db)]
 ) -> CurrentUser:
     """
     Dependency to extract and validate current user from access token.
+    The user is read in a read-only session on the primary, so a
+    deactivation is never missed because of replication lag.
     """
     token = credentials.credentials
     
@@ -62,6 +73,9 @@ async def get_current_user(
     
     user_id = payload.get("user_id")
     permissions = payload.get("permissions", [])
+    if payload.get("permissions_incomplete"):
+        permission_set = await permission_registry.resolve(db, payload["pbits"])
+        permissions = permission_set.to_list()
     
     # Get user from database to verify existence and active status
     stmt = select(User).where(User.id == user_id)
@@ -89,7 +103,7 @@ async def get_admin_user(
     """
     Dependency to ensure current user has admin permissions.
     """
-    if "manage_users" not in current_user.permissions:
+    if not current_user.has_permission("manage_users"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin permissions required"
@@ -287,8 +301,8 @@ async def login_user(
             detail="User account is inactive"
         )
     
-    # Handle successful login (resets failed attempts)
-    await AccountLockoutService.handle_successful_login(db, user, request)
+    # Handle successful login (resets failed attempts, audit is written in the background)
+    await AccountLockoutService.handle_successful_login(db, user, request, commit=False)
     
     # Get user permissions
     permissions = await user.get_permissions(db)
@@ -301,9 +315,14 @@ async def login_user(
     await SessionService.create_session(
         db,
         user.id,
-        refresh_token
+        refresh_token,
+        commit=False
     )
     
+    # Single commit for the whole login; tokens are only returned once the
+    # lockout reset and the session row are durable
+    await db.commit()
+    
     return AuthResponse(
         user=UserResponse.model_validate(user),
         access_token=access_token,
@@ -422,7 +441,7 @@ async def logout_user(
 )
 async def get_current_user_info(
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get current authenticated user's information.
@@ -528,7 +547,7 @@ async def debug_token(
 )
 async def debug_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """Debug endpoint to test user database lookup."""
     try:
@@ -630,7 +649,7 @@ async def update_profile(
 )
 async def get_user_permissions(
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get current user's permissions and roles.
@@ -653,9 +672,7 @@ async def get_user_permissions(
     permissions = await user.get_permissions(db)
     
     # Get role names
-    stmt = select(Role.name).join(UserRole).where(UserRole.user_id == user.id)
-    result = await db.execute(stmt)
-    role_names = [row[0] for row in result.fetchall()]
+    role_names = await UserRoleLoader(db).load(user.id)
     
     return UserPermissionsResponse(
         user_id=user.id,
@@ -811,6 +828,22 @@ async def change_email(
 admin_router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 
+def _admin_user_response(user: User, role_names: list) -> AdminUserResponse:
+    """Build the admin view of a user from preloaded role names."""
+    return AdminUserResponse(
+        id=user.id,
+        email=user.email,
+        first_name=user.first_name,
+        last_name=user.last_name,
+        is_active=user.is_active,
+        is_verified=user.is_verified,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+        roles=role_names,
+        last_login=None  # TODO: Add last_login tracking
+    )
+
+
 @admin_router.get(
     "/users",
     response_model=AdminUserListResponse,
@@ -819,7 +852,7 @@ admin_router = APIRouter(prefix="/api/admin", tags=["Admin"])
 )
 async def list_users(
     admin_user: Annotated[CurrentUser, Depends(get_admin_user)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     page: int = 1,
     per_page: int = 20,
     search: Optional[str] = None
@@ -860,27 +893,14 @@ async def list_users(
     result = await db.execute(query)
     users = result.scalars().all()
     
+    # Roles of the whole page in a single query
+    roles_by_user = await UserRoleLoader(db).load_many(user.id for user in users)
+    
     # Convert to admin response format with roles
-    admin_users = []
-    for user in users:
-        # Get user roles
-        role_stmt = select(Role.name).join(UserRole).where(UserRole.user_id == user.id)
-        role_result = await db.execute(role_stmt)
-        role_names = [row[0] for row in role_result.fetchall()]
-        
-        admin_user_data = AdminUserResponse(
-            id=user.id,
-            email=user.email,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            roles=role_names,
-            last_login=None  # TODO: Add last_login tracking
-        )
-        admin_users.append(admin_user_data)
+    admin_users = [
+        _admin_user_response(user, roles_by_user[user.id])
+        for user in users
+    ]
     
     total_pages = (total + per_page - 1) // per_page
     
@@ -902,7 +922,7 @@ async def list_users(
 async def get_user_by_id(
     user_id: int,
     admin_user: Annotated[CurrentUser, Depends(get_admin_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get detailed information about a specific user.
@@ -911,10 +931,8 @@ async def get_user_by_id(
     
     Requires admin permissions (manage_users).
     """
-    # Get user
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    # Get user together with role names
+    user, role_names = await UserRoleLoader.fetch_user_with_roles(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -922,23 +940,7 @@ async def get_user_by_id(
             detail="User not found"
         )
     
-    # Get user roles
-    role_stmt = select(Role.name).join(UserRole).where(UserRole.user_id == user.id)
-    role_result = await db.execute(role_stmt)
-    role_names = [row[0] for row in role_result.fetchall()]
-    
-    return AdminUserResponse(
-        id=user.id,
-        email=user.email,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        roles=role_names,
-        last_login=None  # TODO: Add last_login tracking
-    )
+    return _admin_user_response(user, role_names)
 
 
 @admin_router.post(
@@ -960,7 +962,7 @@ async def assign_role_to_user(
     
     Requires admin permissions (manage_users and manage_roles).
     """
-    if "manage_roles" not in admin_user.permissions:
+    if not admin_user.has_permission("manage_roles"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Role management permissions required"
@@ -1005,6 +1007,7 @@ async def assign_role_to_user(
     user_role = UserRole(user_id=role_data.user_id, role_id=role.id)
     db.add(user_role)
     await db.commit()
+    await permission_cache.invalidate_user(role_data.user_id)
     
     return MessageResponse(
         message=f"Successfully assigned role '{role_data.role_name}' to user"
@@ -1030,7 +1033,7 @@ async def remove_role_from_user(
     
     Requires admin permissions (manage_users and manage_roles).
     """
-    if "manage_roles" not in admin_user.permissions:
+    if not admin_user.has_permission("manage_roles"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Role management permissions required"
@@ -1063,6 +1066,7 @@ async def remove_role_from_user(
     # Remove assignment
     await db.delete(assignment)
     await db.commit()
+    await permission_cache.invalidate_user(role_data.user_id)
     
     return MessageResponse(
         message=f"Successfully removed role '{role_data.role_name}' from user"
@@ -1109,22 +1113,9 @@ async def update_user_status(
         await SessionService.revoke_all_user_sessions(db, user.id)
     
     # Get user roles for response
-    role_stmt = select(Role.name).join(UserRole).where(UserRole.user_id == user.id)
-    role_result = await db.execute(role_stmt)
-    role_names = [row[0] for row in role_result.fetchall()]
+    role_names = await UserRoleLoader(db).load(user.id)
     
-    return AdminUserResponse(
-        id=user.id,
-        email=user.email,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        roles=role_names,
-        last_login=None
-    )
+    return _admin_user_response(user, role_names)
 
 
 @admin_router.post(
@@ -1189,10 +1180,12 @@ async def create_user(
     # Assign roles if provided
     assigned_roles = []
     if user_data.role_names:
+        role_stmt = select(Role).where(Role.name.in_(user_data.role_names))
+        role_result = await db.execute(role_stmt)
+        roles_by_name = {role.name: role for role in role_result.scalars().all()}
+        
         for role_name in user_data.role_names:
-            role_stmt = select(Role).where(Role.name == role_name)
-            role_result = await db.execute(role_stmt)
-            role = role_result.scalar_one_or_none()
+            role = roles_by_name.get(role_name)
             
             if role:
                 user_role = UserRole(user_id=new_user.id, role_id=role.id)
@@ -1201,18 +1194,7 @@ async def create_user(
         
         await db.commit()
     
-    return AdminUserResponse(
-        id=new_user.id,
-        email=new_user.email,
-        first_name=new_user.first_name,
-        last_name=new_user.last_name,
-        is_active=new_user.is_active,
-        is_verified=new_user.is_verified,
-        created_at=new_user.created_at,
-        updated_at=new_user.updated_at,
-        roles=assigned_roles,
-        last_login=None
-    )
+    return _admin_user_response(new_user, assigned_roles)
 
 
 # Account Lockout Management Endpoints
@@ -1266,7 +1248,7 @@ async def unlock_user_account(
 )
 async def get_lockout_statistics(
     current_user: Annotated[CurrentUser, Depends(require_admin)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     hours: Optional[int] = 24
 ):
     """
@@ -1290,7 +1272,7 @@ async def get_lockout_statistics(
 )
 async def get_locked_accounts(
     current_user: Annotated[CurrentUser, Depends(require_admin)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get list of all currently locked user accounts.
@@ -1322,4 +1304,101 @@ async def get_locked_accounts(
     return {
         "locked_accounts": locked_accounts,
         "total_locked": len(locked_accounts)
-    }
\ No newline at end of file
+    }
+
+@admin_router.get(
+    "/gc-status",
+    summary="Get garbage collector status",
+    description="Get progress metrics of the background session and token cleanup"
+)
+async def get_gc_status(
+    current_user: Annotated[CurrentUser, Depends(require_admin)]
+):
+    """
+    Get progress metrics of the background garbage collector.
+    Requires admin permissions.
+    """
+    return garbage_collector.get_metrics()
+
+
+@admin_router.get(
+    "/audit-partition-status",
+    summary="Get audit partition maintenance status",
+    description="Get metrics of the audit_logs partition maintenance job"
+)
+async def get_audit_partition_status(
+    current_user: Annotated[CurrentUser, Depends(require_admin)]
+):
+    """
+    Get metrics of the audit_logs partition maintenance job.
+    Requires admin permissions.
+    """
+    return audit_partition_manager.get_metrics()
+
+
+@admin_router.get(
+    "/audit-rollup-status",
+    summary="Get audit rollup status",
+    description="Get metrics of the hourly audit rollup job"
+)
+async def get_audit_rollup_status(
+    current_user: Annotated[CurrentUser, Depends(require_admin)]
+):
+    """
+    Get metrics of the hourly audit rollup job.
+    Requires admin permissions.
+    """
+    return audit_rollup_job.get_metrics()
+
+
+def _require_profiling() -> None:
+    if not settings.profiling_secret:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is not enabled"
+        )
+
+
+@admin_router.post(
+    "/profiling/token",
+    summary="Create a profiling token",
+    description="Create a signed token whose requests get a Server-Timing breakdown"
+)
+async def create_profiling_token(
+    current_user: Annotated[CurrentUser, Depends(require_admin)],
+    ttl_seconds: int = Query(300, ge=1, le=3600)
+):
+    """
+    Create a signed profiling token. Requests sending it in the
+    X-Profile-Token header to any service sharing PROFILING_SECRET are
+    answered with a Server-Timing header (database, Redis, HTTP, bcrypt,
+    serialization and application time).
+    Requires admin permissions.
+    """
+    _require_profiling()
+    return {
+        "header": PROFILE_TOKEN_HEADER,
+        "token": create_profile_token(settings.profiling_secret, ttl_seconds),
+        "expires_in": ttl_seconds
+    }
+
+
+@admin_router.get(
+    "/profiling/samples",
+    summary="Get sampled request stacks",
+    description="Get the stack samples of sampled requests in folded (flamegraph) format; only the serving worker's samples",
+    response_class=PlainTextResponse
+)
+async def get_profiling_samples(
+    current_user: Annotated[CurrentUser, Depends(require_admin)],
+    reset: bool = False
+):
+    """
+    Get the collected stack samples as folded stacks, one
+    "frame;frame;... count" line per stack. Optionally reset them.
+    Samples are kept per process: with several workers, each call returns
+    (and resets) only the samples of the worker serving it.
+    Requires admin permissions.
+    """
+    _require_profiling()
+    return stack_sampler.folded(reset=reset)
@@ -7,7 +7,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated, List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.services.service_auth import ServiceAuthService
 from app.middleware.service_auth import (
     get_current_service, 
@@ -171,7 +171,7 @@ async def validate_service_token(
 )
 async def list_services(
     current_service: Annotated[CurrentService, Depends(require_admin_services)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     active_only: bool = True
 ):
     """
@@ -212,7 +212,7 @@ async def list_services(
 async def get_service_info(
     service_id: int,
     current_service: Annotated[CurrentService, Depends(require_admin_services)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get detailed information about a specific service.
@@ -326,7 +326,7 @@ async def revoke_service_tokens(
 )
 async def get_current_service_info(
     current_service: Annotated[CurrentService, Depends(get_current_service)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_read_db)]
 ):
     """
     Get information about the currently authenticated service.
@@ -7,18 +7,24 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Annotated, List, Optional
+from typing import Annotated, Dict, List, Optional
 from pydantic import BaseModel, Field
 
-from app.core.database import get_db
+from app.core.database import get_db, get_primary_read_db
 from app.models.user import User
 from app.services.jwt_service import JWTService
+from app.services.permission_cache import permission_cache
+from app.services.permission_registry import permission_registry
+from app.services.user_role_loader import UserRoleLoader
 from app.middleware.service_auth import get_current_service, require_validate_tokens
 from app.schemas.service_auth import CurrentService
 
 router = APIRouter(prefix="/api/validate", tags=["Token Validation"])
 security = HTTPBearer()
 
+# Upper bound on tokens or user ids accepted by a single batch request
+MAX_BATCH_SIZE = 100
+
 
 class UserTokenValidationRequest(BaseModel):
     """Request schema for validating user tokens."""
@@ -53,6 +59,65 @@ class UserInfoResponse(BaseModel):
     roles: Optional[List[str]] = Field(default=None, description="User role names")
 
 
+class BatchUserTokenValidationRequest(BaseModel):
+    """Request schema for validating several user tokens at once."""
+    tokens: List[str] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="User access tokens to validate"
+    )
+    required_permissions: Optional[List[str]] = Field(default=None, description="Required permissions")
+
+
+class BatchUserTokenValidationResult(BaseModel):
+    """Validation result of a single token in a batch."""
+    valid: bool = Field(..., description="Whether token is valid")
+    user_id: Optional[int] = Field(default=None, description="User ID from token")
+    email: Optional[str] = Field(default=None, description="User email address")
+    permissions: List[str] = Field(default_factory=list, description="User permissions")
+    is_active: Optional[bool] = Field(default=None, description="Whether user is active")
+    error: Optional[str] = Field(default=None, description="Why the token was rejected")
+
+
+class BatchUserTokenValidationResponse(BaseModel):
+    """Response schema for batch token validation, keyed by input token."""
+    results: Dict[str, BatchUserTokenValidationResult] = Field(..., description="Result per token")
+
+
+class BatchUserInfoRequest(BaseModel):
+    """Request schema for getting information on several users."""
+    user_ids: List[int] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="User IDs to retrieve"
+    )
+    include_roles: bool = Field(default=False, description="Include role information")
+
+
+class BatchUserInfoResponse(BaseModel):
+    """Response schema for batch user information, keyed by user ID."""
+    users: Dict[int, Optional[UserInfoResponse]] = Field(
+        ..., description="User information per ID, null for unknown users"
+    )
+
+
+class BatchUserPermissionsRequest(BaseModel):
+    """Request schema for getting permissions of several users."""
+    user_ids: List[int] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="User IDs to resolve"
+    )
+
+
+class BatchUserPermissionsResponse(BaseModel):
+    """Response schema for batch permissions, keyed by user ID."""
+    permissions: Dict[int, List[str]] = Field(..., description="Permissions per active user ID")
+    errors: Dict[int, str] = Field(default_factory=dict, description="Why a user ID was not resolved")
+
+
+async def _load_users(db: AsyncSession, user_ids: List[int]) -> Dict[int, User]:
+    """Load users by ID with a single IN query."""
+    if not user_ids:
+        return {}
+    result = await db.execute(select(User).where(User.id.in_(set(user_ids))))
+    return {user.id: user for user in result.scalars().all()}
+
+
 @router.post(
     "/user-token",
     response_model=UserTokenValidationResponse,
@@ -87,14 +152,16 @@ async def validate_user_token(
         )
     
     user_id = payload.get("user_id")
+    permission_set = await permission_registry.resolve_token_permissions(db, payload)
     token_permissions = payload.get("permissions", [])
+    if payload.get("permissions_incomplete"):
+        token_permissions = permission_set.to_list()
     
     # Check required permissions if specified
-    if validation_request.required_permissions:
-        missing_permissions = [
-            perm for perm in validation_request.required_permissions
-            if perm not in token_permissions
-        ]
+    if validation_request.required_permissions and not permission_set.has_all(
+        validation_request.required_permissions
+    ):
+        missing_permissions = permission_set.missing(validation_request.required_permissions)
         if missing_permissions:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -162,10 +229,7 @@ async def get_user_info(
     # Get user roles if requested
     roles = None
     if user_request.include_roles:
-        from app.models.role import Role, UserRole
-        role_stmt = select(Role.name).join(UserRole).where(UserRole.user_id == user.id)
-        role_result = await db.execute(role_stmt)
-        roles = [row[0] for row in role_result.fetchall()]
+        roles = await UserRoleLoader(db).load(user.id)
     
     return UserInfoResponse(
         user_id=user.id,
@@ -188,7 +252,7 @@ async def get_user_info(
 async def get_user_permissions(
     user_id: int,
     current_service: Annotated[CurrentService, Depends(require_validate_tokens)],
-    db: Annotated[AsyncSession, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_primary_read_db)]
 ):
     """
     Get permissions for a specific user.
@@ -223,6 +287,167 @@ async def get_user_permissions(
     return permissions
 
 
+@router.post(
+    "/user-token/batch",
+    response_model=BatchUserTokenValidationResponse,
+    summary="Validate user access tokens in batch",
+    description="Validate up to MAX_BATCH_SIZE user access tokens in one request"
+)
+async def validate_user_tokens_batch(
+    validation_request: BatchUserTokenValidationRequest,
+    current_service: Annotated[CurrentService, Depends(require_validate_tokens)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Validate several user access tokens in one request.
+    
+    Users of all tokens are loaded with a single query. Failures are
+    reported per token instead of failing the request.
+    
+    Requires validate:tokens scope.
+    
+    - **tokens**: User access tokens to validate
+    - **required_permissions**: Required permissions (optional)
+    
+    Returns a validation result per input token.
+    """
+    results: Dict[str, BatchUserTokenValidationResult] = {}
+    verified = {}
+    for token in dict.fromkeys(validation_request.tokens):
+        payload = JWTService.verify_access_token(token)
+        if not payload:
+            results[token] = BatchUserTokenValidationResult(
+                valid=False, error="Invalid or expired user token"
+            )
+            continue
+        verified[token] = payload
+    
+    users = await _load_users(db, [payload.get("user_id") for payload in verified.values()])
+    
+    for token, payload in verified.items():
+        permission_set = await permission_registry.resolve_token_permissions(db, payload)
+        token_permissions = payload.get("permissions", [])
+        if payload.get("permissions_incomplete"):
+            token_permissions = permission_set.to_list()
+        
+        if validation_request.required_permissions and not permission_set.has_all(
+            validation_request.required_permissions
+        ):
+            missing_permissions = permission_set.missing(validation_request.required_permissions)
+            if missing_permissions:
+                results[token] = BatchUserTokenValidationResult(
+                    valid=False,
+                    user_id=payload.get("user_id"),
+                    error=f"Missing required permissions: {', '.join(missing_permissions)}"
+                )
+                continue
+        
+        user = users.get(payload.get("user_id"))
+        if not user:
+            results[token] = BatchUserTokenValidationResult(valid=False, error="User not found")
+            continue
+        
+        results[token] = BatchUserTokenValidationResult(
+            valid=True,
+            user_id=user.id,
+            email=user.email,
+            permissions=token_permissions,
+            is_active=user.is_active
+        )
+    
+    return BatchUserTokenValidationResponse(results=results)
+
+
+@router.post(
+    "/user-info/batch",
+    response_model=BatchUserInfoResponse,
+    summary="Get user information in batch",
+    description="Get detailed information for up to MAX_BATCH_SIZE users in one request"
+)
+async def get_user_info_batch(
+    user_request: BatchUserInfoRequest,
+    current_service: Annotated[CurrentService, Depends(require_validate_tokens)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Get detailed information for several users in one request.
+    
+    Users, their permissions and (optionally) their roles are each
+    resolved with a single query, whatever the size of the batch.
+    
+    Requires validate:tokens scope.
+    
+    - **user_ids**: IDs of the users to retrieve
+    - **include_roles**: Whether to include role names
+    
+    Returns user information per input ID, null for unknown users.
+    """
+    users = await _load_users(db, user_request.user_ids)
+    found_ids = list(users)
+    
+    permissions = await permission_cache.get_permissions_many(db, found_ids) if found_ids else {}
+    roles = {}
+    if user_request.include_roles and found_ids:
+        roles = await UserRoleLoader(db).load_many(found_ids)
+    
+    response: Dict[int, Optional[UserInfoResponse]] = {}
+    for user_id in user_request.user_ids:
+        user = users.get(user_id)
+        if not user:
+            response[user_id] = None
+            continue
+        response[user_id] = UserInfoResponse(
+            user_id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            permissions=permissions[user.id],
+            roles=roles.get(user.id) if user_request.include_roles else None
+        )
+    
+    return BatchUserInfoResponse(users=response)
+
+
+@router.post(
+    "/permissions/batch",
+    response_model=BatchUserPermissionsResponse,
+    summary="Get user permissions in batch",
+    description="Get permissions for up to MAX_BATCH_SIZE users in one request"
+)
+async def get_user_permissions_batch(
+    permissions_request: BatchUserPermissionsRequest,
+    current_service: Annotated[CurrentService, Depends(require_validate_tokens)],
+    db: Annotated[AsyncSession, Depends(get_primary_read_db)]
+):
+    """
+    Get permissions for several users in one request.
+    
+    Requires validate:tokens scope.
+    
+    - **user_ids**: IDs of the users
+    
+    Returns permissions per active user and an error per unknown or
+    inactive user.
+    """
+    users = await _load_users(db, permissions_request.user_ids)
+    
+    errors: Dict[int, str] = {}
+    active_ids = []
+    for user_id in dict.fromkeys(permissions_request.user_ids):
+        user = users.get(user_id)
+        if not user:
+            errors[user_id] = "User not found"
+        elif not user.is_active:
+            errors[user_id] = "User is inactive"
+        else:
+            active_ids.append(user_id)
+    
+    permissions = await permission_cache.get_permissions_many(db, active_ids) if active_ids else {}
+    return BatchUserPermissionsResponse(permissions=permissions, errors=errors)
+
+
 @router.get(
     "/health",
     summary="Service health check",
@@ -241,6 +466,9 @@ async def health_check():
         "available_endpoints": [
             "/api/validate/user-token",
             "/api/validate/user-info", 
-            "/api/validate/permissions/{user_id}"
+            "/api/validate/permissions/{user_id}",
+            "/api/validate/user-token/batch",
+            "/api/validate/user-info/batch",
+            "/api/validate/permissions/batch"
         ]
     }
\ No newline at end of file
@@ -4,7 +4,7 @@ Pydantic schemas for authentication API requests and responses.
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, PrivateAttr
 
 
 # Request Schemas
@@ -365,6 +365,28 @@ class CurrentUser(BaseModel):
     email: str
     permissions: List[str]
     
+    _permission_set: Optional[object] = PrivateAttr(default=None)
+    
+    @property
+    def permission_set(self):
+        """Bitset view of ``permissions``, built once per request."""
+        if self._permission_set is None:
+            from app.services.permission_registry import permission_registry
+            self._permission_set = permission_registry.build(self.permissions)
+        return self._permission_set
+    
+    def has_permission(self, permission: str) -> bool:
+        """Check a single permission."""
+        return permission in self.permission_set
+    
+    def has_all_permissions(self, permissions: List[str]) -> bool:
+        """Check that the user holds every given permission."""
+        return self.permission_set.has_all(permissions)
+    
+    def has_any_permission(self, permissions: List[str]) -> bool:
+        """Check that the user holds at least one of the given permissions."""
+        return self.permission_set.has_any(permissions)
+    
     model_config = {
         "json_schema_extra": {
             "example": {
@@ -77,7 +77,8 @@ class AccountLockoutService:
                     metadata={
                         "remaining_lockout_seconds": int(remaining_time.total_seconds()) if remaining_time else 0,
                         "failed_attempts": user.failed_login_attempts
-                    }
+                    },
+                    defer=True
                 )
             
             return {
@@ -126,17 +127,14 @@ class AccountLockoutService:
         # Increment failed attempts
         was_locked = user.increment_failed_attempts(max_attempts, lockout_duration)
         
-        # Save user changes
-        await db.commit()
-        await db.refresh(user)
-        
         # Log the failed attempt
         await AuditService.log_authentication_failure(
             db=db,
             email=user.email,
             reason=reason,
             request=request,
-            attempt_count=user.failed_login_attempts
+            attempt_count=user.failed_login_attempts,
+            defer=True
         )
         
         # If account was just locked, log lockout event
@@ -153,9 +151,14 @@ class AccountLockoutService:
                     "lockout_duration_minutes": lockout_duration,
                     "locked_until": user.locked_until.isoformat() if user.locked_until else None,
                     "reason": reason
-                }
+                },
+                defer=True
             )
         
+        # Save user changes; the request fails afterwards, so this must not
+        # be left to the session dependency (which rolls back on errors)
+        await db.commit()
+        
         # Check IP-based restrictions if enabled
         ip_status = {}
         if request and AccountLockoutConfig.ENABLE_IP_TRACKING:
@@ -175,7 +178,8 @@ class AccountLockoutService:
     async def handle_successful_login(
         db: AsyncSession,
         user: User,
-        request: Optional[Request] = None
+        request: Optional[Request] = None,
+        commit: bool = True
     ) -> Dict[str, Any]:
         """
         Handle successful login and reset failed attempts.
@@ -184,26 +188,26 @@ class AccountLockoutService:
             db: Database session
             user: User who successfully logged in
             request: Optional request for logging
+            commit: Commit the changes; pass False to leave them to the
+                caller's unit of work
             
         Returns:
             Dictionary with reset status
         """
         had_failed_attempts = user.failed_login_attempts > 0
         was_locked = user.is_locked
+        previous_failed_attempts = user.failed_login_attempts
         
         # Reset failed attempts
         user.reset_failed_attempts()
         user.last_login = datetime.utcnow()
         
-        # Save changes
-        await db.commit()
-        await db.refresh(user)
-        
         # Log successful login
         await AuditService.log_authentication_success(
             db=db,
             user_id=user.id,
-            request=request
+            request=request,
+            defer=True
         )
         
         # If account was previously locked or had failed attempts, log the reset
@@ -217,10 +221,14 @@ class AccountLockoutService:
                 success=True,
                 metadata={
                     "was_locked": was_locked,
-                    "previous_failed_attempts": user.failed_login_attempts if had_failed_attempts else 0
-                }
+                    "previous_failed_attempts": previous_failed_attempts
+                },
+                defer=True
             )
         
+        if commit:
+            await db.commit()
+        
         return {
             "login_successful": True,
             "account_was_locked": was_locked,
@@ -408,7 +416,8 @@ async def handle_failed_login(
 async def handle_successful_login(
     db: AsyncSession,
     user: User,
-    request: Optional[Request] = None
+    request: Optional[Request] = None,
+    commit: bool = True
 ) -> Dict[str, Any]:
     """Convenience function for handling successful login."""
-    return await AccountLockoutService.handle_successful_login(db, user, request)
\ No newline at end of file
+    return await AccountLockoutService.handle_successful_login(db, user, request, commit)
\ No newline at end of file
@@ -0,0 +1,337 @@
+"""
+Maintenance of the time-partitioned ``audit_logs`` table.
+
+On PostgreSQL ``audit_logs`` is range partitioned on ``created_at`` (see
+the ``partition_audit_logs`` migration). Every partition carries its own
+copy of the indexes, so an insert still updates each index, but of the one
+partition it lands in (smaller trees, mostly cached); queries filtering on
+``created_at`` only scan the partitions of their date range, and expired
+rows leave by dropping a partition instead of a bulk DELETE.
+
+The maintenance job pre-creates partitions for upcoming periods and, per
+the retention policy, optionally archives expired partitions to gzipped
+JSON lines files before detaching and dropping them. Rows that fall
+outside every partition land in ``audit_logs_default``; they are moved
+into their partition when it is created. On other databases, or while the
+table is not partitioned, every run is a no-op.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock
+AUDIT_PARTITION_LOCK_KEY = 7_301_420_038
+
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+_PARTITION_NAME = re.compile(r"^audit_logs_p(\d{6}|\d{8})$")
+
+Period = Tuple[date, date]
+
+
+def period_for(day: date, granularity: str) -> Period:
+  """Start (inclusive) and end (exclusive) of the period containing ``day``."""
+  if granularity == "day":
+    return day, day + timedelta(days=1)
+  start = day.replace(day=1)
+  end = (start + timedelta(days=32)).replace(day=1)
+  return start, end
+
+
+def partition_name(start: date, granularity: str) -> str:
+  """Name of the partition starting at ``start``, e.g. audit_logs_p202610."""
+  suffix = start.strftime("%Y%m%d" if granularity == "day" else "%Y%m")
+  return f"{PARENT_TABLE}_p{suffix}"
+
+
+def parse_partition_name(name: str) -> Optional[Period]:
+  """Period covered by a partition following the naming scheme, else None."""
+  match = _PARTITION_NAME.match(name)
+  if not match:
+    return None
+  suffix = match.group(1)
+  if len(suffix) == 8:
+    return period_for(datetime.strptime(suffix, "%Y%m%d").date(), "day")
+  return period_for(datetime.strptime(suffix, "%Y%m").date(), "month")
+
+
+def plan_partitions(
+  today: date,
+  existing: List[str],
+  granularity: str,
+  premake: int,
+  retention_days: int
+) -> Tuple[List[Tuple[str, date, date]], List[str]]:
+  """
+  Work out which partitions to create and which have expired.
+
+  Partitions are planned for the current period and the ``premake``
+  following ones, skipping any period overlapping an existing partition
+  (so switching granularity never produces overlapping ranges). A
+  partition expires once its whole range is older than the retention
+  period; ``retention_days`` of 0 keeps everything.
+
+  Returns:
+    Partitions to create as (name, start, end), and expired partition names
+  """
+  periods = {name: parse_partition_name(name) for name in existing}
+  periods = {name: period for name, period in periods.items() if period}
+
+  to_create = []
+  start = today
+  for _ in range(premake + 1):
+    start, end = period_for(start, granularity)
+    overlaps = any(start < other_end and other_start < end for other_start, other_end in periods.values())
+    if not overlaps:
+      name = partition_name(start, granularity)
+      to_create.append((name, start, end))
+      periods[name] = (start, end)
+    start = end
+
+  expired = []
+  if retention_days > 0:
+    cutoff = today - timedelta(days=retention_days)
+    expired = sorted(name for name, (_, end) in periods.items() if end <= cutoff)
+
+  return to_create, expired
+
+
+class AuditPartitionManager:
+  """Periodic job creating, archiving and dropping audit_logs partitions."""
+
+  def __init__(
+    self,
+    engine=async_engine,
+    granularity: str = settings.audit_partition_interval,
+    premake: int = settings.audit_partition_premake,
+    retention_days: int = settings.audit_retention_days,
+    archive_dir: Optional[str] = settings.audit_archive_dir,
+    interval_seconds: float = settings.audit_partition_check_seconds
+  ):
+    self.engine = engine
+    self.granularity = granularity
+    self.premake = premake
+    self.retention_days = retention_days
+    self.archive_dir = archive_dir or None
+    self.interval_seconds = interval_seconds
+    self._task: Optional[asyncio.Task] = None
+    self.metrics: Dict[str, Any] = {
+      "runs": 0,
+      "skipped_runs": 0,
+      "partitioned": None,
+      "created": [],
+      "dropped": [],
+      "archived": [],
+      "last_run_started": None,
+      "last_run_duration_seconds": None,
+      "last_error": None,
+    }
+
+  @property
+  def running(self) -> bool:
+    """Whether the periodic worker task is active."""
+    return self._task is not None and not self._task.done()
+
+  def start(self) -> None:
+    """Start the periodic worker on the running event loop."""
+    if self.running:
+      return
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """Cancel the worker."""
+    if not self.running:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
+
+  def get_metrics(self) -> Dict[str, Any]:
+    """Progress metrics of the maintenance job."""
+    return {
+      **self.metrics,
+      "running": self.running,
+      "granularity": self.granularity,
+      "retention_days": self.retention_days,
+    }
+
+  async def _is_partitioned(self, conn) -> bool:
+    if conn.dialect.name != "postgresql":
+      return False
+    result = await conn.execute(text(
+      "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+      "JOIN pg_class c ON c.oid = pt.partrelid "
+      "WHERE c.relname = :parent AND pg_table_is_visible(c.oid))"
+    ), {"parent": PARENT_TABLE})
+    return bool(result.scalar())
+
+  async def _list_partitions(self, conn) -> List[str]:
+    result = await conn.execute(text(
+      "SELECT child.relname FROM pg_inherits i "
+      "JOIN pg_class child ON child.oid = i.inhrelid "
+      "JOIN pg_class parent ON parent.oid = i.inhparent "
+      "WHERE parent.relname = :parent AND pg_table_is_visible(parent.oid)"
+    ), {"parent": PARENT_TABLE})
+    return [row[0] for row in result.all()]
+
+  async def _create_partition(self, name: str, start: date, end: date) -> None:
+    bounds = {"start": start.isoformat(), "end": end.isoformat()}
+    in_range = "created_at >= CAST(:start AS timestamptz) AND created_at < CAST(:end AS timestamptz)"
+    create = (
+      f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+      f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+    async with self.engine.begin() as conn:
+      result = await conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds
+      )
+      if not result.scalar():
+        await conn.execute(text(create))
+        return
+
+      # Rows of this range sit in the default partition, which makes
+      # PostgreSQL refuse the new partition: move them over
+      logger.warning(f"Moving audit rows from {DEFAULT_PARTITION} into {name}")
+      await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+      await conn.execute(text(create))
+      await conn.execute(
+        text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds
+      )
+      await conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+      await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+  async def archive_partition(self, name: str, chunk_size: int = 1000) -> str:
+    """
+    Write all rows of a partition to ``<archive_dir>/<name>.jsonl.gz``.
+
+    The file is written under a temporary name and renamed when complete,
+    so a present archive is always whole.
+
+    Returns:
+      Path of the archive file
+    """
+    os.makedirs(self.archive_dir, exist_ok=True)
+    path = os.path.join(self.archive_dir, f"{name}.jsonl.gz")
+    partial_path = f"{path}.partial"
+
+    archive = await asyncio.to_thread(gzip.open, partial_path, "wt", encoding="utf-8")
+    try:
+      try:
+        async with self.engine.connect() as conn:
+          result = await conn.stream(text(f"SELECT * FROM {name} ORDER BY id"))
+          async for rows in result.partitions(chunk_size):
+            lines = "".join(
+              json.dumps(dict(row._mapping), default=str, separators=(",", ":")) + "\n"
+              for row in rows
+            )
+            await asyncio.to_thread(archive.write, lines)
+      finally:
+        await asyncio.to_thread(archive.close)
+      os.replace(partial_path, path)
+    except BaseException:
+      # Do not leave a truncated archive behind for the next attempt
+      if os.path.exists(partial_path):
+        os.unlink(partial_path)
+      raise
+    return path
+
+  async def _drop_partition(self, name: str) -> None:
+    async with self.engine.begin() as conn:
+      await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+      await conn.execute(text(f"DROP TABLE {name}"))
+
+  async def _acquire_lock(self, conn) -> bool:
+    result = await conn.execute(
+      text("SELECT pg_try_advisory_lock(:key)"), {"key": AUDIT_PARTITION_LOCK_KEY}
+    )
+    acquired = bool(result.scalar())
+    # Do not keep a transaction open on the lock connection
+    await conn.commit()
+    return acquired
+
+  async def _release_lock(self, conn) -> None:
+    await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": AUDIT_PARTITION_LOCK_KEY})
+    await conn.commit()
+
+  async def run_once(self, today: Optional[date] = None) -> Optional[Dict[str, List[str]]]:
+    """
+    Run one maintenance pass.
+
+    Returns:
+      Partition names created, archived and dropped, or None when the table
+      is not partitioned or another replica holds the lock
+    """
+    today = today or datetime.now(timezone.utc).date()
+
+    async with self.engine.connect() as lock_conn:
+      partitioned = await self._is_partitioned(lock_conn)
+      await lock_conn.commit()
+      self.metrics["partitioned"] = partitioned
+      if not partitioned or not await self._acquire_lock(lock_conn):
+        self.metrics["skipped_runs"] += 1
+        return None
+
+      started = time.monotonic()
+      self.metrics["last_run_started"] = datetime.now(timezone.utc).isoformat()
+      done: Dict[str, List[str]] = {"created": [], "archived": [], "dropped": []}
+      try:
+        existing = await self._list_partitions(lock_conn)
+        await lock_conn.commit()
+        to_create, expired = plan_partitions(
+          today, existing, self.granularity, self.premake, self.retention_days
+        )
+
+        for name, start, end in to_create:
+          await self._create_partition(name, start, end)
+          done["created"].append(name)
+
+        for name in expired:
+          if self.archive_dir:
+            await self.archive_partition(name)
+            done["archived"].append(name)
+          await self._drop_partition(name)
+          done["dropped"].append(name)
+      finally:
+        await self._release_lock(lock_conn)
+
+    for key, names in done.items():
+      self.metrics[key] = (self.metrics[key] + names)[-50:]
+    self.metrics["runs"] += 1
+    self.metrics["last_run_duration_seconds"] = round(time.monotonic() - started, 3)
+    self.metrics["last_error"] = None
+    if any(done.values()):
+      logger.info(f"Audit partition maintenance: {done}")
+    return done
+
+  async def _run(self) -> None:
+    while True:
+      try:
+        await self.run_once()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        self.metrics["last_error"] = str(e)
+        logger.error(f"Audit partition maintenance failed: {e}")
+      await asyncio.sleep(self.interval_seconds)
+
+
+# Global maintenance job, started in the application lifespan when enabled
+audit_partition_manager = AuditPartitionManager()
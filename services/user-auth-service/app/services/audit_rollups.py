@@ -0,0 +1,313 @@
+"""
+Hourly rollups of audit events for the security summary.
+
+The rollup job counts audit_logs rows per hour, action, severity, success
+and IP into ``audit_rollups``. Each pass recomputes the last few rolled-up
+hours as well as the new ones, so events committed late (e.g. by the
+background audit writer) are still counted, and every hour is rewritten
+in a single transaction, so passes are idempotent.
+
+``audit_rollup_state`` records the covered range of hours. Summaries read
+whole hours inside that range from the rollups and count only the
+partial hours at the edges of the window (at most about an hour each)
+from audit_logs, so they stay exact and cost the same for 24 hours as for
+30 days.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, literal, or_, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.audit_log import AuditLog
+from app.models.audit_rollup import AuditRollup, AuditRollupState
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock
+AUDIT_ROLLUP_LOCK_KEY = 7_301_420_039
+
+BUCKET = timedelta(hours=1)
+STATE_ID = 1
+
+
+def floor_hour(moment: datetime) -> datetime:
+  """Start of the hour containing ``moment``."""
+  return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(moment: datetime) -> datetime:
+  """Start of the first hour at or after ``moment``."""
+  floored = floor_hour(moment)
+  return floored if floored == moment else floored + BUCKET
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+  if moment is not None and moment.tzinfo is not None:
+    moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+  return moment
+
+
+async def get_rollup_range(db: AsyncSession) -> Optional[Tuple[datetime, datetime]]:
+  """Hours covered by the rollups as (rolled_from, rolled_until), if any."""
+  result = await db.execute(
+    select(AuditRollupState.rolled_from, AuditRollupState.rolled_until)
+    .where(AuditRollupState.id == STATE_ID)
+  )
+  row = result.first()
+  if row is None:
+    return None
+  return _naive_utc(row[0]), _naive_utc(row[1])
+
+
+async def audit_event_counts(db: AsyncSession, since: datetime, until: datetime):
+  """
+  Audit events between ``since`` and ``until`` as countable rows.
+
+  Returns a subquery of (action, success, ip_address, event_count) rows:
+  rollup buckets for the whole hours covered by the rollups, and one row
+  per raw event for the remaining edges of the window.
+  """
+  covered = await get_rollup_range(db)
+
+  rollup_start = rollup_end = None
+  if covered:
+    rollup_start = max(ceil_hour(since), covered[0])
+    rollup_end = min(floor_hour(until), covered[1])
+
+  if rollup_start is None or rollup_start >= rollup_end:
+    raw_window = and_(AuditLog.created_at >= since, AuditLog.created_at < until)
+    rollup_window = None
+  else:
+    raw_window = or_(
+      and_(AuditLog.created_at >= since, AuditLog.created_at < rollup_start),
+      and_(AuditLog.created_at >= rollup_end, AuditLog.created_at < until)
+    )
+    rollup_window = and_(AuditRollup.bucket_start >= rollup_start, AuditRollup.bucket_start < rollup_end)
+
+  raw = select(
+    AuditLog.action,
+    AuditLog.success,
+    func.coalesce(AuditLog.ip_address, "").label("ip_address"),
+    literal(1).label("event_count")
+  ).where(raw_window)
+  if rollup_window is None:
+    return raw.subquery()
+
+  rollups = select(
+    AuditRollup.action,
+    AuditRollup.success,
+    AuditRollup.ip_address,
+    AuditRollup.event_count
+  ).where(rollup_window)
+  return union_all(rollups, raw).subquery()
+
+
+class AuditRollupJob:
+  """Periodic worker maintaining the hourly audit rollups."""
+
+  def __init__(
+    self,
+    engine=async_engine,
+    interval_seconds: float = settings.audit_rollup_interval_seconds,
+    recompute_hours: int = settings.audit_rollup_recompute_hours,
+    backfill_days: int = settings.audit_rollup_backfill_days,
+    retention_days: int = settings.audit_retention_days
+  ):
+    self.engine = engine
+    self.interval_seconds = interval_seconds
+    self.recompute_hours = recompute_hours
+    self.backfill_days = backfill_days
+    self.retention_days = retention_days
+    self._task: Optional[asyncio.Task] = None
+    self.metrics: Dict[str, Any] = {
+      "runs": 0,
+      "skipped_runs": 0,
+      "buckets_computed": 0,
+      "rolled_from": None,
+      "rolled_until": None,
+      "last_run_duration_seconds": None,
+      "last_error": None,
+    }
+
+  @property
+  def running(self) -> bool:
+    """Whether the periodic worker task is active."""
+    return self._task is not None and not self._task.done()
+
+  def start(self) -> None:
+    """Start the periodic worker on the running event loop."""
+    if self.running:
+      return
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """Cancel the worker; the hour in flight is rolled back."""
+    if not self.running:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
+
+  def get_metrics(self) -> Dict[str, Any]:
+    """Progress metrics of the rollup job."""
+    return {**self.metrics, "running": self.running}
+
+  async def _acquire_lock(self, conn) -> bool:
+    if conn.dialect.name != "postgresql":
+      return True
+    result = await conn.execute(
+      text("SELECT pg_try_advisory_lock(:key)"), {"key": AUDIT_ROLLUP_LOCK_KEY}
+    )
+    acquired = bool(result.scalar())
+    # Do not keep a transaction open on the lock connection
+    await conn.commit()
+    return acquired
+
+  async def _release_lock(self, conn) -> None:
+    if conn.dialect.name == "postgresql":
+      await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": AUDIT_ROLLUP_LOCK_KEY})
+      await conn.commit()
+
+  async def _read_state(self) -> Optional[Tuple[datetime, datetime]]:
+    async with self.engine.connect() as conn:
+      result = await conn.execute(
+        select(AuditRollupState.rolled_from, AuditRollupState.rolled_until)
+        .where(AuditRollupState.id == STATE_ID)
+      )
+      row = result.first()
+    if row is None:
+      return None
+    return _naive_utc(row[0]), _naive_utc(row[1])
+
+  async def _oldest_event(self) -> Optional[datetime]:
+    async with self.engine.connect() as conn:
+      result = await conn.execute(select(func.min(AuditLog.created_at)))
+      return _naive_utc(result.scalar())
+
+  def _state_update(self, state: Optional[Tuple[datetime, datetime]], rolled_from: datetime, rolled_until: datetime):
+    table = AuditRollupState.__table__
+    if state is None:
+      return table.insert().values(id=STATE_ID, rolled_from=rolled_from, rolled_until=rolled_until)
+    return (
+      table.update()
+      .where(table.c.id == STATE_ID)
+      .values(rolled_from=rolled_from, rolled_until=rolled_until)
+    )
+
+  async def _compute_bucket(self, conn, bucket_start: datetime) -> None:
+    """Rewrite the rollup rows of one hour from audit_logs."""
+    bucket_end = bucket_start + BUCKET
+    ip_address = func.coalesce(AuditLog.ip_address, "")
+    counts = (
+      select(
+        literal(bucket_start, AuditRollup.bucket_start.type),
+        AuditLog.action,
+        AuditLog.severity,
+        AuditLog.success,
+        ip_address,
+        func.count()
+      )
+      .where(AuditLog.created_at >= bucket_start, AuditLog.created_at < bucket_end)
+      .group_by(AuditLog.action, AuditLog.severity, AuditLog.success, ip_address)
+    )
+    await conn.execute(delete(AuditRollup).where(AuditRollup.bucket_start == bucket_start))
+    await conn.execute(
+      AuditRollup.__table__.insert().from_select(
+        ["bucket_start", "action", "severity", "success", "ip_address", "event_count"],
+        counts
+      )
+    )
+
+  async def _roll_up(self, now: datetime) -> int:
+    state = await self._read_state()
+    complete_until = floor_hour(now)
+    horizon = floor_hour(now - timedelta(days=self.backfill_days))
+
+    if state is None:
+      oldest = await self._oldest_event()
+      rolled_from = max(floor_hour(oldest), horizon) if oldest else complete_until
+      start = rolled_from
+    else:
+      rolled_from = state[0]
+      start = max(state[1] - BUCKET * self.recompute_hours, rolled_from)
+
+    # Rollups (and audit rows) past retention are no longer needed
+    if self.retention_days > 0:
+      retention_start = floor_hour(now - timedelta(days=self.retention_days))
+      if retention_start > rolled_from:
+        async with self.engine.begin() as conn:
+          await conn.execute(delete(AuditRollup).where(AuditRollup.bucket_start < retention_start))
+        rolled_from = retention_start
+        start = max(start, rolled_from)
+
+    computed = 0
+    bucket_start = start
+    while bucket_start < complete_until:
+      async with self.engine.begin() as conn:
+        await self._compute_bucket(conn, bucket_start)
+        await conn.execute(self._state_update(state, rolled_from, bucket_start + BUCKET))
+      state = (rolled_from, bucket_start + BUCKET)
+      bucket_start += BUCKET
+      computed += 1
+
+    if state is None or state[0] != rolled_from:
+      # Nothing to compute yet, or only the retention start moved
+      rolled_until = max(state[1], rolled_from) if state else rolled_from
+      async with self.engine.begin() as conn:
+        await conn.execute(self._state_update(state, rolled_from, rolled_until))
+      state = (rolled_from, rolled_until)
+
+    self.metrics["rolled_from"] = state[0].isoformat()
+    self.metrics["rolled_until"] = state[1].isoformat()
+    return computed
+
+  async def run_once(self, now: Optional[datetime] = None) -> Optional[int]:
+    """
+    Bring the rollups up to the last complete hour.
+
+    Returns:
+      Number of hours computed, or None when another replica holds the lock
+    """
+    now = _naive_utc(now) or datetime.utcnow()
+
+    async with self.engine.connect() as lock_conn:
+      if not await self._acquire_lock(lock_conn):
+        self.metrics["skipped_runs"] += 1
+        return None
+
+      started = time.monotonic()
+      try:
+        computed = await self._roll_up(now)
+      finally:
+        await self._release_lock(lock_conn)
+
+    self.metrics["runs"] += 1
+    self.metrics["buckets_computed"] += computed
+    self.metrics["last_run_duration_seconds"] = round(time.monotonic() - started, 3)
+    self.metrics["last_error"] = None
+    return computed
+
+  async def _run(self) -> None:
+    while True:
+      try:
+        await self.run_once()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        self.metrics["last_error"] = str(e)
+        logger.error(f"Audit rollup failed: {e}")
+      await asyncio.sleep(self.interval_seconds)
+
+
+# Global rollup job, started in the application lifespan when enabled
+audit_rollup_job = AuditRollupJob()
@@ -4,14 +4,65 @@ Provides centralized audit logging functionality for the application.
 """
 
 import asyncio
-from typing import Optional, Dict, Any, List
+import base64
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc, func
+from sqlalchemy import select, and_, case, desc, func, tuple_
 from datetime import datetime, timedelta
 
 from app.models.audit_log import AuditLog, AuditAction, AuditSeverity
 from app.core.database import get_db
+from app.services.audit_rollups import audit_event_counts
+from app.services.audit_writer import audit_writer
+
+# Columns that can be selected by audit log queries and exports
+AUDIT_LOG_FIELDS = [column.name for column in AuditLog.__table__.columns]
+
+# Large, rarely needed columns left out unless requested explicitly
+HEAVY_AUDIT_LOG_FIELDS = ("user_agent", "client_info", "request_data", "additional_data")
+
+DEFAULT_AUDIT_LOG_FIELDS = [name for name in AUDIT_LOG_FIELDS if name not in HEAVY_AUDIT_LOG_FIELDS]
+
+
+def resolve_audit_log_fields(fields: Optional[List[str]] = None) -> List[str]:
+    """
+    Validate a column projection, defaulting to all but the heavy columns.
+    
+    ``id`` and ``created_at`` are always included since pages are keyed
+    on them.
+    
+    Raises:
+        ValueError: If a field is not an audit log column
+    """
+    if not fields:
+        return list(DEFAULT_AUDIT_LOG_FIELDS)
+    unknown = [name for name in fields if name not in AUDIT_LOG_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown audit log fields: {', '.join(unknown)}")
+    required = [name for name in ("id", "created_at") if name not in fields]
+    return required + list(dict.fromkeys(fields))
+
+
+def encode_audit_cursor(created_at: datetime, log_id: int) -> str:
+    """Opaque cursor pointing after the audit log (created_at, id)."""
+    raw = f"{created_at.isoformat()}|{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_audit_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_audit_cursor.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, log_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(log_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 
 class AuditService:
@@ -33,7 +84,8 @@ class AuditService:
         success: bool = True,
         error_message: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        defer: bool = False
     ) -> AuditLog:
         """
         Create and save an audit log entry.
@@ -54,6 +106,9 @@ class AuditService:
             error_message: Error message if action failed
             metadata: Additional metadata
             tags: Tags for categorization
+            defer: Hand the entry to the background audit writer instead of
+                committing it here. Without a running writer the entry is
+                added to ``db`` and committed with the caller's transaction.
             
         Returns:
             Created AuditLog instance
@@ -97,6 +152,11 @@ class AuditService:
             request_id=request_id
         )
         
+        if defer:
+            if not audit_writer.emit(audit_log):
+                db.add(audit_log)
+            return audit_log
+        
         # Save to database
         db.add(audit_log)
         await db.commit()
@@ -112,7 +172,8 @@ class AuditService:
         db: AsyncSession,
         user_id: int,
         request: Optional[Request] = None,
-        login_method: str = "password"
+        login_method: str = "password",
+        defer: bool = False
     ) -> AuditLog:
         """Log successful authentication."""
         return await AuditService.log_action(
@@ -124,7 +185,8 @@ class AuditService:
             severity=AuditSeverity.LOW,
             success=True,
             metadata={"login_method": login_method},
-            tags=["authentication", "success"]
+            tags=["authentication", "success"],
+            defer=defer
         )
     
     @staticmethod
@@ -133,7 +195,8 @@ class AuditService:
         email: str,
         reason: str,
         request: Optional[Request] = None,
-        attempt_count: Optional[int] = None
+        attempt_count: Optional[int] = None,
+        defer: bool = False
     ) -> AuditLog:
         """Log failed authentication attempt."""
         severity = AuditSeverity.HIGH if attempt_count and attempt_count >= 3 else AuditSeverity.MEDIUM
@@ -147,7 +210,8 @@ class AuditService:
             success=False,
             error_message=reason,
             metadata={"email": email, "reason": reason, "attempt_count": attempt_count},
-            tags=["authentication", "failure"]
+            tags=["authentication", "failure"],
+            defer=defer
         )
     
     @staticmethod
@@ -283,6 +347,35 @@ class AuditService:
             List of matching audit logs
         """
         query = select(AuditLog)
+        conditions = AuditService._filter_conditions(
+            user_id=user_id,
+            action=action,
+            severity=severity,
+            start_date=start_date,
+            end_date=end_date,
+            ip_address=ip_address,
+            success=success
+        )
+        
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        query = query.order_by(desc(AuditLog.created_at)).limit(limit).offset(offset)
+        
+        result = await db.execute(query)
+        return result.scalars().all()
+    
+    @staticmethod
+    def _filter_conditions(
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        severity: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        ip_address: Optional[str] = None,
+        success: Optional[bool] = None
+    ) -> list:
+        """WHERE conditions for the audit log query filters."""
         conditions = []
         
         if user_id:
@@ -300,13 +393,84 @@ class AuditService:
         if success is not None:
             conditions.append(AuditLog.success == success)
         
+        return conditions
+    
+    @staticmethod
+    def _projected_query(fields: Optional[List[str]], filters: Dict[str, Any]):
+        columns = [AuditLog.__table__.c[name] for name in resolve_audit_log_fields(fields)]
+        query = select(*columns)
+        conditions = AuditService._filter_conditions(**filters)
         if conditions:
             query = query.where(and_(*conditions))
+        # id breaks ties between entries of the same timestamp
+        return query.order_by(desc(AuditLog.created_at), desc(AuditLog.id))
+    
+    @staticmethod
+    async def get_audit_log_page(
+        db: AsyncSession,
+        fields: Optional[List[str]] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        **filters
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Query a page of audit logs, newest first, as plain rows.
         
-        query = query.order_by(desc(AuditLog.created_at)).limit(limit).offset(offset)
+        With a cursor the page continues after the last row of the previous
+        page by keyset on (created_at, id), so deep pages cost the same as
+        the first one; offset is only applied without a cursor.
         
-        result = await db.execute(query)
-        return result.scalars().all()
+        Args:
+            db: Database session
+            fields: Columns to select (see resolve_audit_log_fields)
+            limit: Maximum number of results
+            cursor: Cursor returned with the previous page
+            offset: Number of results to skip when no cursor is given
+            **filters: Filters as accepted by get_audit_logs
+            
+        Returns:
+            Rows of the page and the cursor of the next page (None on the last page)
+            
+        Raises:
+            ValueError: If fields or cursor are invalid
+        """
+        query = AuditService._projected_query(fields, filters)
+        if cursor:
+            created_at, log_id = decode_audit_cursor(cursor)
+            query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < tuple_(created_at, log_id))
+        elif offset:
+            query = query.offset(offset)
+        
+        result = await db.execute(query.limit(limit + 1))
+        rows = [dict(row._mapping) for row in result.all()]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_audit_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return rows, next_cursor
+    
+    @staticmethod
+    async def stream_audit_logs(
+        db: AsyncSession,
+        fields: Optional[List[str]] = None,
+        batch_size: int = 1000,
+        **filters
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream matching audit logs, newest first, in batches of plain rows.
+        
+        Rows are fetched through a server-side cursor, so memory stays
+        bounded by ``batch_size`` whatever the number of rows.
+        
+        Raises:
+            ValueError: If fields are invalid
+        """
+        query = AuditService._projected_query(fields, filters).execution_options(yield_per=batch_size)
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield [dict(row._mapping) for row in rows]
     
     @staticmethod
     async def get_security_summary(
@@ -316,6 +480,9 @@ class AuditService:
         """
         Get security summary for the specified time period.
         
+        Reads the hourly audit rollups, so the cost hardly depends on the
+        length of the period.
+        
         Args:
             db: Database session
             hours: Number of hours to look back
@@ -323,54 +490,37 @@ class AuditService:
         Returns:
             Dictionary containing security metrics
         """
-        since = datetime.utcnow() - timedelta(hours=hours)
+        now = datetime.utcnow()
+        since = now - timedelta(hours=hours)
         
-        # Total events
-        total_query = select(func.count(AuditLog.id)).where(AuditLog.created_at >= since)
-        total_result = await db.execute(total_query)
-        total_events = total_result.scalar()
-        
-        # Failed authentication attempts
-        failed_auth_query = select(func.count(AuditLog.id)).where(
-            and_(
-                AuditLog.created_at >= since,
-                AuditLog.action == AuditAction.LOGIN_FAILED.value
-            )
-        )
-        failed_auth_result = await db.execute(failed_auth_query)
-        failed_auth = failed_auth_result.scalar()
+        # Whole hours come from the hourly rollups, the partial hours at
+        # the edges of the window from audit_logs
+        events = await audit_event_counts(db, since, now)
         
-        # Suspicious activities
-        suspicious_query = select(func.count(AuditLog.id)).where(
-            and_(
-                AuditLog.created_at >= since,
-                AuditLog.action == AuditAction.SUSPICIOUS_ACTIVITY.value
+        def count_of(action: AuditAction):
+            return func.coalesce(
+                func.sum(case((events.c.action == action.value, events.c.event_count), else_=0)), 0
             )
-        )
-        suspicious_result = await db.execute(suspicious_query)
-        suspicious_activities = suspicious_result.scalar()
         
-        # Rate limit violations
-        rate_limit_query = select(func.count(AuditLog.id)).where(
-            and_(
-                AuditLog.created_at >= since,
-                AuditLog.action == AuditAction.RATE_LIMIT_EXCEEDED.value
-            )
+        totals_query = select(
+            func.coalesce(func.sum(events.c.event_count), 0),
+            count_of(AuditAction.LOGIN_FAILED),
+            count_of(AuditAction.SUSPICIOUS_ACTIVITY),
+            count_of(AuditAction.RATE_LIMIT_EXCEEDED)
         )
-        rate_limit_result = await db.execute(rate_limit_query)
-        rate_limit_violations = rate_limit_result.scalar()
+        totals_result = await db.execute(totals_query)
+        total_events, failed_auth, suspicious_activities, rate_limit_violations = totals_result.one()
         
         # Top IPs by failed attempts
         top_ips_query = select(
-            AuditLog.ip_address,
-            func.count(AuditLog.id).label('count')
+            events.c.ip_address,
+            func.sum(events.c.event_count).label('count')
         ).where(
             and_(
-                AuditLog.created_at >= since,
-                AuditLog.success == False,
-                AuditLog.ip_address.isnot(None)
+                events.c.success == False,
+                events.c.ip_address != ""
             )
-        ).group_by(AuditLog.ip_address).order_by(desc('count')).limit(10)
+        ).group_by(events.c.ip_address).order_by(desc('count')).limit(10)
         
         top_ips_result = await db.execute(top_ips_query)
         top_ips = [{"ip": row.ip_address, "failed_attempts": row.count} 
@@ -383,7 +533,7 @@ class AuditService:
             "suspicious_activities": suspicious_activities,
             "rate_limit_violations": rate_limit_violations,
             "top_failing_ips": top_ips,
-            "generated_at": datetime.utcnow().isoformat()
+            "generated_at": now.isoformat()
         }
     
     @staticmethod
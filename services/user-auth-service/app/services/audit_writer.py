@@ -0,0 +1,150 @@
+"""
+Background audit log writer.
+
+Audit entries emitted on latency-sensitive paths such as login are queued
+and written in batches by a single worker task (one commit per batch), so
+the request never waits for the audit insert. A failed batch is retried
+with backoff and then written row by row, so one bad entry or a short
+database outage does not lose the whole batch; entries that still fail are
+counted in audit_entries_dropped_total.
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from prometheus_client import Counter
+
+from app.core.database import async_session_factory
+from app.models.audit_log import AuditAction, AuditLog
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ENTRIES_DROPPED = Counter(
+    "audit_entries_dropped_total",
+    "Audit log entries the background writer failed to persist",
+)
+
+
+class AuditWriter:
+    """Queue-backed writer persisting audit logs off the request path."""
+
+    def __init__(
+        self,
+        session_factory=async_session_factory,
+        batch_size: int = 100,
+        max_queue_size: int = 10000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker task is accepting entries."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush queued entries and stop the worker."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def emit(self, audit_log: AuditLog) -> bool:
+        """
+        Queue an audit log for writing.
+
+        Returns:
+            False when the writer is not running or the queue is full; the
+            caller is then responsible for persisting the entry itself.
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(audit_log)
+        except asyncio.QueueFull:
+            logger.warning("Audit queue full, writing entry in the request transaction")
+            return False
+        return True
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch: List[AuditLog] = []
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+
+            while len(batch) < self.batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    continue
+                batch.append(item)
+
+            if batch:
+                await self._write(batch)
+
+    async def _write(self, batch: List[AuditLog]) -> None:
+        from app.services.audit_service import AuditService
+
+        written = await self._write_batch(batch)
+        if written is None:
+            written = await self._write_rows(batch)
+
+        for audit_log in written:
+            if audit_log.action == AuditAction.LOGIN_FAILED.value:
+                asyncio.create_task(AuditService._check_suspicious_patterns(audit_log))
+
+    async def _write_batch(self, batch: List[AuditLog]) -> Optional[List[AuditLog]]:
+        """Commit the batch at once, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.session_factory() as db:
+                    db.add_all(batch)
+                    await db.commit()
+                return batch
+            except Exception as e:
+                # Never let audit persistence take the worker down
+                logger.warning(
+                    f"Failed to write {len(batch)} audit log entries "
+                    f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+                )
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return None
+
+    async def _write_rows(self, batch: List[AuditLog]) -> List[AuditLog]:
+        """Commit the entries one by one, dropping only those that fail."""
+        written = []
+        for audit_log in batch:
+            try:
+                async with self.session_factory() as db:
+                    db.add(audit_log)
+                    await db.commit()
+                written.append(audit_log)
+            except Exception as e:
+                AUDIT_ENTRIES_DROPPED.inc()
+                logger.error(f"Dropped audit log entry {audit_log.action!r}: {e}")
+        return written
+
+
+# Global writer instance, started in the application lifespan
+audit_writer = AuditWriter()
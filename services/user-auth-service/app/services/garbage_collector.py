@@ -0,0 +1,201 @@
+"""
+Background garbage collection of expired authentication data.
+
+Expired and old revoked sessions, expired or old revoked service tokens and
+password history beyond the retention count are deleted in bounded batches,
+one short transaction per batch with a pause in between, so cleanup never
+holds long locks or produces large WAL bursts. On PostgreSQL a session-level
+advisory lock makes sure only one replica collects at a time.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, text
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models.password_history import PasswordHistory
+from app.models.role import UserSession
+from app.models.service import ServiceToken
+from app.services.password_service import PasswordPolicyConfig
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock
+GC_ADVISORY_LOCK_KEY = 7_301_420_034
+
+
+def bounded_delete(model, *criteria, batch_size: int):
+  """
+  DELETE of at most ``batch_size`` rows of ``model`` matching ``criteria``.
+
+  Written as ``id IN (SELECT id ... LIMIT n)`` since neither PostgreSQL nor
+  SQLite support LIMIT on DELETE directly.
+  """
+  ids = select(model.id).where(*criteria).limit(batch_size).scalar_subquery()
+  return delete(model).where(model.id.in_(ids))
+
+
+class GarbageCollector:
+  """Periodic, throttled cleanup worker with progress metrics."""
+
+  def __init__(
+    self,
+    engine=async_engine,
+    interval_seconds: float = settings.gc_interval_seconds,
+    batch_size: int = settings.gc_batch_size,
+    batch_pause_seconds: float = settings.gc_batch_pause_seconds,
+    revoked_retention_days: int = settings.gc_revoked_retention_days
+  ):
+    self.engine = engine
+    self.interval_seconds = interval_seconds
+    self.batch_size = batch_size
+    self.batch_pause_seconds = batch_pause_seconds
+    self.revoked_retention_days = revoked_retention_days
+    self._task: Optional[asyncio.Task] = None
+    self.metrics: Dict[str, Any] = {
+      "runs": 0,
+      "skipped_runs": 0,
+      "batches": 0,
+      "deleted": {},
+      "current_task": None,
+      "last_run_started": None,
+      "last_run_duration_seconds": None,
+      "last_run_deleted": {},
+      "last_error": None,
+    }
+
+  @property
+  def running(self) -> bool:
+    """Whether the periodic worker task is active."""
+    return self._task is not None and not self._task.done()
+
+  def start(self) -> None:
+    """Start the periodic worker on the running event loop."""
+    if self.running:
+      return
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """Cancel the worker; a batch in flight is rolled back."""
+    if not self.running:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
+
+  def get_metrics(self) -> Dict[str, Any]:
+    """Progress metrics of the collector."""
+    return {**self.metrics, "running": self.running, "batch_size": self.batch_size}
+
+  def _tasks(self) -> List[Tuple[str, Any, tuple]]:
+    now = datetime.now(timezone.utc)
+    revoked_cutoff = now - timedelta(days=self.revoked_retention_days)
+
+    # Password history rows ranked newest first per user
+    ranked_history = select(
+      PasswordHistory.id,
+      func.row_number().over(
+        partition_by=PasswordHistory.user_id,
+        order_by=(PasswordHistory.created_at.desc(), PasswordHistory.id.desc())
+      ).label("position")
+    ).subquery()
+    stale_history = select(ranked_history.c.id).where(
+      ranked_history.c.position > PasswordPolicyConfig.PASSWORD_HISTORY_COUNT
+    )
+
+    return [
+      ("expired_sessions", UserSession, (UserSession.expires_at < now,)),
+      ("revoked_sessions", UserSession, (
+        UserSession.is_revoked == True,
+        UserSession.created_at < revoked_cutoff
+      )),
+      ("service_tokens", ServiceToken, (
+        or_(
+          ServiceToken.expires_at < now,
+          and_(ServiceToken.is_revoked == True, ServiceToken.revoked_at < revoked_cutoff)
+        ),
+      )),
+      ("password_history", PasswordHistory, (PasswordHistory.id.in_(stale_history),)),
+    ]
+
+  async def _acquire_lock(self, conn) -> bool:
+    if conn.dialect.name != "postgresql":
+      return True
+    result = await conn.execute(
+      text("SELECT pg_try_advisory_lock(:key)"), {"key": GC_ADVISORY_LOCK_KEY}
+    )
+    acquired = bool(result.scalar())
+    # Do not keep a transaction open on the lock connection
+    await conn.commit()
+    return acquired
+
+  async def _release_lock(self, conn) -> None:
+    if conn.dialect.name == "postgresql":
+      await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": GC_ADVISORY_LOCK_KEY})
+      await conn.commit()
+
+  async def _collect(self, name: str, model, criteria: tuple) -> int:
+    deleted = 0
+    while True:
+      async with self.engine.begin() as conn:
+        result = await conn.execute(bounded_delete(model, *criteria, batch_size=self.batch_size))
+      count = result.rowcount or 0
+      deleted += count
+      self.metrics["batches"] += 1
+      self.metrics["deleted"][name] = self.metrics["deleted"].get(name, 0) + count
+      if count < self.batch_size:
+        return deleted
+      await asyncio.sleep(self.batch_pause_seconds)
+
+  async def run_once(self) -> Optional[Dict[str, int]]:
+    """
+    Run one collection pass over all tasks.
+
+    Returns:
+      Rows deleted per task, or None when another replica holds the lock
+    """
+    async with self.engine.connect() as lock_conn:
+      if not await self._acquire_lock(lock_conn):
+        self.metrics["skipped_runs"] += 1
+        return None
+
+      started = time.monotonic()
+      self.metrics["last_run_started"] = datetime.now(timezone.utc).isoformat()
+      deleted: Dict[str, int] = {}
+      try:
+        for name, model, criteria in self._tasks():
+          self.metrics["current_task"] = name
+          deleted[name] = await self._collect(name, model, criteria)
+      finally:
+        self.metrics["current_task"] = None
+        await self._release_lock(lock_conn)
+
+    self.metrics["runs"] += 1
+    self.metrics["last_run_deleted"] = deleted
+    self.metrics["last_run_duration_seconds"] = round(time.monotonic() - started, 3)
+    self.metrics["last_error"] = None
+    logger.info(f"Garbage collection deleted {deleted}")
+    return deleted
+
+  async def _run(self) -> None:
+    while True:
+      try:
+        await self.run_once()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        self.metrics["last_error"] = str(e)
+        logger.error(f"Garbage collection failed: {e}")
+      await asyncio.sleep(self.interval_seconds)
+
+
+# Global collector, started in the application lifespan when enabled
+garbage_collector = GarbageCollector()
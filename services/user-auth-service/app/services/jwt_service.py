@@ -8,6 +8,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 
 from app.core.config import settings
+from app.services.permission_registry import decode_mask, permission_registry
 
 
 class JWTService:
@@ -51,6 +52,13 @@ class JWTService:
       "nbf": nbf_timestamp  # Not valid before now
     }
     
+    # Compact encoding only when every code has a registered bit
+    if settings.compact_permission_tokens:
+      encoded = permission_registry.build(permissions).encode()
+      if encoded is not None:
+        del payload["permissions"]
+        payload["pbits"] = encoded
+    
     return jwt.encode(
       payload, 
       settings.secret_key, 
@@ -121,10 +129,23 @@ class JWTService:
         return None
       
       # Verify required fields
-      required_fields = ["user_id", "permissions", "type", "exp"]
+      required_fields = ["user_id", "type", "exp"]
       if not all(field in payload for field in required_fields):
         return None
       
+      if "permissions" not in payload:
+        if "pbits" not in payload:
+          return None
+        
+        # Expand compact permissions so consumers always see a code list;
+        # bits unknown to this worker are resolved by PermissionRegistry.resolve
+        codes, complete = permission_registry.decode_mask(
+          decode_mask(payload["pbits"])
+        )
+        payload["permissions"] = codes
+        if not complete:
+          payload["permissions_incomplete"] = True
+      
       return payload
     
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,447 @@
+"""
+Compiled password policy evaluation.
+Builds the policy's matchers once and checks a password against every rule
+in a single scan; breached passwords are looked up in a memory-mapped index
+or a Bloom filter.
+"""
+
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import re
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+SPECIAL_CHARS = frozenset('!@#$%^&*()_+-=[]{}|;:,.<>?')
+
+# Breached password index: magic, entry count (little endian), then the
+# sorted, distinct DIGEST_SIZE-byte digests of the lowercased passwords
+INDEX_MAGIC = b"MERPBPX1"
+INDEX_HEADER_SIZE = 16
+DIGEST_SIZE = 8
+
+_BACKREFERENCE = re.compile(r"\\(\d+)")
+
+
+def combine_patterns(patterns: Iterable[str]) -> Optional["re.Pattern"]:
+  """
+  Compile regexes into a single alternation. Numeric backreferences are
+  renumbered so each still points at a group of its own pattern.
+  """
+  parts = []
+  offset = 0
+  for pattern in patterns:
+    parts.append("(?:" + _BACKREFERENCE.sub(lambda m: f"\\{int(m.group(1)) + offset}", pattern) + ")")
+    offset += re.compile(pattern).groups
+  return re.compile("|".join(parts)) if parts else None
+
+
+class BloomFilter:
+  """
+  Set of strings in ``size`` bits: lookups have no false negatives and
+  about ``false_positive_rate`` false positives once ``capacity`` items
+  were added. Bit positions come from one BLAKE2b digest (double hashing).
+  """
+
+  __slots__ = ("size", "hash_count", "bits", "count")
+
+  def __init__(self, capacity: int, false_positive_rate: float = 1e-6):
+    capacity = max(capacity, 1)
+    self.size = max(64, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+    self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+    self.bits = bytearray((self.size + 7) // 8)
+    self.count = 0
+
+  def _positions(self, item: str) -> List[int]:
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    step = int.from_bytes(digest[8:], "little") | 1
+    size = self.size
+    return [(first + i * step) % size for i in range(self.hash_count)]
+
+  def add(self, item: str) -> None:
+    bits = self.bits
+    for position in self._positions(item):
+      bits[position >> 3] |= 1 << (position & 7)
+    self.count += 1
+
+  def __contains__(self, item: str) -> bool:
+    bits = self.bits
+    for position in self._positions(item):
+      if not bits[position >> 3] & (1 << (position & 7)):
+        return False
+    return True
+
+  def __len__(self) -> int:
+    return self.count
+
+  @classmethod
+  def from_file(cls, path: str, false_positive_rate: float = 1e-6) -> "BloomFilter":
+    """
+    Build a filter from a password list, one password per line (lowercased,
+    blank lines skipped). The file is read twice to size the filter
+    without holding the list in memory.
+    """
+    with open(path, "rb") as wordlist:
+      capacity = sum(1 for line in wordlist if line.strip())
+    bloom = cls(capacity, false_positive_rate)
+    for password in _read_passwords(path):
+      bloom.add(password)
+    return bloom
+
+
+def _read_passwords(path: str) -> Iterator[str]:
+  """Lowercased passwords of a password list, one per line."""
+  with open(path, encoding="utf-8", errors="replace") as wordlist:
+    for line in wordlist:
+      password = line.strip()
+      if password:
+        yield password.lower()
+
+
+def _digest(password_lower: str) -> bytes:
+  return hashlib.blake2b(password_lower.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+
+
+class BreachedPasswordIndex:
+  """
+  Prebuilt breached password index (see build_breached_index), memory-mapped
+  read-only: worker processes share the file's pages in the page cache
+  instead of each holding a copy. Lookups binary search the sorted digests
+  (O(log n)); with 64-bit digests false positives are negligible.
+  """
+
+  def __init__(self, path: str):
+    with open(path, "rb") as index_file:
+      self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if self._map[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+      self._map.close()
+      raise ValueError(f"{path} is not a breached password index")
+    self.count = int.from_bytes(self._map[len(INDEX_MAGIC):INDEX_HEADER_SIZE], "little")
+    if len(self._map) != INDEX_HEADER_SIZE + self.count * DIGEST_SIZE:
+      self._map.close()
+      raise ValueError(f"{path} is truncated")
+
+  def __contains__(self, password_lower: str) -> bool:
+    key = _digest(password_lower)
+    index = self._map
+    low, high = 0, self.count
+    while low < high:
+      middle = (low + high) // 2
+      offset = INDEX_HEADER_SIZE + middle * DIGEST_SIZE
+      probe = index[offset:offset + DIGEST_SIZE]
+      if probe < key:
+        low = middle + 1
+      elif probe > key:
+        high = middle
+      else:
+        return True
+    return False
+
+  def __len__(self) -> int:
+    return self.count
+
+  def close(self) -> None:
+    self._map.close()
+
+
+def _write_run(digests: List[bytes], directory: str) -> str:
+  digests.sort()
+  with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as run:
+    run.write(b"".join(digests))
+  return run.name
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+  with open(path, "rb") as run:
+    while True:
+      block = run.read(DIGEST_SIZE * 8192)
+      if not block:
+        return
+      for offset in range(0, len(block), DIGEST_SIZE):
+        yield block[offset:offset + DIGEST_SIZE]
+
+
+def build_breached_index(source: str, destination: str, chunk_size: int = 2_000_000) -> int:
+  """
+  Build a breached password index from a password list (one password per
+  line). Digests are sorted in chunks of ``chunk_size`` and merged, so lists
+  larger than memory work; the index replaces ``destination`` atomically.
+  Returns the number of distinct passwords.
+  """
+  directory = os.path.dirname(os.path.abspath(destination))
+  with tempfile.TemporaryDirectory(dir=directory) as work_dir:
+    runs = []
+    chunk = []
+    for password in _read_passwords(source):
+      chunk.append(_digest(password))
+      if len(chunk) >= chunk_size:
+        runs.append(_write_run(chunk, work_dir))
+        chunk = []
+    runs.append(_write_run(chunk, work_dir))
+
+    count = 0
+    partial = os.path.join(work_dir, "index")
+    with open(partial, "wb") as index_file:
+      index_file.write(bytes(INDEX_HEADER_SIZE))
+      previous = None
+      for digest in heapq.merge(*(_read_run(run) for run in runs)):
+        if digest != previous:
+          index_file.write(digest)
+          count += 1
+          previous = digest
+      index_file.seek(0)
+      index_file.write(INDEX_MAGIC + count.to_bytes(INDEX_HEADER_SIZE - len(INDEX_MAGIC), "little"))
+    os.replace(partial, destination)
+  return count
+
+
+def open_breached_passwords(
+  path: str,
+  false_positive_rate: float = 1e-6
+) -> Union[BreachedPasswordIndex, BloomFilter]:
+  """
+  Open a breached password list: a prebuilt index is memory-mapped, a plain
+  password list is loaded into a Bloom filter.
+  """
+  with open(path, "rb") as breached_file:
+    magic = breached_file.read(len(INDEX_MAGIC))
+  if magic == INDEX_MAGIC:
+    return BreachedPasswordIndex(path)
+  return BloomFilter.from_file(path, false_positive_rate)
+
+
+class CompiledPasswordPolicy:
+  """
+  A PasswordPolicyConfig compiled for evaluation: forbidden patterns are
+  one regex, common passwords a lowercased set (plus an optional breached
+  password filter) and the character rules are checked in one pass.
+  """
+
+  def __init__(self, config: Any, breached: Optional[Union[BreachedPasswordIndex, BloomFilter]] = None):
+    self.config = config
+    self.forbidden = combine_patterns(config.FORBIDDEN_PATTERNS)
+    self.common_passwords = frozenset(password.lower() for password in config.COMMON_PASSWORDS)
+    self.breached = breached
+    # Shorter windows are never reported as sequences
+    self.sequence_length = config.MAX_SEQUENTIAL_CHARS if config.MAX_SEQUENTIAL_CHARS >= 3 else 0
+
+  def is_common(self, password_lower: str) -> bool:
+    """Check a lowercased password against the common and breached lists."""
+    if password_lower in self.common_passwords:
+      return True
+    return self.breached is not None and password_lower in self.breached
+
+  def first_sequence(self, password_lower: str) -> Optional[str]:
+    """First window of ascending or descending characters, if any."""
+    window = self.sequence_length
+    if not window:
+      return None
+    ascending = descending = 0
+    previous = -2
+    for i, char in enumerate(password_lower):
+      code = ord(char)
+      ascending = ascending + 1 if code == previous + 1 else 1
+      descending = descending + 1 if code == previous - 1 else 1
+      if ascending >= window or descending >= window:
+        return password_lower[i - window + 1:i + 1]
+      previous = code
+    return None
+
+  def evaluate(self, password: str, user_context: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Evaluate every rule; same result as PasswordService.validate_password_policy."""
+    config = self.config
+    if not password:
+      return {
+        "is_valid": False,
+        "score": 0,
+        "feedback": ["Password is required"],
+        "strength": "Very Weak",
+        "violations": ["empty_password"]
+      }
+
+    length = len(password)
+    lower = password.lower()
+    # lower() rarely changes the length (e.g. "İ"); sequences are then
+    # searched in a second pass over the lowercased password
+    scan_sequences = len(lower) == length and self.sequence_length
+    window = self.sequence_length
+
+    has_upper = has_lower = has_digit = False
+    special = 0
+    run_char = None
+    run = 0
+    repeated = None
+    ascending = descending = 0
+    previous = -2
+    sequence = None
+
+    for i, (char, char_lower) in enumerate(zip(password, lower if scan_sequences else password)):
+      if char.isupper():
+        has_upper = True
+      elif char.islower():
+        has_lower = True
+      elif char.isdigit():
+        has_digit = True
+      if char in SPECIAL_CHARS:
+        special += 1
+
+      if char == run_char:
+        run += 1
+      else:
+        if repeated is None and run > config.MAX_REPEATED_CHARS:
+          repeated = (run_char, run)
+        run_char = char
+        run = 1
+
+      if scan_sequences and sequence is None:
+        code = ord(char_lower)
+        ascending = ascending + 1 if code == previous + 1 else 1
+        descending = descending + 1 if code == previous - 1 else 1
+        if ascending >= window or descending >= window:
+          sequence = lower[i - window + 1:i + 1]
+        previous = code
+
+    if repeated is None and run > config.MAX_REPEATED_CHARS:
+      repeated = (run_char, run)
+    if not scan_sequences:
+      sequence = self.first_sequence(lower)
+
+    feedback = []
+    violations = []
+    score = 0
+
+    if length < config.MIN_LENGTH:
+      feedback.append(f"Password must be at least {config.MIN_LENGTH} characters long")
+      violations.append("min_length")
+    elif length >= config.RECOMMENDED_LENGTH:
+      score += 20
+    else:
+      score += 10
+
+    if length > config.MAX_LENGTH:
+      feedback.append(f"Password must not exceed {config.MAX_LENGTH} characters")
+      violations.append("max_length")
+
+    if config.REQUIRE_UPPERCASE and not has_upper:
+      feedback.append("Password must contain at least one uppercase letter")
+      violations.append("missing_uppercase")
+    elif has_upper:
+      score += 10
+
+    if config.REQUIRE_LOWERCASE and not has_lower:
+      feedback.append("Password must contain at least one lowercase letter")
+      violations.append("missing_lowercase")
+    elif has_lower:
+      score += 10
+
+    if config.REQUIRE_DIGITS and not has_digit:
+      feedback.append("Password must contain at least one number")
+      violations.append("missing_digit")
+    elif has_digit:
+      score += 10
+
+    has_special = special >= config.MIN_SPECIAL_CHARS
+    if config.REQUIRE_SPECIAL_CHARS and not has_special:
+      feedback.append(f"Password must contain at least {config.MIN_SPECIAL_CHARS} special character(s)")
+      violations.append("missing_special")
+    elif has_special:
+      score += 15
+
+    unique_chars = len(set(lower))
+    if unique_chars < config.MIN_UNIQUE_CHARS:
+      feedback.append(f"Password must contain at least {config.MIN_UNIQUE_CHARS} unique characters")
+      violations.append("insufficient_unique_chars")
+    else:
+      score += 10
+
+    if repeated is not None:
+      feedback.append(f"Password contains too many repeated characters ({repeated[0]} repeated {repeated[1]} times)")
+      violations.append("repeated_chars")
+
+    if sequence is not None:
+      feedback.append(f"Password contains sequential characters: {sequence}")
+      violations.append("sequential_patterns")
+
+    if self.forbidden is not None and self.forbidden.search(lower):
+      feedback.append("Password contains forbidden patterns (keyboard sequences or repeated characters)")
+      violations.append("forbidden_patterns")
+
+    if self.is_common(lower):
+      feedback.append("Password is too common and easily guessable")
+      violations.append("common_password")
+      score -= 30
+
+    if user_context:
+      personal_violations = self.check_personal_info(lower, user_context)
+      if personal_violations:
+        feedback.extend(personal_violations)
+        violations.append("personal_info")
+
+    # Complexity bonus: character sets, length beyond the recommendation, entropy
+    char_sets = has_lower + has_upper + has_digit + (special > 0)
+    bonus = char_sets * 5
+    if length > config.RECOMMENDED_LENGTH:
+      bonus += min(10, length - config.RECOMMENDED_LENGTH)
+    charset_size = 26 * has_lower + 26 * has_upper + 10 * has_digit + 32 * (special > 0)
+    if charset_size:
+      entropy = length * math.log2(charset_size)
+      distinct = len(set(password))
+      if distinct < length:
+        entropy *= distinct / length
+      if entropy > 50:
+        bonus += 10
+      elif entropy > 40:
+        bonus += 5
+    score = max(0, min(100, score + bonus))
+
+    return {
+      "is_valid": not violations and score >= config.MIN_COMPLEXITY_SCORE,
+      "score": score,
+      "feedback": feedback,
+      "strength": strength_level(score),
+      "violations": violations,
+      "has_uppercase": has_upper,
+      "has_lowercase": has_lower,
+      "has_digits": has_digit,
+      "has_special": has_special,
+      "unique_chars": unique_chars,
+      "length": length
+    }
+
+  @staticmethod
+  def check_personal_info(password_lower: str, user_context: Dict[str, str]) -> List[str]:
+    """Check a lowercased password for parts of the user's email and name."""
+    violations = []
+
+    if 'email' in user_context:
+      email_parts = user_context['email'].lower().split('@')[0].split('.')
+      for part in email_parts:
+        if len(part) >= 3 and part in password_lower:
+          violations.append("Password should not contain parts of your email address")
+          break
+
+    for field in ['first_name', 'last_name', 'name']:
+      if field in user_context:
+        name_lower = user_context[field].lower()
+        if len(name_lower) >= 3 and name_lower in password_lower:
+          violations.append("Password should not contain your name")
+          break
+
+    return violations
+
+
+def strength_level(score: int) -> str:
+  """Password strength level of a policy score."""
+  if score >= 90:
+    return "Very Strong"
+  elif score >= 80:
+    return "Strong"
+  elif score >= 60:
+    return "Moderate"
+  elif score >= 40:
+    return "Weak"
+  else:
+    return "Very Weak"
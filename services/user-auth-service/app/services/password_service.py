@@ -3,13 +3,50 @@ Enhanced password service with comprehensive policy enforcement.
 Provides secure password hashing, strength validation, and policy compliance.
 """
 
+import asyncio
 import bcrypt
-import re
-import math
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import Union, List, Dict, Optional, Tuple
+from typing import Any, Union, List, Dict, Optional, Tuple
+from prometheus_client import Gauge, Histogram
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, delete
+
+from app.core.config import settings
+from app.core.metrics import record_timing
+from app.services.password_policy import (
+  CompiledPasswordPolicy,
+  open_breached_passwords,
+)
+
+# bcrypt runs on the event loop (except the history comparisons on the bcrypt
+# pool below): its duration is time the worker is blocked
+BCRYPT_DURATION = Histogram(
+  "bcrypt_duration_seconds",
+  "bcrypt hash and verify duration",
+  ["operation"],
+  buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+_BCRYPT_HASH = BCRYPT_DURATION.labels("hash")
+_BCRYPT_VERIFY = BCRYPT_DURATION.labels("verify")
+
+# Threads for bcrypt comparisons off the event loop (bcrypt releases the GIL);
+# the pool size bounds the concurrent comparisons of this worker
+_bcrypt_executor = ThreadPoolExecutor(max_workers=settings.bcrypt_workers, thread_name_prefix="bcrypt")
+
+# Comparisons waiting for a pool thread and being run: a growing queue means
+# BCRYPT_WORKERS is too small for the password change rate
+BCRYPT_POOL_TASKS = Gauge(
+  "bcrypt_pool_tasks",
+  "Password history comparisons on the bcrypt pool by state",
+  ["state"],
+  multiprocess_mode="livesum",
+)
+_BCRYPT_QUEUED = BCRYPT_POOL_TASKS.labels("queued")
+_BCRYPT_RUNNING = BCRYPT_POOL_TASKS.labels("running")
 
 
 class PasswordPolicyConfig:
@@ -56,6 +93,18 @@ class PasswordPolicyConfig:
   }
 
 
+# Compiled once; the breached password filter is attached at startup
+_policy = CompiledPasswordPolicy(PasswordPolicyConfig)
+
+# Last evaluation of the current request (context), so a strength check
+# followed by its feedback evaluates the password once. Keyed by a digest
+# of the arguments: the context is copied into executor threads, and must
+# not carry the plaintext password.
+_last_evaluation: ContextVar[Optional[Tuple[bytes, Dict[str, Any]]]] = ContextVar(
+  "password_policy_evaluation", default=None
+)
+
+
 class PasswordService:
   """Enhanced password service with comprehensive policy enforcement."""
   
@@ -84,7 +133,11 @@ class PasswordService:
     
     # Generate salt and hash password
     salt = bcrypt.gensalt(rounds=cls.SALT_ROUNDS)
+    started = time.perf_counter()
     hashed = bcrypt.hashpw(password_bytes, salt)
+    elapsed = time.perf_counter() - started
+    _BCRYPT_HASH.observe(elapsed)
+    record_timing("bcrypt", elapsed)
     
     # Return as string for database storage
     return hashed.decode('utf-8')
@@ -110,7 +163,13 @@ class PasswordService:
       hash_bytes = password_hash.encode('utf-8')
       
       # Verify password
-      return bcrypt.checkpw(password_bytes, hash_bytes)
+      started = time.perf_counter()
+      try:
+        return bcrypt.checkpw(password_bytes, hash_bytes)
+      finally:
+        elapsed = time.perf_counter() - started
+        _BCRYPT_VERIFY.observe(elapsed)
+        record_timing("bcrypt", elapsed)
     
     except (ValueError, TypeError):
       # Handle any bcrypt errors (invalid hash format, etc.)
@@ -138,6 +197,10 @@ class PasswordService:
     """
     Comprehensive password policy validation.
     
+    Every rule is evaluated in a single pass by the compiled policy; the
+    evaluation is reused by further calls with the same arguments in the
+    same request.
+    
     Args:
       password: Password to validate
       user_context: Optional user context (email, name) for personal info checks
@@ -145,127 +208,19 @@ class PasswordService:
     Returns:
       Dict containing validation results and feedback
     """
-    if not password:
-      return {
-        "is_valid": False,
-        "score": 0,
-        "feedback": ["Password is required"],
-        "strength": "Very Weak",
-        "violations": ["empty_password"]
-      }
-    
-    feedback = []
-    violations = []
-    score = 0
-    
-    # Length validation
-    if len(password) < PasswordPolicyConfig.MIN_LENGTH:
-      feedback.append(f"Password must be at least {PasswordPolicyConfig.MIN_LENGTH} characters long")
-      violations.append("min_length")
-    elif len(password) >= PasswordPolicyConfig.RECOMMENDED_LENGTH:
-      score += 20
-    else:
-      score += 10
+    key = hashlib.sha256(
+      repr((password, sorted(user_context.items()) if user_context else None)).encode("utf-8", "surrogatepass")
+    ).digest()
     
-    if len(password) > PasswordPolicyConfig.MAX_LENGTH:
-      feedback.append(f"Password must not exceed {PasswordPolicyConfig.MAX_LENGTH} characters")
-      violations.append("max_length")
-      
-    # Character type requirements
-    has_upper = any(c.isupper() for c in password)
-    has_lower = any(c.islower() for c in password)
-    has_digit = any(c.isdigit() for c in password)
-    has_special = sum(1 for c in password if c in '!@#$%^&*()_+-=[]{}|;:,.<>?')
-    
-    if PasswordPolicyConfig.REQUIRE_UPPERCASE and not has_upper:
-      feedback.append("Password must contain at least one uppercase letter")
-      violations.append("missing_uppercase")
-    elif has_upper:
-      score += 10
-      
-    if PasswordPolicyConfig.REQUIRE_LOWERCASE and not has_lower:
-      feedback.append("Password must contain at least one lowercase letter")
-      violations.append("missing_lowercase")
-    elif has_lower:
-      score += 10
-      
-    if PasswordPolicyConfig.REQUIRE_DIGITS and not has_digit:
-      feedback.append("Password must contain at least one number")
-      violations.append("missing_digit")
-    elif has_digit:
-      score += 10
-      
-    if PasswordPolicyConfig.REQUIRE_SPECIAL_CHARS and has_special < PasswordPolicyConfig.MIN_SPECIAL_CHARS:
-      feedback.append(f"Password must contain at least {PasswordPolicyConfig.MIN_SPECIAL_CHARS} special character(s)")
-      violations.append("missing_special")
-    elif has_special >= PasswordPolicyConfig.MIN_SPECIAL_CHARS:
-      score += 15
-      
-    # Advanced complexity checks
-    unique_chars = len(set(password.lower()))
-    if unique_chars < PasswordPolicyConfig.MIN_UNIQUE_CHARS:
-      feedback.append(f"Password must contain at least {PasswordPolicyConfig.MIN_UNIQUE_CHARS} unique characters")
-      violations.append("insufficient_unique_chars")
+    last = _last_evaluation.get()
+    if last is not None and last[0] == key:
+      result = last[1]
     else:
-      score += 10
-      
-    # Check for repeated characters
-    repeated_violations = cls._check_repeated_characters(password)
-    if repeated_violations:
-      feedback.extend(repeated_violations)
-      violations.append("repeated_chars")
-      
-    # Check for sequential patterns
-    sequential_violations = cls._check_sequential_patterns(password)
-    if sequential_violations:
-      feedback.extend(sequential_violations)
-      violations.append("sequential_patterns")
-      
-    # Check for forbidden patterns
-    pattern_violations = cls._check_forbidden_patterns(password)
-    if pattern_violations:
-      feedback.extend(pattern_violations)
-      violations.append("forbidden_patterns")
-      
-    # Check for common passwords
-    if password.lower() in PasswordPolicyConfig.COMMON_PASSWORDS:
-      feedback.append("Password is too common and easily guessable")
-      violations.append("common_password")
-      score -= 30
-      
-    # Check for personal information
-    if user_context:
-      personal_violations = cls._check_personal_info(password, user_context)
-      if personal_violations:
-        feedback.extend(personal_violations)
-        violations.append("personal_info")
-        
-    # Calculate complexity bonus
-    complexity_bonus = cls._calculate_complexity_bonus(password)
-    score += complexity_bonus
-    
-    # Ensure score is within bounds
-    score = max(0, min(100, score))
-    
-    # Determine strength level
-    strength = cls._get_strength_level(score)
-    
-    # Password is valid if no violations and meets minimum score
-    is_valid = len(violations) == 0 and score >= PasswordPolicyConfig.MIN_COMPLEXITY_SCORE
+      result = _policy.evaluate(password, user_context)
+      _last_evaluation.set((key, result))
     
-    return {
-      "is_valid": is_valid,
-      "score": score,
-      "feedback": feedback,
-      "strength": strength,
-      "violations": violations,
-      "has_uppercase": has_upper,
-      "has_lowercase": has_lower,
-      "has_digits": has_digit,
-      "has_special": has_special >= PasswordPolicyConfig.MIN_SPECIAL_CHARS,
-      "unique_chars": unique_chars,
-      "length": len(password)
-    }
+    # Callers amend the result (e.g. history checks), so hand out a copy
+    return {**result, "feedback": list(result["feedback"]), "violations": list(result["violations"])}
   
   @classmethod
   def generate_password_strength_feedback(cls, password: str, user_context: Optional[Dict[str, str]] = None) -> List[str]:
@@ -285,172 +240,86 @@ class PasswordService:
     validation_result = cls.validate_password_policy(password, user_context)
     return validation_result["feedback"]
   
-  @classmethod
-  def _check_repeated_characters(cls, password: str) -> List[str]:
-    """Check for excessive repeated characters."""
-    violations = []
-    
-    # Count consecutive repeated characters
-    i = 0
-    while i < len(password):
-      count = 1
-      while i + count < len(password) and password[i] == password[i + count]:
-        count += 1
-      
-      if count > PasswordPolicyConfig.MAX_REPEATED_CHARS:
-        violations.append(f"Password contains too many repeated characters ({password[i]} repeated {count} times)")
-        break
-      
-      i += count
-    
-    return violations
-  
-  @classmethod
-  def _check_sequential_patterns(cls, password: str) -> List[str]:
-    """Check for sequential character patterns."""
-    violations = []
-    password_lower = password.lower()
-    
-    # Check for ascending sequences
-    for i in range(len(password_lower) - PasswordPolicyConfig.MAX_SEQUENTIAL_CHARS + 1):
-      sequence = password_lower[i:i + PasswordPolicyConfig.MAX_SEQUENTIAL_CHARS]
-      if cls._is_sequential(sequence):
-        violations.append(f"Password contains sequential characters: {sequence}")
-        break
-    
-    return violations
-  
-  @classmethod
-  def _is_sequential(cls, sequence: str) -> bool:
-    """Check if a sequence is sequential (ascending or descending)."""
-    if len(sequence) < 3:
-      return False
-    
-    # Check ascending
-    ascending = all(ord(sequence[i]) == ord(sequence[i-1]) + 1 for i in range(1, len(sequence)))
-    
-    # Check descending
-    descending = all(ord(sequence[i]) == ord(sequence[i-1]) - 1 for i in range(1, len(sequence)))
-    
-    return ascending or descending
-  
   @classmethod
   def _check_forbidden_patterns(cls, password: str) -> List[str]:
     """Check for forbidden patterns using regex."""
     violations = []
-    password_lower = password.lower()
     
-    for pattern in PasswordPolicyConfig.FORBIDDEN_PATTERNS:
-      if re.search(pattern, password_lower):
-        violations.append("Password contains forbidden patterns (keyboard sequences or repeated characters)")
-        break
+    # All patterns compiled into one regex
+    if _policy.forbidden is not None and _policy.forbidden.search(password.lower()):
+      violations.append("Password contains forbidden patterns (keyboard sequences or repeated characters)")
     
     return violations
   
   @classmethod
   def _check_personal_info(cls, password: str, user_context: Dict[str, str]) -> List[str]:
     """Check if password contains personal information."""
-    violations = []
-    password_lower = password.lower()
-    
-    # Check against email
-    if 'email' in user_context:
-      email_parts = user_context['email'].lower().split('@')[0].split('.')
-      for part in email_parts:
-        if len(part) >= 3 and part in password_lower:
-          violations.append("Password should not contain parts of your email address")
-          break
-    
-    # Check against name components
-    for field in ['first_name', 'last_name', 'name']:
-      if field in user_context:
-        name_lower = user_context[field].lower()
-        if len(name_lower) >= 3 and name_lower in password_lower:
-          violations.append("Password should not contain your name")
-          break
-    
-    return violations
+    return CompiledPasswordPolicy.check_personal_info(password.lower(), user_context)
   
   @classmethod
-  def _calculate_complexity_bonus(cls, password: str) -> int:
-    """Calculate complexity bonus based on character variety and entropy."""
-    bonus = 0
-    
-    # Character set variety bonus
-    char_sets = 0
-    if any(c.islower() for c in password):
-      char_sets += 1
-    if any(c.isupper() for c in password):
-      char_sets += 1
-    if any(c.isdigit() for c in password):
-      char_sets += 1
-    if any(c in '!@#$%^&*()_+-=[]{}|;:,.<>?' for c in password):
-      char_sets += 1
-    
-    bonus += char_sets * 5
-    
-    # Length bonus (beyond minimum)
-    if len(password) > PasswordPolicyConfig.RECOMMENDED_LENGTH:
-      bonus += min(10, len(password) - PasswordPolicyConfig.RECOMMENDED_LENGTH)
-    
-    # Entropy estimation
-    entropy = cls._estimate_entropy(password)
-    if entropy > 50:
-      bonus += 10
-    elif entropy > 40:
-      bonus += 5
-    
-    return bonus
+  def load_breached_passwords(cls, path: str, false_positive_rate: float = 1e-6) -> int:
+    """
+    Reject the passwords of a breached password list as common passwords.
+    
+    An index built by app/scripts/build_breached_index.py is memory-mapped
+    and shared by all workers through the page cache. A plain list (one
+    password per line) is loaded into a Bloom filter in this worker, which
+    takes a few bytes per entry; about ``false_positive_rate`` of other
+    passwords are rejected as well.
+    
+    Args:
+      path: Breached password index or password list file
+      false_positive_rate: Accepted rate of wrongly rejected passwords (plain lists)
+      
+    Returns:
+      int: Number of loaded passwords
+    """
+    breached = open_breached_passwords(path, false_positive_rate)
+    _policy.breached = breached
+    return len(breached)
   
   @classmethod
-  def _estimate_entropy(cls, password: str) -> float:
-    """Estimate password entropy in bits."""
-    if not password:
-      return 0
-    
-    # Character set size estimation
-    charset_size = 0
-    if any(c.islower() for c in password):
-      charset_size += 26
-    if any(c.isupper() for c in password):
-      charset_size += 26
-    if any(c.isdigit() for c in password):
-      charset_size += 10
-    if any(c in '!@#$%^&*()_+-=[]{}|;:,.<>?' for c in password):
-      charset_size += 32
-    
-    if charset_size == 0:
-      return 0
-    
-    # Basic entropy calculation
-    entropy = len(password) * math.log2(charset_size)
-    
-    # Reduce entropy for repeated patterns
-    unique_chars = len(set(password))
-    if unique_chars < len(password):
-      entropy *= (unique_chars / len(password))
-    
-    return entropy
+  async def verify_password_async(cls, password: str, password_hash: str) -> bool:
+    """
+    Verify a password against its hash on the bcrypt pool, without blocking
+    the event loop.
+    
+    Args:
+      password: Plain text password to verify
+      password_hash: Hashed password from database
+      
+    Returns:
+      bool: True if password matches, False otherwise
+    """
+    _BCRYPT_QUEUED.inc()
+    comparison = _bcrypt_executor.submit(cls._verify_on_pool, password, password_hash)
+    # Comparisons cancelled before a thread picked them up never run
+    comparison.add_done_callback(lambda future: future.cancelled() and _BCRYPT_QUEUED.dec())
+    matches, elapsed = await asyncio.wrap_future(comparison)
+    # Recorded here: the request's timings are not shared with pool threads
+    record_timing("bcrypt", elapsed)
+    return matches
   
   @classmethod
-  def _get_strength_level(cls, score: int) -> str:
-    """Get password strength level based on score."""
-    if score >= 90:
-      return "Very Strong"
-    elif score >= 80:
-      return "Strong"
-    elif score >= 60:
-      return "Moderate"
-    elif score >= 40:
-      return "Weak"
-    else:
-      return "Very Weak"
+  def _verify_on_pool(cls, password: str, password_hash: str) -> Tuple[bool, float]:
+    """Run verify_password on a bcrypt pool thread, returning its duration too."""
+    _BCRYPT_QUEUED.dec()
+    _BCRYPT_RUNNING.inc()
+    started = time.perf_counter()
+    try:
+      return cls.verify_password(password, password_hash), time.perf_counter() - started
+    finally:
+      _BCRYPT_RUNNING.dec()
   
   @classmethod
   async def check_password_history(cls, db: AsyncSession, user_id: int, new_password: str) -> bool:
     """
     Check if password has been used recently.
     
+    The recent hashes are compared in parallel on the bcrypt pool; the
+    check returns on the first match and cancels the comparisons that
+    have not started yet.
+    
     Args:
       db: Database session
       user_id: User ID to check
@@ -472,9 +341,17 @@ class PasswordService:
       recent_hashes = result.scalars().all()
       
       # Check if new password matches any recent password
-      for old_hash in recent_hashes:
-        if cls.verify_password(new_password, old_hash):
-          return False
+      comparisons = [
+        asyncio.ensure_future(cls.verify_password_async(new_password, old_hash))
+        for old_hash in recent_hashes
+      ]
+      try:
+        for comparison in asyncio.as_completed(comparisons):
+          if await comparison:
+            return False
+      finally:
+        for comparison in comparisons:
+          comparison.cancel()
       
       return True
     
@@ -506,17 +383,22 @@ class PasswordService:
       )
       
       db.add(history_entry)
+      await db.flush()
       
-      # Clean up old history entries (keep only configured count)
-      old_entries_stmt = select(PasswordHistory).where(
+      # Clean up old history entries (keep only configured count) in one
+      # DELETE over this user's rows (ix_password_history_user_created)
+      kept_entries = select(PasswordHistory.id).where(
         PasswordHistory.user_id == user_id
-      ).order_by(desc(PasswordHistory.created_at)).offset(PasswordPolicyConfig.PASSWORD_HISTORY_COUNT)
+      ).order_by(
+        desc(PasswordHistory.created_at), desc(PasswordHistory.id)
+      ).limit(PasswordPolicyConfig.PASSWORD_HISTORY_COUNT)
       
-      old_entries_result = await db.execute(old_entries_stmt)
-      old_entries = old_entries_result.scalars().all()
-      
-      for old_entry in old_entries:
-        await db.delete(old_entry)
+      await db.execute(
+        delete(PasswordHistory).where(
+          PasswordHistory.user_id == user_id,
+          PasswordHistory.id.not_in(kept_entries)
+        ).execution_options(synchronize_session=False)
+      )
       
       await db.commit()
     
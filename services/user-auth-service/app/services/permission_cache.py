@@ -0,0 +1,327 @@
+"""
+Versioned cache of resolved user permissions.
+
+Entries are stored together with the role-assignment version of the user
+and the global role-definition version they were resolved under. Assigning
+or removing a role bumps the user's version, changing any role's
+permissions bumps the role version; an entry whose versions no longer
+match is a miss, so invalidation is a single counter increment and stale
+entries simply age out.
+
+Backends (``PERMISSION_CACHE``):
+  none    resolve from the database on every call
+  memory  per-process cache, only consistent with a single worker
+  redis   shared across workers and replicas
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import instrument_redis
+from app.core.tracing import trace_redis
+from app.models.role import Role, UserRole
+
+logger = logging.getLogger(__name__)
+
+Versions = Tuple[int, int]
+
+
+async def load_users_permissions(db: AsyncSession, user_ids: List[int]) -> Dict[int, List[str]]:
+  """Resolve the permissions of several users from their roles in one query."""
+  stmt = (
+    select(UserRole.user_id, Role.permissions)
+    .join(Role, Role.id == UserRole.role_id)
+    .where(UserRole.user_id.in_(user_ids))
+  )
+  result = await db.execute(stmt)
+
+  # Flatten and deduplicate permissions per user
+  all_permissions: Dict[int, Set[str]] = {user_id: set() for user_id in user_ids}
+  for user_id, permissions in result.all():
+    if permissions:
+      all_permissions[user_id].update(permissions)
+  return {user_id: sorted(permissions) for user_id, permissions in all_permissions.items()}
+
+
+async def load_user_permissions(db: AsyncSession, user_id: int) -> List[str]:
+  """Resolve a user's permissions from their roles in the database."""
+  return (await load_users_permissions(db, [user_id]))[user_id]
+
+
+class PermissionCache:
+  """Permission resolution without caching; base class of the cache backends."""
+
+  def __init__(self, ttl_seconds: int = settings.permission_cache_ttl_seconds):
+    self.ttl_seconds = ttl_seconds
+    self.hits = 0
+    self.misses = 0
+
+  async def _read(self, user_id: int) -> Tuple[Optional[Versions], Optional[List[str]]]:
+    """Current versions for the user and the cached permissions, if still valid."""
+    return None, None
+
+  async def _read_many(self, user_ids: List[int]) -> Dict[int, Tuple[Optional[Versions], Optional[List[str]]]]:
+    return {user_id: await self._read(user_id) for user_id in user_ids}
+
+  async def _write(self, user_id: int, versions: Versions, permissions: List[str]) -> None:
+    pass
+
+  async def _write_many(self, entries: List[Tuple[int, Versions, List[str]]]) -> None:
+    for user_id, versions, permissions in entries:
+      await self._write(user_id, versions, permissions)
+
+  async def invalidate_user(self, user_id: int) -> None:
+    """Invalidate a user's entry after their role assignments changed."""
+
+  async def invalidate_roles(self) -> None:
+    """Invalidate every entry after a role's permissions changed."""
+
+  async def close(self) -> None:
+    """Release backend connections."""
+
+  async def get_permissions(self, db: AsyncSession, user_id: int) -> List[str]:
+    """
+    Permissions of a user, served from the cache when the entry is current.
+
+    Args:
+      db: Database session used on a miss
+      user_id: User ID to resolve
+
+    Returns:
+      List[str]: Sorted permission codes
+    """
+    versions, permissions = await self._read(user_id)
+    if permissions is not None:
+      self.hits += 1
+      return permissions
+
+    self.misses += 1
+    permissions = await load_user_permissions(db, user_id)
+    if versions is not None:
+      # Versions were read before resolving: a concurrent invalidation
+      # leaves this entry unusable instead of caching stale data
+      await self._write(user_id, versions, permissions)
+    return permissions
+
+  async def get_permissions_many(self, db: AsyncSession, user_ids: List[int]) -> Dict[int, List[str]]:
+    """
+    Permissions of several users; cache misses are resolved in one query.
+
+    Returns:
+      Dict[int, List[str]]: Sorted permission codes per user id
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    cached = await self._read_many(user_ids)
+
+    resolved: Dict[int, List[str]] = {}
+    missing = []
+    for user_id, (_, permissions) in cached.items():
+      if permissions is not None:
+        resolved[user_id] = permissions
+      else:
+        missing.append(user_id)
+    self.hits += len(resolved)
+
+    if missing:
+      self.misses += len(missing)
+      loaded = await load_users_permissions(db, missing)
+      resolved.update(loaded)
+      await self._write_many([
+        (user_id, cached[user_id][0], loaded[user_id])
+        for user_id in missing
+        if cached[user_id][0] is not None
+      ])
+
+    return {user_id: resolved[user_id] for user_id in user_ids}
+
+
+class MemoryPermissionCache(PermissionCache):
+  """Per-process cache; invalidations are not seen by other workers."""
+
+  def __init__(self, ttl_seconds: int = settings.permission_cache_ttl_seconds):
+    super().__init__(ttl_seconds)
+    self._user_versions: Dict[int, int] = {}
+    self._roles_version = 0
+    self._entries: Dict[int, Tuple[float, Versions, List[str]]] = {}
+
+  async def _read(self, user_id: int) -> Tuple[Optional[Versions], Optional[List[str]]]:
+    versions = (self._user_versions.get(user_id, 0), self._roles_version)
+    entry = self._entries.get(user_id)
+    if entry is None:
+      return versions, None
+    expires_at, entry_versions, permissions = entry
+    if entry_versions != versions or expires_at < time.monotonic():
+      return versions, None
+    return versions, list(permissions)
+
+  async def _write(self, user_id: int, versions: Versions, permissions: List[str]) -> None:
+    self._entries[user_id] = (time.monotonic() + self.ttl_seconds, versions, list(permissions))
+
+  async def invalidate_user(self, user_id: int) -> None:
+    self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+    self._entries.pop(user_id, None)
+
+  async def invalidate_roles(self) -> None:
+    self._roles_version += 1
+    self._entries.clear()
+
+
+class RedisPermissionCache(PermissionCache):
+  """
+  Cache shared through Redis.
+
+  A lookup is one MGET of the role version and the users' versions and
+  entries, for one or many users. Redis errors fall back to the database,
+  so an outage only costs the cache.
+  """
+
+  def __init__(
+    self,
+    client,
+    ttl_seconds: int = settings.permission_cache_ttl_seconds,
+    key_prefix: str = "perm:"
+  ):
+    super().__init__(ttl_seconds)
+    self.client = client
+    self.key_prefix = key_prefix
+
+  def _user_version_key(self, user_id: int) -> str:
+    return f"{self.key_prefix}version:user:{user_id}"
+
+  def _roles_version_key(self) -> str:
+    return f"{self.key_prefix}version:roles"
+
+  def _entry_key(self, user_id: int) -> str:
+    return f"{self.key_prefix}user:{user_id}"
+
+  @staticmethod
+  def _decode(user_version, roles_version, entry) -> Tuple[Versions, Optional[List[str]]]:
+    versions = (int(user_version or 0), int(roles_version or 0))
+    if entry is None:
+      return versions, None
+    data = json.loads(entry)
+    if (data["user_version"], data["roles_version"]) != versions:
+      return versions, None
+    return versions, data["permissions"]
+
+  @staticmethod
+  def _encode(versions: Versions, permissions: List[str]) -> str:
+    return json.dumps({
+      "user_version": versions[0],
+      "roles_version": versions[1],
+      "permissions": permissions,
+    })
+
+  async def _read(self, user_id: int) -> Tuple[Optional[Versions], Optional[List[str]]]:
+    return (await self._read_many([user_id]))[user_id]
+
+  async def _read_many(self, user_ids: List[int]) -> Dict[int, Tuple[Optional[Versions], Optional[List[str]]]]:
+    # Role version first, then version and entry of every user, in one MGET
+    keys = [self._roles_version_key()]
+    for user_id in user_ids:
+      keys += [self._user_version_key(user_id), self._entry_key(user_id)]
+    try:
+      values = await self.client.mget(*keys)
+    except Exception as e:
+      logger.warning(f"Permission cache read failed: {e}")
+      return {user_id: (None, None) for user_id in user_ids}
+
+    roles_version = values[0]
+    return {
+      user_id: self._decode(values[1 + 2 * i], roles_version, values[2 + 2 * i])
+      for i, user_id in enumerate(user_ids)
+    }
+
+  async def _write(self, user_id: int, versions: Versions, permissions: List[str]) -> None:
+    await self._write_many([(user_id, versions, permissions)])
+
+  async def _write_many(self, entries: List[Tuple[int, Versions, List[str]]]) -> None:
+    if not entries:
+      return
+    try:
+      pipe = self.client.pipeline(transaction=False)
+      for user_id, versions, permissions in entries:
+        pipe.set(self._entry_key(user_id), self._encode(versions, permissions), ex=self.ttl_seconds)
+      await pipe.execute()
+    except Exception as e:
+      logger.warning(f"Permission cache write failed: {e}")
+
+  async def invalidate_user(self, user_id: int) -> None:
+    try:
+      await self.client.incr(self._user_version_key(user_id))
+    except Exception as e:
+      logger.error(f"Permission cache invalidation for user {user_id} failed: {e}")
+
+  async def invalidate_roles(self) -> None:
+    try:
+      await self.client.incr(self._roles_version_key())
+    except Exception as e:
+      logger.error(f"Permission cache role invalidation failed: {e}")
+
+  async def close(self) -> None:
+    await self.client.close()
+
+
+def create_permission_cache() -> PermissionCache:
+  """Build the cache backend selected by ``settings.permission_cache``."""
+  if settings.permission_cache == "redis":
+    try:
+      import redis.asyncio as redis
+    except ImportError:
+      import aioredis as redis
+
+    return RedisPermissionCache(instrument_redis(trace_redis(redis.from_url(settings.redis_url, decode_responses=True))))
+  if settings.permission_cache == "memory":
+    return MemoryPermissionCache()
+  return PermissionCache()
+
+
+# Global permission cache used by User.get_permissions
+permission_cache = create_permission_cache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_permission_changes(session, flush_context):
+  """Record role assignments and role permission changes written by a flush."""
+  changes = session.info.setdefault("permission_changes", {"users": set(), "roles": False})
+  for obj in list(session.new) + list(session.deleted):
+    if isinstance(obj, UserRole):
+      changes["users"].add(obj.user_id)
+    elif isinstance(obj, Role) and obj in session.deleted:
+      changes["roles"] = True
+  for obj in session.dirty:
+    if isinstance(obj, Role) and inspect(obj).attrs.permissions.history.has_changes():
+      changes["roles"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_permission_changes(session):
+  """Invalidate cached permissions once the changes are committed."""
+  changes = session.info.pop("permission_changes", None)
+  if not changes or (not changes["users"] and not changes["roles"]):
+    return
+  try:
+    loop = asyncio.get_running_loop()
+  except RuntimeError:
+    return
+  loop.create_task(_apply_invalidations(changes["users"], changes["roles"]))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_permission_changes(session):
+  session.info.pop("permission_changes", None)
+
+
+async def _apply_invalidations(user_ids: Set[int], roles_changed: bool) -> None:
+  if roles_changed:
+    await permission_cache.invalidate_roles()
+  for user_id in user_ids:
+    await permission_cache.invalidate_user(user_id)
@@ -0,0 +1,254 @@
+"""
+Permission registry for bitset-encoded permission evaluation.
+Assigns every permission code a stable bit index so permission sets can be
+stored, combined and checked with integer bitwise operations.
+"""
+
+import asyncio
+import base64
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.permission_bit import PermissionBit
+
+logger = logging.getLogger(__name__)
+
+
+class PermissionSet:
+  """
+  Compact permission set: a bitmask of registered codes plus any codes
+  that have not been assigned a bit yet.
+  """
+
+  __slots__ = ("mask", "extras")
+
+  def __init__(self, mask: int = 0, extras: frozenset = frozenset()):
+    self.mask = mask
+    self.extras = extras
+
+  def __contains__(self, permission: str) -> bool:
+    bit = permission_registry.bit_for(permission)
+    if bit is None:
+      return permission in self.extras
+    return (self.mask >> bit) & 1 == 1
+
+  def __or__(self, other: "PermissionSet") -> "PermissionSet":
+    return PermissionSet(self.mask | other.mask, self.extras | other.extras)
+
+  def __eq__(self, other: object) -> bool:
+    return (
+      isinstance(other, PermissionSet)
+      and self.mask == other.mask
+      and self.extras == other.extras
+    )
+
+  def __repr__(self) -> str:
+    return f"<PermissionSet(mask={self.mask:#x}, extras={sorted(self.extras)})>"
+
+  def has_all(self, permissions: Iterable[str]) -> bool:
+    """Check that every permission is in the set (one AND for registered codes)."""
+    required_mask, required_extras = permission_registry.mask_for(permissions)
+    return (self.mask & required_mask) == required_mask and required_extras <= self.extras
+
+  def has_any(self, permissions: Iterable[str]) -> bool:
+    """Check that at least one permission is in the set."""
+    required_mask, required_extras = permission_registry.mask_for(permissions)
+    return (self.mask & required_mask) != 0 or not required_extras.isdisjoint(self.extras)
+
+  def missing(self, permissions: Iterable[str]) -> List[str]:
+    """Return the permissions that are not in the set, in input order."""
+    return [permission for permission in permissions if permission not in self]
+
+  def to_list(self) -> List[str]:
+    """Expand the set back into a list of permission codes."""
+    codes, _ = permission_registry.decode_mask(self.mask)
+    return codes + sorted(self.extras - set(codes))
+
+  def encode(self) -> Optional[str]:
+    """
+    Encode the mask as a compact URL-safe string for tokens.
+    Returns None when the set contains unregistered codes.
+    """
+    if self.extras:
+      return None
+    return encode_mask(self.mask)
+
+
+def encode_mask(mask: int) -> str:
+  """Encode a permission mask as unpadded base64url (little-endian bytes)."""
+  raw = mask.to_bytes(max(1, (mask.bit_length() + 7) // 8), "little")
+  return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_mask(encoded: str) -> int:
+  """Decode a mask produced by ``encode_mask``."""
+  padding = "=" * (-len(encoded) % 4)
+  return int.from_bytes(base64.urlsafe_b64decode(encoded + padding), "little")
+
+
+class PermissionRegistry:
+  """
+  Process-wide map of permission code <-> bit index, backed by the
+  ``permission_bits`` table so indexes are identical in every worker.
+  """
+
+  def __init__(self, max_cached_masks: int = 1024):
+    self._bits: Dict[str, int] = {}
+    self._codes: Dict[int, str] = {}
+    # Least recently used masks are evicted first: the fixed require_* sets
+    # stay hot while one-off per-user lists from build() age out
+    self._mask_cache: "OrderedDict[Tuple[str, ...], Tuple[int, frozenset]]" = OrderedDict()
+    self.max_cached_masks = max_cached_masks
+    self._lock = asyncio.Lock()
+
+  def __len__(self) -> int:
+    return len(self._bits)
+
+  def bit_for(self, permission: str) -> Optional[int]:
+    """Get the bit index of a permission code, if registered."""
+    return self._bits.get(permission)
+
+  def mask_for(self, permissions: Iterable[str]) -> Tuple[int, frozenset]:
+    """
+    Get (mask, unregistered codes) for a collection of permission codes.
+    Results are memoized per input tuple (up to ``max_cached_masks``), so
+    repeated checks are a dict hit.
+    """
+    key = tuple(permissions)
+    cached = self._mask_cache.get(key)
+    if cached is not None:
+      self._mask_cache.move_to_end(key)
+      return cached
+
+    mask = 0
+    extras = set()
+    for permission in key:
+      bit = self._bits.get(permission)
+      if bit is None:
+        extras.add(permission)
+      else:
+        mask |= 1 << bit
+
+    result = (mask, frozenset(extras))
+    self._mask_cache[key] = result
+    if len(self._mask_cache) > self.max_cached_masks:
+      self._mask_cache.popitem(last=False)
+    return result
+
+  def build(self, permissions: Iterable[str]) -> PermissionSet:
+    """Build a PermissionSet from permission codes."""
+    mask, extras = self.mask_for(permissions)
+    return PermissionSet(mask, extras)
+
+  def decode_mask(self, mask: int) -> Tuple[List[str], bool]:
+    """
+    Expand a mask into permission codes.
+
+    Returns:
+      Tuple of (codes, complete); complete is False when the mask has bits
+      this worker has not loaded yet.
+    """
+    codes = []
+    complete = True
+    bit = 0
+    while mask:
+      if mask & 1:
+        code = self._codes.get(bit)
+        if code is None:
+          complete = False
+        else:
+          codes.append(code)
+      mask >>= 1
+      bit += 1
+    return codes, complete
+
+  def clear(self) -> None:
+    """Forget all loaded bits (used when switching databases, e.g. in tests)."""
+    self._bits.clear()
+    self._codes.clear()
+    self._mask_cache.clear()
+
+  def _apply(self, rows: Iterable[Tuple[int, str]]) -> None:
+    for bit_index, code in rows:
+      self._bits[code] = bit_index
+      self._codes[bit_index] = code
+    self._mask_cache.clear()
+
+  async def load(self, db: AsyncSession) -> None:
+    """Load all registered bits from the database."""
+    result = await db.execute(select(PermissionBit.bit_index, PermissionBit.code))
+    self._apply(result.all())
+
+  async def register(self, db: AsyncSession, permissions: Iterable[str]) -> None:
+    """
+    Ensure every permission code has a bit, assigning new indexes as needed.
+
+    New rows are written in a dedicated session on the same engine so the
+    assignment is durable regardless of the caller's transaction outcome.
+    Concurrent registration from another worker is resolved by reloading
+    and retrying.
+    """
+    if all(permission in self._bits for permission in permissions):
+      return
+
+    async with self._lock:
+      for _ in range(3):
+        async with AsyncSession(db.bind) as session:
+          result = await session.execute(select(PermissionBit.bit_index, PermissionBit.code))
+          self._apply(result.all())
+
+          unknown = sorted({p for p in permissions if p not in self._bits})
+          if not unknown:
+            return
+
+          next_bit = max(self._codes, default=-1) + 1
+          rows = [(next_bit + offset, code) for offset, code in enumerate(unknown)]
+          session.add_all(PermissionBit(bit_index=bit, code=code) for bit, code in rows)
+          try:
+            await session.commit()
+          except IntegrityError:
+            await session.rollback()
+            logger.info("Permission bit assignment raced with another worker, retrying")
+            continue
+
+          self._apply(rows)
+          return
+
+      logger.warning(f"Could not register permission bits for: {', '.join(unknown)}")
+
+  async def sync_from_roles(self, db: AsyncSession) -> None:
+    """Register every permission code referenced by a role."""
+    from app.models.role import Role
+
+    result = await db.execute(select(Role.permissions))
+    codes = set()
+    for permissions in result.scalars().all():
+      if permissions:
+        codes.update(permissions)
+    await self.register(db, codes)
+
+  async def resolve(self, db: AsyncSession, encoded: str) -> PermissionSet:
+    """
+    Decode a token-encoded mask, reloading bits assigned by other workers
+    when the mask references indexes unknown to this process.
+    """
+    mask = decode_mask(encoded)
+    _, complete = self.decode_mask(mask)
+    if not complete:
+      await self.load(db)
+    return PermissionSet(mask)
+
+  async def resolve_token_permissions(self, db: AsyncSession, payload: dict) -> PermissionSet:
+    """Get the PermissionSet of a verified access token payload."""
+    if payload.get("pbits") is not None:
+      return await self.resolve(db, payload["pbits"])
+    return self.build(payload.get("permissions", []))
+
+
+# Global registry instance
+permission_registry = PermissionRegistry()
@@ -1,15 +1,20 @@
 """
 Session management service for handling user sessions and refresh tokens.
 Provides session creation, validation, and cleanup functionality.
+
+Session lookups and changes go through the configured session store (see
+app.services.session_store); cleanup works on the user_sessions table.
 """
 
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select
 
 from app.models.role import UserSession
 from app.core.config import settings
+from app.services.garbage_collector import bounded_delete
+from app.services.session_store import session_store
 
 
 class SessionService:
@@ -23,7 +28,8 @@ class SessionService:
     refresh_token: str,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
-    expires_delta: Optional[timedelta] = None
+    expires_delta: Optional[timedelta] = None,
+    commit: bool = True
   ) -> UserSession:
     """
     Create a new user session with refresh token.
@@ -35,6 +41,8 @@ class SessionService:
       ip_address: Client IP address (optional)
       user_agent: Client user agent (optional)
       expires_delta: Custom expiration time (defaults to config setting)
+      commit: Commit and refresh the session row; pass False to leave it
+        to the caller's unit of work
       
     Returns:
       UserSession: Created session object
@@ -52,11 +60,7 @@ class SessionService:
       user_agent=user_agent[:500] if user_agent else None  # Truncate to fit DB field
     )
     
-    db.add(session)
-    await db.commit()
-    await db.refresh(session)
-    
-    return session
+    return await session_store.create(db, session, commit=commit)
   
   @classmethod
   async def get_session_by_token(
@@ -74,12 +78,7 @@ class SessionService:
     Returns:
       UserSession: Session object if found, None otherwise
     """
-    stmt = select(UserSession).where(
-      UserSession.refresh_token == refresh_token
-    )
-    
-    result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    return await session_store.get(db, refresh_token)
   
   @classmethod
   async def is_session_valid(
@@ -121,16 +120,7 @@ class SessionService:
     Returns:
       bool: True if session was found and revoked, False otherwise
     """
-    stmt = (
-      update(UserSession)
-      .where(UserSession.refresh_token == refresh_token)
-      .values(is_revoked=True)
-    )
-    
-    result = await db.execute(stmt)
-    await db.commit()
-    
-    return result.rowcount > 0
+    return await session_store.revoke(db, refresh_token)
   
   @classmethod
   async def revoke_all_user_sessions(
@@ -149,19 +139,7 @@ class SessionService:
     Returns:
       int: Number of sessions revoked
     """
-    stmt = (
-      update(UserSession)
-      .where(
-        UserSession.user_id == user_id,
-        UserSession.is_revoked == False
-      )
-      .values(is_revoked=True)
-    )
-    
-    result = await db.execute(stmt)
-    await db.commit()
-    
-    return result.rowcount
+    return await session_store.revoke_all(db, user_id)
   
   @classmethod
   async def cleanup_expired_sessions(
@@ -171,7 +149,8 @@ class SessionService:
   ) -> int:
     """
     Clean up expired sessions from the database.
-    Should be run periodically to prevent database bloat.
+    The background garbage collector (app.services.garbage_collector)
+    performs the same cleanup periodically.
     
     Args:
       db: Database session
@@ -182,15 +161,7 @@ class SessionService:
     """
     now = datetime.now(timezone.utc)
     
-    stmt = (
-      delete(UserSession)
-      .where(UserSession.expires_at < now)
-    )
-    
-    result = await db.execute(stmt)
-    await db.commit()
-    
-    return result.rowcount
+    return await cls._delete_in_batches(db, batch_size, UserSession.expires_at < now)
   
   @classmethod
   async def cleanup_revoked_sessions(
@@ -212,18 +183,23 @@ class SessionService:
     """
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_old)
     
-    stmt = (
-      delete(UserSession)
-      .where(
-        UserSession.is_revoked == True,
-        UserSession.created_at < cutoff_date
-      )
+    return await cls._delete_in_batches(
+      db,
+      batch_size,
+      UserSession.is_revoked == True,
+      UserSession.created_at < cutoff_date
     )
-    
-    result = await db.execute(stmt)
-    await db.commit()
-    
-    return result.rowcount
+  
+  @classmethod
+  async def _delete_in_batches(cls, db: AsyncSession, batch_size: int, *criteria) -> int:
+    """Delete matching sessions, committing after every batch of at most batch_size rows."""
+    total = 0
+    while True:
+      result = await db.execute(bounded_delete(UserSession, *criteria, batch_size=batch_size))
+      await db.commit()
+      total += result.rowcount
+      if result.rowcount < batch_size:
+        return total
   
   @classmethod
   async def get_user_active_sessions(
@@ -241,16 +217,7 @@ class SessionService:
     Returns:
       list[UserSession]: List of active sessions
     """
-    now = datetime.now(timezone.utc)
-    
-    stmt = select(UserSession).where(
-      UserSession.user_id == user_id,
-      UserSession.is_revoked == False,
-      UserSession.expires_at > now
-    ).order_by(UserSession.created_at.desc())
-    
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return await session_store.list_active(db, user_id)
   
   @classmethod
   async def update_session_activity(
@@ -271,24 +238,10 @@ class SessionService:
     Returns:
       bool: True if session was found and updated, False otherwise
     """
-    update_values = {}
-    
-    if ip_address:
-      update_values["ip_address"] = ip_address
-    
-    if not update_values:
+    if not ip_address:
       return False
     
-    stmt = (
-      update(UserSession)
-      .where(UserSession.refresh_token == refresh_token)
-      .values(**update_values)
-    )
-    
-    result = await db.execute(stmt)
-    await db.commit()
-    
-    return result.rowcount > 0
+    return await session_store.touch(db, refresh_token, ip_address)
   
   @classmethod
   async def count_user_sessions(
@@ -303,20 +256,16 @@ class SessionService:
     Args:
       db: Database session
       user_id: User ID to count sessions for
-      active_only: Only count active (non-revoked, non-expired) sessions
+      active_only: Only count active (non-revoked, non-expired) sessions;
+        otherwise count the user_sessions history
       
     Returns:
       int: Number of sessions
     """
-    stmt = select(UserSession).where(UserSession.user_id == user_id)
-    
     if active_only:
-      now = datetime.now(timezone.utc)
-      stmt = stmt.where(
-        UserSession.is_revoked == False,
-        UserSession.expires_at > now
-      )
+      return len(await session_store.list_active(db, user_id))
     
+    stmt = select(UserSession).where(UserSession.user_id == user_id)
     result = await db.execute(stmt)
     sessions = result.scalars().all()
     return len(list(sessions))
\ No newline at end of file
@@ -0,0 +1,430 @@
+"""
+Pluggable storage for refresh-token sessions.
+
+The database store keeps sessions in the ``user_sessions`` table. The Redis
+store serves the hot path (create, lookup, revoke) from Redis with native
+TTL expiry and replays every change to ``user_sessions`` through a
+write-behind queue, so the table remains the audit/history record without
+being on the request path.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from prometheus_client import Counter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import instrument_redis
+from app.core.tracing import trace_redis
+from app.models.role import UserSession
+
+logger = logging.getLogger(__name__)
+
+SESSION_WRITES_DROPPED = Counter(
+  "session_writes_dropped_total",
+  "Session changes the write-behind queue failed to persist to user_sessions",
+)
+
+
+class SessionStore(ABC):
+  """Interface for refresh-token session storage."""
+
+  async def start(self) -> None:
+    """Start background work (called from the application lifespan)."""
+
+  async def close(self) -> None:
+    """Flush pending work and release connections."""
+
+  @abstractmethod
+  async def create(self, db: AsyncSession, session: UserSession, commit: bool = True) -> UserSession:
+    """Store a new session."""
+
+  @abstractmethod
+  async def get(self, db: AsyncSession, refresh_token: str) -> Optional[UserSession]:
+    """Look up a session by refresh token."""
+
+  @abstractmethod
+  async def revoke(self, db: AsyncSession, refresh_token: str) -> bool:
+    """Revoke a session; returns whether it existed."""
+
+  @abstractmethod
+  async def revoke_all(self, db: AsyncSession, user_id: int) -> int:
+    """Revoke every active session of a user; returns the number revoked."""
+
+  @abstractmethod
+  async def list_active(self, db: AsyncSession, user_id: int) -> List[UserSession]:
+    """Active sessions of a user, newest first."""
+
+  @abstractmethod
+  async def touch(self, db: AsyncSession, refresh_token: str, ip_address: str) -> bool:
+    """Record activity on a session."""
+
+
+class DatabaseSessionStore(SessionStore):
+  """Sessions stored in the user_sessions table."""
+
+  async def create(self, db: AsyncSession, session: UserSession, commit: bool = True) -> UserSession:
+    db.add(session)
+    if commit:
+      await db.commit()
+      await db.refresh(session)
+    return session
+
+  async def get(self, db: AsyncSession, refresh_token: str) -> Optional[UserSession]:
+    stmt = select(UserSession).where(UserSession.token_hash == UserSession.hash_token(refresh_token))
+    result = await db.execute(stmt)
+    session = result.scalar_one_or_none()
+    if session is not None:
+      session.refresh_token = refresh_token
+    return session
+
+  async def revoke(self, db: AsyncSession, refresh_token: str) -> bool:
+    stmt = (
+      update(UserSession)
+      .where(UserSession.token_hash == UserSession.hash_token(refresh_token))
+      .values(is_revoked=True)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount > 0
+
+  async def revoke_all(self, db: AsyncSession, user_id: int) -> int:
+    stmt = (
+      update(UserSession)
+      .where(
+        UserSession.user_id == user_id,
+        UserSession.is_revoked == False
+      )
+      .values(is_revoked=True)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+  async def list_active(self, db: AsyncSession, user_id: int) -> List[UserSession]:
+    now = datetime.now(timezone.utc)
+    stmt = select(UserSession).where(
+      UserSession.user_id == user_id,
+      UserSession.is_revoked == False,
+      UserSession.expires_at > now
+    ).order_by(UserSession.created_at.desc())
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+  async def touch(self, db: AsyncSession, refresh_token: str, ip_address: str) -> bool:
+    stmt = (
+      update(UserSession)
+      .where(UserSession.token_hash == UserSession.hash_token(refresh_token))
+      .values(ip_address=ip_address)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount > 0
+
+
+class SessionWriteBehind:
+  """
+  Queue replaying session changes to user_sessions in the background.
+
+  Operations are applied in order, a batch per transaction. A failed batch
+  is retried with backoff and then applied one operation per transaction,
+  so only the failing operations are lost (counted in
+  session_writes_dropped_total). When the worker is not running (scripts,
+  tests) or the queue is full, they are applied on the caller's session
+  instead and committed with it.
+  """
+
+  def __init__(
+    self,
+    session_factory=async_session_factory,
+    batch_size: int = 100,
+    max_queue_size: int = 10000,
+    max_retries: int = 3,
+    retry_backoff: float = 0.1
+  ):
+    self.session_factory = session_factory
+    self.batch_size = batch_size
+    self.max_queue_size = max_queue_size
+    self.max_retries = max_retries
+    self.retry_backoff = retry_backoff
+    self._queue: Optional[asyncio.Queue] = None
+    self._task: Optional[asyncio.Task] = None
+
+  @property
+  def running(self) -> bool:
+    """Whether the worker task is accepting operations."""
+    return self._task is not None and not self._task.done()
+
+  def start(self) -> None:
+    """Start the worker task on the running event loop."""
+    if self.running:
+      return
+    self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+    self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """Flush queued operations and stop the worker."""
+    if not self.running:
+      return
+    await self._queue.put(None)
+    await self._task
+    self._task = None
+
+  async def submit(self, db: AsyncSession, operation: tuple) -> None:
+    """Queue an operation, applying it on ``db`` if it cannot be queued."""
+    if self.running:
+      try:
+        self._queue.put_nowait(operation)
+        return
+      except asyncio.QueueFull:
+        logger.warning("Session write-behind queue full, writing in the request transaction")
+    await self._apply(db, operation)
+
+  @staticmethod
+  async def _apply(db: AsyncSession, operation: tuple) -> None:
+    kind, value = operation
+    if kind == "create":
+      db.add(value)
+    elif kind == "revoke":
+      await db.execute(
+        update(UserSession)
+        .where(UserSession.token_hash == UserSession.hash_token(value))
+        .values(is_revoked=True)
+      )
+    elif kind == "revoke_all":
+      await db.execute(
+        update(UserSession)
+        .where(UserSession.user_id == value, UserSession.is_revoked == False)
+        .values(is_revoked=True)
+      )
+    elif kind == "touch":
+      refresh_token, ip_address = value
+      await db.execute(
+        update(UserSession)
+        .where(UserSession.token_hash == UserSession.hash_token(refresh_token))
+        .values(ip_address=ip_address)
+      )
+
+  async def _run(self) -> None:
+    stopping = False
+    while not stopping:
+      item = await self._queue.get()
+      batch: List[tuple] = []
+      if item is None:
+        stopping = True
+      else:
+        batch.append(item)
+
+      while len(batch) < self.batch_size and not self._queue.empty():
+        item = self._queue.get_nowait()
+        if item is None:
+          stopping = True
+          continue
+        batch.append(item)
+
+      if batch:
+        await self._write(batch)
+
+  async def _write(self, batch: List[tuple]) -> None:
+    if await self._write_batch(batch):
+      return
+    for operation in batch:
+      try:
+        async with self.session_factory() as db:
+          await self._apply(db, operation)
+          await db.commit()
+      except Exception as e:
+        # History only; Redis stays authoritative for the hot path
+        SESSION_WRITES_DROPPED.inc()
+        logger.error(f"Dropped session change {operation[0]!r}: {e}")
+
+  async def _write_batch(self, batch: List[tuple]) -> bool:
+    """Apply the batch in one transaction, retrying with exponential backoff."""
+    for attempt in range(self.max_retries + 1):
+      try:
+        async with self.session_factory() as db:
+          for operation in batch:
+            await self._apply(db, operation)
+          await db.commit()
+        return True
+      except Exception as e:
+        logger.warning(
+          f"Failed to persist {len(batch)} session changes "
+          f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+        )
+        if attempt < self.max_retries:
+          await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+    return False
+
+
+class RedisSessionStore(SessionStore):
+  """
+  Sessions stored in Redis, keyed by the refresh token digest (hex).
+
+  Each session is a hash expiring with the session; a per-user set of
+  digests backs revoke-all and listing. Revoking deletes the hash, so
+  lookups never see revoked or expired sessions. Members of the user set
+  whose hash is gone are pruned lazily.
+  """
+
+  def __init__(
+    self,
+    client,
+    persistence: Optional[SessionWriteBehind] = None,
+    key_prefix: str = "session:"
+  ):
+    self.client = client
+    self.persistence = persistence
+    self.key_prefix = key_prefix
+
+  @staticmethod
+  def token_digest(refresh_token: str) -> str:
+    return UserSession.hash_token(refresh_token).hex()
+
+  def _session_key(self, digest: str) -> str:
+    return f"{self.key_prefix}{digest}"
+
+  def _user_key(self, user_id: int) -> str:
+    return f"{self.key_prefix}user:{user_id}"
+
+  async def start(self) -> None:
+    if self.persistence:
+      self.persistence.start()
+
+  async def close(self) -> None:
+    if self.persistence:
+      await self.persistence.stop()
+    await self.client.close()
+
+  async def _persist(self, db: AsyncSession, operation: tuple) -> None:
+    if self.persistence:
+      await self.persistence.submit(db, operation)
+
+  @staticmethod
+  def _to_session(digest: str, data: dict) -> UserSession:
+    return UserSession(
+      user_id=int(data["user_id"]),
+      token_hash=bytes.fromhex(digest),
+      expires_at=datetime.fromisoformat(data["expires_at"]),
+      created_at=datetime.fromisoformat(data["created_at"]),
+      ip_address=data.get("ip_address") or None,
+      user_agent=data.get("user_agent") or None,
+      is_revoked=False
+    )
+
+  async def create(self, db: AsyncSession, session: UserSession, commit: bool = True) -> UserSession:
+    if session.created_at is None:
+      session.created_at = datetime.now(timezone.utc)
+    expires_at = session.expires_at
+    if expires_at.tzinfo is None:
+      expires_at = expires_at.replace(tzinfo=timezone.utc)
+    ttl = max(int((expires_at - datetime.now(timezone.utc)).total_seconds()), 1)
+    user_ttl = max(ttl, settings.refresh_token_expire_days * 86400)
+
+    digest = self.token_digest(session.refresh_token)
+    user_key = self._user_key(session.user_id)
+    pipe = self.client.pipeline(transaction=True)
+    pipe.hset(self._session_key(digest), mapping={
+      "user_id": session.user_id,
+      "expires_at": expires_at.isoformat(),
+      "created_at": session.created_at.isoformat(),
+      "ip_address": session.ip_address or "",
+      "user_agent": session.user_agent or "",
+    })
+    pipe.expire(self._session_key(digest), ttl)
+    pipe.sadd(user_key, digest)
+    pipe.expire(user_key, user_ttl)
+    await pipe.execute()
+
+    await self._persist(db, ("create", session))
+    return session
+
+  async def get(self, db: AsyncSession, refresh_token: str) -> Optional[UserSession]:
+    digest = self.token_digest(refresh_token)
+    data = await self.client.hgetall(self._session_key(digest))
+    if not data:
+      return None
+    session = self._to_session(digest, data)
+    session.refresh_token = refresh_token
+    return session
+
+  async def revoke(self, db: AsyncSession, refresh_token: str) -> bool:
+    deleted = await self.client.delete(self._session_key(self.token_digest(refresh_token)))
+    await self._persist(db, ("revoke", refresh_token))
+    return deleted > 0
+
+  async def revoke_all(self, db: AsyncSession, user_id: int) -> int:
+    user_key = self._user_key(user_id)
+    digests = await self.client.smembers(user_key)
+    revoked = 0
+    if digests:
+      pipe = self.client.pipeline(transaction=True)
+      pipe.delete(*[self._session_key(digest) for digest in digests])
+      # SREM rather than DEL keeps sessions created concurrently
+      pipe.srem(user_key, *digests)
+      revoked, _ = await pipe.execute()
+    await self._persist(db, ("revoke_all", user_id))
+    return revoked
+
+  async def list_active(self, db: AsyncSession, user_id: int) -> List[UserSession]:
+    user_key = self._user_key(user_id)
+    digests = list(await self.client.smembers(user_key))
+    if not digests:
+      return []
+
+    pipe = self.client.pipeline(transaction=False)
+    for digest in digests:
+      pipe.hgetall(self._session_key(digest))
+    records = await pipe.execute()
+
+    sessions = []
+    stale = []
+    for digest, data in zip(digests, records):
+      if data:
+        sessions.append(self._to_session(digest, data))
+      else:
+        stale.append(digest)
+    if stale:
+      await self.client.srem(user_key, *stale)
+
+    sessions.sort(key=lambda session: session.created_at, reverse=True)
+    return sessions
+
+  async def touch(self, db: AsyncSession, refresh_token: str, ip_address: str) -> bool:
+    key = self._session_key(self.token_digest(refresh_token))
+    pipe = self.client.pipeline(transaction=True)
+    pipe.exists(key)
+    pipe.hset(key, "ip_address", ip_address)
+    exists, _ = await pipe.execute()
+    if not exists:
+      # HSET recreated the key without a TTL
+      await self.client.delete(key)
+      return False
+    await self._persist(db, ("touch", (refresh_token, ip_address)))
+    return True
+
+
+def create_session_store() -> SessionStore:
+  """Build the session store selected by ``settings.session_store``."""
+  if settings.session_store == "redis":
+    try:
+      import redis.asyncio as redis
+    except ImportError:
+      import aioredis as redis
+
+    persistence = SessionWriteBehind() if settings.session_db_write_behind else None
+    return RedisSessionStore(
+      instrument_redis(trace_redis(redis.from_url(settings.session_redis_url, decode_responses=True))),
+      persistence=persistence
+    )
+  return DatabaseSessionStore()
+
+
+# Global session store used by SessionService
+session_store = create_session_store()
@@ -0,0 +1,84 @@
+"""
+Batched loading of role names for users.
+
+Endpoints returning users with their roles should go through this loader
+instead of querying roles per user: a page of users costs one role query
+regardless of its size.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.role import Role, UserRole
+from app.models.user import User
+
+
+class UserRoleLoader:
+  """
+  DataLoader-style batch of role names keyed by user id.
+
+  Results are cached per loader, so create one per request (or unit of
+  work) and reuse it for every user the response contains.
+  """
+
+  def __init__(self, db: AsyncSession):
+    self.db = db
+    self._roles: Dict[int, List[str]] = {}
+
+  async def load_many(self, user_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """
+    Role names for each user id, loading the uncached ones in one query.
+
+    Returns:
+      Dict[int, List[str]]: Role names in assignment order per user id
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    missing = [user_id for user_id in user_ids if user_id not in self._roles]
+
+    if missing:
+      stmt = (
+        select(UserRole.user_id, Role.name)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(UserRole.user_id.in_(missing))
+        .order_by(UserRole.user_id, UserRole.id)
+      )
+      result = await self.db.execute(stmt)
+
+      for user_id in missing:
+        self._roles[user_id] = []
+      for user_id, role_name in result.all():
+        self._roles[user_id].append(role_name)
+
+    return {user_id: self._roles[user_id] for user_id in user_ids}
+
+  async def load(self, user_id: int) -> List[str]:
+    """Role names of a single user."""
+    return (await self.load_many([user_id]))[user_id]
+
+  @classmethod
+  async def fetch_user_with_roles(
+    cls,
+    db: AsyncSession,
+    user_id: int
+  ) -> Tuple[Optional[User], List[str]]:
+    """
+    Load a user and their role names in a single query.
+
+    Returns:
+      Tuple[Optional[User], List[str]]: The user (None if not found) and role names
+    """
+    stmt = (
+      select(User, Role.name)
+      .outerjoin(UserRole, UserRole.user_id == User.id)
+      .outerjoin(Role, Role.id == UserRole.role_id)
+      .where(User.id == user_id)
+      .order_by(UserRole.id)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    if not rows:
+      return None, []
+    return rows[0][0], [role_name for _, role_name in rows if role_name is not None]
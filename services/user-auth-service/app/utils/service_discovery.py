@@ -5,13 +5,77 @@ Helper functions for microservices to register with the auth service.
 
 import httpx
 import asyncio
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, Hashable, List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from app.core.tracing import trace_http_client
+
 logger = logging.getLogger(__name__)
 
 
+class BatchCoalescer:
+    """
+    Coalesce concurrent single-key lookups into batch calls.
+    
+    Keys requested within ``window`` seconds of the first pending key are
+    collected and resolved by one call of ``batch_fn``, which receives the
+    distinct keys and returns a dict of results. A batch is dispatched
+    early once it holds ``max_batch_size`` keys. Keys missing from the
+    result resolve to None; a failing batch fails all its lookups.
+    """
+    
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        window: float = 0.005,
+        max_batch_size: int = 100
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+    
+    async def load(self, key: Hashable) -> Any:
+        """Resolve a single key through the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.batches += 1
+            asyncio.ensure_future(self._dispatch(pending))
+    
+    async def _dispatch(self, pending: Dict[Hashable, List[asyncio.Future]]) -> None:
+        try:
+            results = await self.batch_fn(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        for key, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results.get(key))
+
+
 class ServiceDiscoveryClient:
     """
     Client for registering and authenticating with the auth service.
@@ -23,7 +87,9 @@ class ServiceDiscoveryClient:
         auth_service_url: str,
         service_name: str,
         service_secret: Optional[str] = None,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        coalesce_window: float = 0.005,
+        max_batch_size: int = 100
     ):
         """
         Initialize service discovery client.
@@ -33,13 +99,22 @@ class ServiceDiscoveryClient:
             service_name: Name of this service
             service_secret: Service secret (if already registered)
             timeout: Request timeout in seconds
+            coalesce_window: Seconds the lookup_* methods wait to batch lookups
+            max_batch_size: Maximum keys per batch request
         """
         self.auth_service_url = auth_service_url.rstrip('/')
         self.service_name = service_name
         self.service_secret = service_secret
         self.timeout = timeout
+        self.coalesce_window = coalesce_window
+        self.max_batch_size = max_batch_size
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
+        self._coalescers: Dict[Tuple, BatchCoalescer] = {}
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """HTTP client propagating the current trace to the auth service."""
+        return trace_http_client(httpx.AsyncClient(timeout=self.timeout))
         
     async def register_service(
         self,
@@ -61,7 +136,7 @@ class ServiceDiscoveryClient:
         Raises:
             httpx.HTTPError: If registration fails
         """
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"{self.auth_service_url}/api/services/register",
                 json={
@@ -102,7 +177,7 @@ class ServiceDiscoveryClient:
         if not self.service_secret:
             raise ValueError("Service secret not set. Register service first.")
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"{self.auth_service_url}/api/services/token",
                 json={
@@ -164,7 +239,7 @@ class ServiceDiscoveryClient:
         """
         service_token = await self.get_valid_token(["validate:tokens"])
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"{self.auth_service_url}/api/validate/user-token",
                 json={
@@ -202,7 +277,7 @@ class ServiceDiscoveryClient:
         """
         service_token = await self.get_valid_token(["validate:tokens"])
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._http_client() as client:
             response = await client.post(
                 f"{self.auth_service_url}/api/validate/user-info",
                 json={
@@ -235,7 +310,7 @@ class ServiceDiscoveryClient:
         """
         service_token = await self.get_valid_token(["validate:tokens"])
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._http_client() as client:
             response = await client.get(
                 f"{self.auth_service_url}/api/validate/permissions/{user_id}",
                 headers={"Authorization": f"Bearer {service_token}"}
@@ -246,6 +321,132 @@ class ServiceDiscoveryClient:
             else:
                 response.raise_for_status()
     
+    async def _post_batch(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a batch request to a validation endpoint."""
+        service_token = await self.get_valid_token(["validate:tokens"])
+        
+        async with self._http_client() as client:
+            response = await client.post(
+                f"{self.auth_service_url}{path}",
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {service_token}",
+                    "Content-Type": "application/json"
+                }
+            )
+            response.raise_for_status()
+            return response.json()
+    
+    async def validate_user_tokens(
+        self,
+        user_tokens: List[str],
+        required_permissions: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Validate several user tokens with one request.
+        
+        Args:
+            user_tokens: User access tokens, at most max_batch_size
+            required_permissions: Required permissions for the operation
+            
+        Returns:
+            Dict of validation results keyed by token; rejected tokens
+            have ``valid`` false and an ``error``
+            
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        data = await self._post_batch(
+            "/api/validate/user-token/batch",
+            {"tokens": list(user_tokens), "required_permissions": required_permissions}
+        )
+        return data["results"]
+    
+    async def get_users_info(
+        self,
+        user_ids: List[int],
+        include_roles: bool = False
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Get information on several users with one request.
+        
+        Args:
+            user_ids: IDs of the users, at most max_batch_size
+            include_roles: Whether to include role information
+            
+        Returns:
+            Dict of user information keyed by user ID, None for unknown users
+            
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        data = await self._post_batch(
+            "/api/validate/user-info/batch",
+            {"user_ids": list(user_ids), "include_roles": include_roles}
+        )
+        return {int(user_id): info for user_id, info in data["users"].items()}
+    
+    async def get_users_permissions(self, user_ids: List[int]) -> Dict[int, Optional[List[str]]]:
+        """
+        Get permissions of several users with one request.
+        
+        Args:
+            user_ids: IDs of the users, at most max_batch_size
+            
+        Returns:
+            Dict of permissions keyed by user ID, None for unknown or
+            inactive users
+            
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        data = await self._post_batch("/api/validate/permissions/batch", {"user_ids": list(user_ids)})
+        permissions: Dict[int, Optional[List[str]]] = {int(user_id): None for user_id in data["errors"]}
+        permissions.update({int(user_id): perms for user_id, perms in data["permissions"].items()})
+        return permissions
+    
+    def _coalescer(self, key: Tuple, batch_fn) -> BatchCoalescer:
+        coalescer = self._coalescers.get(key)
+        if coalescer is None:
+            coalescer = BatchCoalescer(batch_fn, self.coalesce_window, self.max_batch_size)
+            self._coalescers[key] = coalescer
+        return coalescer
+    
+    async def lookup_user_token(
+        self,
+        user_token: str,
+        required_permissions: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Validate a user token, batched with concurrent lookups.
+        
+        Unlike validate_user_token, a rejected token does not raise but
+        returns a result with ``valid`` false.
+        """
+        required = tuple(sorted(required_permissions)) if required_permissions else None
+        coalescer = self._coalescer(
+            ("user-token", required),
+            lambda tokens: self.validate_user_tokens(tokens, list(required) if required else None)
+        )
+        return await coalescer.load(user_token)
+    
+    async def lookup_user_info(
+        self,
+        user_id: int,
+        include_roles: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Get user information, batched with concurrent lookups; None if unknown."""
+        coalescer = self._coalescer(
+            ("user-info", include_roles),
+            lambda user_ids: self.get_users_info(user_ids, include_roles)
+        )
+        return await coalescer.load(user_id)
+    
+    async def lookup_user_permissions(self, user_id: int) -> Optional[List[str]]:
+        """Get user permissions, batched with concurrent lookups; None if unknown or inactive."""
+        coalescer = self._coalescer(("permissions",), self.get_users_permissions)
+        return await coalescer.load(user_id)
+    
     async def health_check(self) -> bool:
         """
         Check if the auth service is healthy.
@@ -254,7 +455,7 @@ class ServiceDiscoveryClient:
             bool: True if service is healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with self._http_client() as client:
                 response = await client.get(f"{self.auth_service_url}/health")
                 return response.status_code == 200
         except Exception as e:
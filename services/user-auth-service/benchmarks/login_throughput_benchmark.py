@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark (logins/sec for a single worker).
+
+Compares the previous login pipeline, which committed after the lockout
+reset, after each audit entry and after creating the session, with the
+current one: a single unit of work with audit entries handed to the
+background audit writer.
+
+Usage:
+    python benchmarks/login_throughput_benchmark.py [--database-url URL] [--logins N]
+        [--concurrency N] [--bcrypt-rounds N]
+
+Defaults to a temporary SQLite file so commit/fsync costs are included;
+pass a PostgreSQL URL of a scratch database to measure against the
+production engine (all tables are dropped). Password hashes use a low
+bcrypt cost by default so the database work is not hidden behind hashing;
+pass --bcrypt-rounds 12 for production-like numbers.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--logins", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4)
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+if ARGS.database_url is None:
+    ARGS.database_url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/login_benchmark.db"
+# The engine is built from settings at import time
+os.environ["DATABASE_URL"] = ARGS.database_url
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import event, select
+from starlette.requests import Request
+
+from app.core.database import Base, async_engine, async_session_factory
+from app.models.user import User
+from app.routers.auth import login_user
+from app.schemas.auth import UserLoginRequest
+from app.services.account_lockout_service import AccountLockoutService
+from app.services.audit_service import AuditService
+from app.services.audit_writer import audit_writer
+from app.services.jwt_service import JWTService
+from app.services.password_service import PasswordService
+from app.services.session_service import SessionService
+
+logging.disable(logging.INFO)
+
+PASSWORD = "BenchmarkPass123!"
+
+
+def make_request() -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/auth/login",
+        "headers": [(b"user-agent", b"login-benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "query_string": b"",
+    })
+
+
+async def legacy_login(db, login_data: UserLoginRequest, request: Request):
+    """The login pipeline before the single unit of work, step by step."""
+    result = await db.execute(select(User).where(User.email == login_data.email))
+    user = result.scalar_one()
+    await AccountLockoutService.check_account_lockout(db, user, request)
+    PasswordService.verify_password(login_data.password, user.password_hash)
+
+    user.reset_failed_attempts()
+    await db.commit()
+    await db.refresh(user)
+    await AuditService.log_authentication_success(db=db, user_id=user.id, request=request)
+
+    permissions = await user.get_permissions(db)
+    JWTService.create_access_token(user.id, permissions)
+    refresh_token = JWTService.create_refresh_token(user.id)
+    await SessionService.create_session(db, user.id, refresh_token)
+
+
+async def current_login(db, login_data: UserLoginRequest, request: Request):
+    await login_user(login_data, request, db)
+
+
+async def seed(users: int):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    PasswordService.SALT_ROUNDS = ARGS.bcrypt_rounds
+    password_hash = PasswordService.hash_password(PASSWORD)
+    async with async_session_factory() as db:
+        db.add_all([
+            User(
+                email=f"bench{i}@example.com",
+                password_hash=password_hash,
+                first_name="Bench",
+                last_name=f"User{i}"
+            )
+            for i in range(users)
+        ])
+        await db.commit()
+
+
+async def run(label: str, pipeline, users: int):
+    commits = {"count": 0}
+
+    def count_commit(conn):
+        commits["count"] += 1
+
+    queue = asyncio.Queue()
+    for i in range(ARGS.logins):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            i = queue.get_nowait()
+            login_data = UserLoginRequest(email=f"bench{i % users}@example.com", password=PASSWORD)
+            async with async_session_factory() as db:
+                await pipeline(db, login_data, make_request())
+                await db.commit()  # What get_db does after the handler
+
+    event.listen(async_engine.sync_engine, "commit", count_commit)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(ARGS.concurrency)))
+    elapsed = time.perf_counter() - start
+    event.remove(async_engine.sync_engine, "commit", count_commit)
+
+    print(
+        f"  {label:<36} {ARGS.logins / elapsed:8.1f} logins/s  "
+        f"{elapsed / ARGS.logins * 1000:7.2f} ms/login  "
+        f"{commits['count'] / ARGS.logins:5.2f} commits/login"
+    )
+
+
+async def main():
+    users = max(ARGS.concurrency, 20)
+    await seed(users)
+    print(
+        f"{ARGS.logins} logins, concurrency {ARGS.concurrency}, "
+        f"bcrypt rounds {ARGS.bcrypt_rounds} ({async_engine.dialect.name})"
+    )
+
+    await run("before: commit per step", legacy_login, users)
+
+    audit_writer.start()
+    await run("after: single unit of work", current_login, users)
+    await audit_writer.stop()
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Micro-benchmarks of the password policy checks run on every registration,
+password change and policy validation request.
+
+Run with benchmarks/run_micro_benchmarks.sh.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.password_policy import CompiledPasswordPolicy
+from app.services.password_service import _policy
+
+USER_CONTEXT = {"email": "john.doe@example.com", "first_name": "John", "last_name": "Doe"}
+
+# Inputs the policy sees in practice: accepted passwords and the typical
+# ways rejected ones fail
+PASSWORDS = {
+    "strong": "Vt7#qLm2!xRp9$wZ",
+    "passphrase": "Correct-Horse-Battery-Staple-42-Riverbank!",
+    "common": "password123",
+    "sequential": "Abc123456789!x",
+    "repeated": "Aaaa1111!!!!bbbb",
+    "personal": "JohnDoe1985!",
+    "short": "aB3!",
+}
+
+
+# The compiled evaluation behind validate_password_policy, which reuses the
+# last result for repeated arguments
+@pytest.mark.parametrize("kind", PASSWORDS)
+def test_validate_password_policy(benchmark, kind):
+    benchmark.group = "validate_password_policy"
+    result = benchmark(_policy.evaluate, PASSWORDS[kind], USER_CONTEXT)
+    assert "is_valid" in result
+
+
+# The single-pass checks evaluate is built from
+@pytest.mark.parametrize("kind", ["strong", "passphrase", "sequential"])
+def test_first_sequence(benchmark, kind):
+    benchmark.group = "policy checks"
+    benchmark(_policy.first_sequence, PASSWORDS[kind].lower())
+
+
+def test_check_personal_info(benchmark):
+    benchmark.group = "policy checks"
+    result = benchmark(CompiledPasswordPolicy.check_personal_info, PASSWORDS["personal"].lower(), USER_CONTEXT)
+    assert result
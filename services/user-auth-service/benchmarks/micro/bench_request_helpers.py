@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks of the per-request helpers around authentication: audit
+request-data sanitizing, JWT access token encoding and decoding, and
+UserResponse validation.
+
+Run with benchmarks/run_micro_benchmarks.sh.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.schemas.auth import UserResponse
+from app.services.jwt_service import JWTService
+
+PERMISSIONS = [
+    "read:users", "create:users", "update:users", "read:companies",
+    "create:companies", "update:companies", "read:partners", "create:partners",
+    "update:partners", "read:audit_logs",
+]
+
+# A password change request with a nested profile, as the audit entry receives it
+REQUEST_DATA = {
+    "current_password": "OldPassword123!",
+    "new_password": "NewPassword456!",
+    "profile": {
+        "first_name": "John",
+        "last_name": "Doe",
+        "phone": "+1 555 0100",
+        "api_key": "sk_live_0123456789",
+        "preferences": {"language": "en", "timezone": "UTC", "theme": "dark"},
+    },
+    "device": {"name": "Firefox on Linux", "remember": True},
+    "tags": ["web", "settings"],
+}
+
+USER_DATA = {
+    "id": 42,
+    "email": "john.doe@example.com",
+    "first_name": "John",
+    "last_name": "Doe",
+    "is_active": True,
+    "is_verified": True,
+    "created_at": datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc),
+    "updated_at": datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc),
+}
+
+
+def test_sanitize_request_data(benchmark):
+    sanitized = benchmark(AuditLog._sanitize_request_data, REQUEST_DATA)
+    assert sanitized["new_password"] == "[REDACTED]"
+
+
+def test_create_access_token(benchmark):
+    benchmark.group = "jwt"
+    assert benchmark(JWTService.create_access_token, 42, PERMISSIONS)
+
+
+def test_verify_access_token(benchmark):
+    benchmark.group = "jwt"
+    token = JWTService.create_access_token(42, PERMISSIONS)
+    assert benchmark(JWTService.verify_access_token, token)["user_id"] == 42
+
+
+def test_user_response_from_model(benchmark):
+    benchmark.group = "UserResponse"
+    user = User(password_hash="x", **USER_DATA)
+    assert benchmark(UserResponse.model_validate, user).id == 42
+
+
+def test_user_response_from_dict(benchmark):
+    benchmark.group = "UserResponse"
+    assert benchmark(UserResponse.model_validate, USER_DATA).id == 42
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Security middleware throughput benchmark (hello-world requests/sec).
+
+Compares the previous stack of ``@app.middleware("http")`` functions
+(request ID and security headers, each going through call_next) with the
+current single pure-ASGI security pipeline, on an app with one trivial
+endpoint and no middleware-independent work.
+
+Usage:
+    python benchmarks/middleware_throughput_benchmark.py [--requests N] [--path PATH]
+
+Requests are driven straight through the ASGI interface, without a server
+or network, so the numbers isolate the per-request middleware cost.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--path", default="/api/hello")
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi import FastAPI
+
+from app.middleware.security_headers import request_id_middleware, security_headers_middleware
+from app.middleware.security_pipeline import RequestIdStage, SecurityHeadersStage, SecurityPipelineMiddleware
+
+
+def hello_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get(ARGS.path)
+    async def hello():
+        return {"message": "hello"}
+
+    return app
+
+
+def legacy_app() -> FastAPI:
+    app = hello_app()
+    app.middleware("http")(request_id_middleware)
+    app.middleware("http")(security_headers_middleware)
+    return app
+
+
+def pipeline_app() -> FastAPI:
+    app = hello_app()
+    app.add_middleware(SecurityPipelineMiddleware, stages=[RequestIdStage(), SecurityHeadersStage()])
+    return app
+
+
+async def request(app) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": ARGS.path,
+        "raw_path": ARGS.path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark"), (b"user-agent", b"middleware-benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    response = {}
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        # The request body once, then a disconnect after the response, as a server does
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = len(message["headers"])
+        elif not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    return response["headers"]
+
+
+async def run(label: str, app) -> float:
+    # Warm up (builds the middleware stack on the first call)
+    for _ in range(200):
+        headers = await request(app)
+
+    start = time.perf_counter()
+    for _ in range(ARGS.requests):
+        await request(app)
+    elapsed = time.perf_counter() - start
+
+    rate = ARGS.requests / elapsed
+    print(
+        f"  {label:<36} {rate:9.0f} req/s  "
+        f"{elapsed / ARGS.requests * 1e6:7.1f} us/req  {headers} response headers"
+    )
+    return rate
+
+
+async def main():
+    print(f"{ARGS.requests} requests to {ARGS.path}")
+    before = await run("before: function middlewares", legacy_app())
+    after = await run("after: security pipeline", pipeline_app())
+    print(f"  speedup {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
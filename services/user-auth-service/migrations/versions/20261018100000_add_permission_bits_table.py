@@ -0,0 +1,31 @@
+"""Add permission bits table
+
+Revision ID: b7c1d2e3f4a5
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c1d2e3f4a5'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('permission_bits',
+    sa.Column('bit_index', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('code', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('bit_index')
+    )
+    op.create_index(op.f('ix_permission_bits_code'), 'permission_bits', ['code'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_permission_bits_code'), table_name='permission_bits')
+    op.drop_table('permission_bits')
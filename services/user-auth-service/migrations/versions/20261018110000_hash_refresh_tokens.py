@@ -0,0 +1,72 @@
+"""Key user sessions by a SHA-256 digest of the refresh token
+
+Revision ID: c8d2e3f4a5b6
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2e3f4a5b6'
+down_revision = 'b7c1d2e3f4a5'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('user_sessions', sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("UPDATE user_sessions SET token_hash = sha256(convert_to(refresh_token, 'UTF8'))")
+    else:
+        sessions = sa.table(
+            'user_sessions',
+            sa.column('id', sa.Integer),
+            sa.column('refresh_token', sa.String),
+            sa.column('token_hash', sa.LargeBinary),
+        )
+        update = (
+            sessions.update()
+            .where(sessions.c.id == sa.bindparam('row_id'))
+            .values(token_hash=sa.bindparam('digest'))
+        )
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(sessions.c.id, sessions.c.refresh_token)
+                .where(sessions.c.id > last_id)
+                .order_by(sessions.c.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).fetchall()
+            if not rows:
+                break
+            bind.execute(update, [
+                {'row_id': row_id, 'digest': hashlib.sha256(token.encode()).digest()}
+                for row_id, token in rows
+            ])
+            last_id = rows[-1][0]
+
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.alter_column('token_hash', existing_type=sa.LargeBinary(length=32), nullable=False)
+        batch_op.drop_index('ix_user_sessions_refresh_token')
+        batch_op.drop_column('refresh_token')
+    op.create_index(op.f('ix_user_sessions_token_hash'), 'user_sessions', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    # Raw tokens cannot be recovered from their digests: existing sessions
+    # are dropped and users have to sign in again
+    op.execute("DELETE FROM user_sessions")
+    op.drop_index(op.f('ix_user_sessions_token_hash'), table_name='user_sessions')
+    with op.batch_alter_table('user_sessions') as batch_op:
+        batch_op.add_column(sa.Column('refresh_token', sa.String(length=255), nullable=False))
+        batch_op.drop_column('token_hash')
+    op.create_index(op.f('ix_user_sessions_refresh_token'), 'user_sessions', ['refresh_token'], unique=True)
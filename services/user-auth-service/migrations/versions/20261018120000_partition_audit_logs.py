@@ -0,0 +1,152 @@
+"""Range partition audit_logs by month on created_at
+
+Revision ID: d9e4f5a6b7c8
+Revises: c8d2e3f4a5b6
+Create Date: 2026-10-18 12:00:00.000000
+
+PostgreSQL only: audit_logs becomes a table partitioned by month with a
+default partition for rows outside every range. Existing rows are copied
+into their partitions. Later partitions are created by the audit
+partition maintenance job (app/services/audit_partitions.py). Other
+databases keep the plain table.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9e4f5a6b7c8'
+down_revision = 'c8d2e3f4a5b6'
+branch_labels = None
+depends_on = None
+
+# Months created ahead of the current one
+PREMAKE_MONTHS = 3
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+    action VARCHAR(100) NOT NULL,
+    severity VARCHAR(20) NOT NULL,
+    description VARCHAR(500) NOT NULL,
+    user_id INTEGER,
+    target_user_id INTEGER,
+    session_id VARCHAR(255),
+    request_id VARCHAR(255),
+    service_id INTEGER,
+    service_name VARCHAR(100),
+    ip_address VARCHAR(45),
+    user_agent TEXT,
+    client_info JSON,
+    endpoint VARCHAR(255),
+    http_method VARCHAR(10),
+    request_data JSON,
+    response_status INTEGER,
+    additional_data JSON,
+    tags JSON,
+    success BOOLEAN NOT NULL,
+    error_message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+
+COLUMN_NAMES = ', '.join(line.split()[0] for line in COLUMNS.strip().splitlines())
+
+INDEXES = {
+    'ix_audit_logs_id': ['id'],
+    'ix_audit_logs_action': ['action'],
+    'ix_audit_logs_severity': ['severity'],
+    'ix_audit_logs_user_id': ['user_id'],
+    'ix_audit_logs_target_user_id': ['target_user_id'],
+    'ix_audit_logs_session_id': ['session_id'],
+    'ix_audit_logs_request_id': ['request_id'],
+    'ix_audit_logs_service_id': ['service_id'],
+    'ix_audit_logs_ip_address': ['ip_address'],
+    'ix_audit_logs_endpoint': ['endpoint'],
+    'ix_audit_logs_success': ['success'],
+    'ix_audit_logs_created_at': ['created_at'],
+    'idx_audit_user_action': ['user_id', 'action'],
+    'idx_audit_ip_created': ['ip_address', 'created_at'],
+    'idx_audit_severity_created': ['severity', 'created_at'],
+    'idx_audit_action_created': ['action', 'created_at'],
+    'idx_audit_success_created': ['success', 'created_at'],
+}
+
+
+def _next_month(start: date) -> date:
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def _set_aside_existing_table(bind) -> bool:
+    """Rename a plain audit_logs table out of the way, keeping its id sequence."""
+    if not sa.inspect(bind).has_table('audit_logs'):
+        op.execute("CREATE SEQUENCE IF NOT EXISTS audit_logs_id_seq")
+        return False
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_legacy")
+    op.execute("ALTER TABLE audit_logs_legacy RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legacy_pkey")
+    for index in sa.inspect(bind).get_indexes('audit_logs_legacy'):
+        op.execute(f"DROP INDEX {index['name']}")
+    op.execute("CREATE SEQUENCE IF NOT EXISTS audit_logs_id_seq")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    return True
+
+
+def _create_indexes() -> None:
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON audit_logs ({', '.join(columns)})")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    has_legacy = _set_aside_existing_table(bind)
+
+    op.execute(f"CREATE TABLE audit_logs ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    _create_indexes()
+
+    # Monthly partitions from the oldest existing row up to the premade months
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    start = current
+    if has_legacy:
+        oldest = bind.execute(sa.text("SELECT min(created_at) FROM audit_logs_legacy")).scalar()
+        if oldest is not None:
+            start = min(start, oldest.date().replace(day=1))
+    last = current
+    for _ in range(PREMAKE_MONTHS):
+        last = _next_month(last)
+
+    while start <= last:
+        end = _next_month(start)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{start.strftime('%Y%m')} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    if has_legacy:
+        op.execute(f"INSERT INTO audit_logs ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM audit_logs_legacy")
+        op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    for name in INDEXES:
+        op.execute(f"DROP INDEX {name}")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+
+    op.execute(f"CREATE TABLE audit_logs ({COLUMNS}, PRIMARY KEY (id))")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    _create_indexes()
+
+    op.execute(f"INSERT INTO audit_logs ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
@@ -0,0 +1,41 @@
+"""Add hourly audit rollup tables
+
+Revision ID: e0f5a6b7c8d9
+Revises: d9e4f5a6b7c8
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0f5a6b7c8d9'
+down_revision = 'd9e4f5a6b7c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('audit_rollups',
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('action', sa.String(length=100), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('success', sa.Boolean(), nullable=False),
+    sa.Column('ip_address', sa.String(length=45), nullable=False),
+    sa.Column('event_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket_start', 'action', 'severity', 'success', 'ip_address')
+    )
+    op.create_index('idx_audit_rollup_success_bucket', 'audit_rollups', ['success', 'bucket_start'], unique=False)
+    op.create_table('audit_rollup_state',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('rolled_from', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('rolled_until', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('audit_rollup_state')
+    op.drop_index('idx_audit_rollup_success_bucket', table_name='audit_rollups')
+    op.drop_table('audit_rollups')
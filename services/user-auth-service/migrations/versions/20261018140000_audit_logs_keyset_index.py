@@ -0,0 +1,33 @@
+"""Index audit_logs on (created_at, id) for keyset pagination
+
+Revision ID: f1a6b7c8d9e0
+Revises: e0f5a6b7c8d9
+Create Date: 2026-10-18 14:00:00.000000
+
+The composite index replaces the single-column created_at index, which is
+a prefix of it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6b7c8d9e0'
+down_revision = 'e0f5a6b7c8d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # audit_logs is created by the application on databases other than PostgreSQL
+    if not sa.inspect(op.get_bind()).has_table('audit_logs'):
+        return
+    op.create_index('idx_audit_created_id', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.drop_index('ix_audit_logs_created_at', table_name='audit_logs')
+
+
+def downgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table('audit_logs'):
+        return
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'], unique=False)
+    op.drop_index('idx_audit_created_id', table_name='audit_logs')
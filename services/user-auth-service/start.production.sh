@@ -62,6 +62,10 @@ export DEBUG=false
 # Start the application with production settings
 echo "🎉 Starting application server (Production Mode)..."
 
+# Prometheus metrics are aggregated over the workers through this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Use Gunicorn for production with multiple workers
 exec gunicorn app.main:app \
     --bind 0.0.0.0:8000 \
@@ -1,4 +1,5 @@
 import asyncio
+import os
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
@@ -6,7 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.core.database import Base, get_db
+# Rate limiting and request auditing run against Redis and the primary
+# database; the API tests exercise the endpoints without those stages
+os.environ.setdefault("RATE_LIMITING_ENABLED", "false")
+os.environ.setdefault("AUDIT_LOGGING_ENABLED", "false")
+
+from app.core.database import Base, get_db, get_primary_read_db, get_read_db
 from app.main import app
 
 
@@ -53,6 +59,23 @@ async def test_db_session(test_db_engine):
     yield session
 
 
+@pytest_asyncio.fixture(scope="function", autouse=True)
+async def read_session_overrides(test_db_session):
+  """
+  Serve the read-only session dependencies from the test session, so
+  tests only need to override get_db.
+  """
+  
+  async def override_get_read_db():
+    yield test_db_session
+  
+  app.dependency_overrides[get_read_db] = override_get_read_db
+  app.dependency_overrides[get_primary_read_db] = override_get_read_db
+  yield
+  app.dependency_overrides.pop(get_read_db, None)
+  app.dependency_overrides.pop(get_primary_read_db, None)
+
+
 @pytest_asyncio.fixture(scope="function")
 async def test_client(test_db_session):
   """Create a test client with database dependency override."""
@@ -2,6 +2,7 @@ import pytest
 import json
 from datetime import datetime, timedelta, timezone
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 
 from app.main import app
 from app.models.user import User
@@ -592,4 +593,78 @@ async def test_admin_endpoints_require_permission(test_db_session):
             
             assert response.status_code == 403, f"Endpoint {method} {endpoint} should require admin permission"
         
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+# Query Count Regression Tests
+
+class StatementCounter:
+    """Count SQL statements executed on the test engine."""
+    
+    def __init__(self, test_db_session):
+        self.engine = test_db_session.bind.sync_engine
+        self.count = 0
+    
+    def _count(self, *args):
+        self.count += 1
+    
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._count)
+
+
+async def _admin_get(test_db_session, access_token, path):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), 
+        base_url="http://test"
+    ) as client:
+        app.dependency_overrides[get_db] = lambda: test_db_session
+        
+        with StatementCounter(test_db_session) as counter:
+            response = await client.get(path, headers={"Authorization": f"Bearer {access_token}"})
+        
+        app.dependency_overrides.pop(get_db, None)
+    
+    assert response.status_code == 200
+    return response.json(), counter.count
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_admin_list_users_query_count_independent_of_page_size(test_db_session):
+    """Test listing users loads roles for the whole page in one query (no N+1)."""
+    admin_user = await create_admin_user(test_db_session)
+    users = [await create_regular_user(test_db_session) for _ in range(2)]
+    access_token = JWTService.create_access_token(admin_user.id, ["manage_users"])
+    
+    small_page, small_count = await _admin_get(test_db_session, access_token, "/api/admin/users?per_page=100")
+    
+    users += [await create_regular_user(test_db_session) for _ in range(10)]
+    large_page, large_count = await _admin_get(test_db_session, access_token, "/api/admin/users?per_page=100")
+    
+    assert len(small_page["users"]) == 3
+    assert len(large_page["users"]) == 13
+    assert large_count == small_count
+    # Current user lookup, total count, page of users, roles of the page
+    assert large_count <= 4
+    
+    roles_by_email = {user["email"]: user["roles"] for user in large_page["users"]}
+    for user in users:
+        assert roles_by_email[user.email] == [user.test_role_name]
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_admin_get_user_by_id_single_query(test_db_session):
+    """Test a user and their roles are fetched in a single query."""
+    admin_user = await create_admin_user(test_db_session)
+    target_user = await create_regular_user(test_db_session)
+    access_token = JWTService.create_access_token(admin_user.id, ["manage_users"])
+    
+    response_data, count = await _admin_get(test_db_session, access_token, f"/api/admin/users/{target_user.id}")
+    
+    assert response_data["roles"] == [target_user.test_role_name]
+    # Current user lookup plus the user with roles
+    assert count == 2
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.core.database import get_db
+from app.models.audit_log import AuditLog
+from app.services.jwt_service import JWTService
+from tests.test_admin_api import create_admin_user
+
+
+async def create_audit_logs(test_db_session, count=25):
+    """Create audit logs, several sharing a timestamp."""
+    base = datetime.utcnow() - timedelta(hours=1)
+    logs = [
+        AuditLog(
+            action="login_success",
+            severity="low",
+            description=f"event {i}",
+            success=True,
+            user_agent="Mozilla/5.0",
+            request_data={"email": f"user{i}@example.com"},
+            created_at=base + timedelta(seconds=i // 3)
+        )
+        for i in range(count)
+    ]
+    test_db_session.add_all(logs)
+    await test_db_session.commit()
+    return logs
+
+
+async def _admin_request(test_db_session, path, params=None):
+    admin_user = await create_admin_user(test_db_session)
+    access_token = JWTService.create_access_token(admin_user.id, ["manage_users"])
+    
+    async with AsyncClient(
+        transport=ASGITransport(app=app), 
+        base_url="http://test"
+    ) as client:
+        app.dependency_overrides[get_db] = lambda: test_db_session
+        
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await client.get(path, params=params, headers=headers)
+        
+        app.dependency_overrides.pop(get_db, None)
+    
+    return response
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_audit_logs_cursor_pagination(test_db_session):
+    """Test cursor pages cover every log once, newest first, across equal timestamps."""
+    logs = await create_audit_logs(test_db_session)
+    
+    seen = []
+    params = {"limit": 7, "action": "login_success"}
+    while True:
+        response = await _admin_request(test_db_session, "/api/audit/logs", params)
+        assert response.status_code == 200
+        data = response.json()
+        seen += [log["id"] for log in data["logs"]]
+        if not data["has_more"]:
+            assert data["next_cursor"] is None
+            break
+        params["cursor"] = data["next_cursor"]
+    
+    expected = sorted(logs, key=lambda log: (log.created_at, log.id), reverse=True)
+    assert seen == [log.id for log in expected]
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_audit_logs_invalid_cursor(test_db_session):
+    """Test a malformed cursor is rejected."""
+    response = await _admin_request(test_db_session, "/api/audit/logs", {"cursor": "not-a-cursor"})
+    
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_export_audit_logs_ndjson_skips_heavy_fields(test_db_session):
+    """Test the NDJSON export streams all rows without heavy columns by default."""
+    await create_audit_logs(test_db_session, count=12)
+    
+    response = await _admin_request(test_db_session, "/api/audit/logs/export", {"action": "login_success"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 12
+    assert "request_data" not in rows[0]
+    assert "user_agent" not in rows[0]
+    assert rows[0]["description"] == "event 11"
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_export_audit_logs_csv_projection(test_db_session):
+    """Test the CSV export selects the requested columns plus the key columns."""
+    await create_audit_logs(test_db_session, count=3)
+    
+    response = await _admin_request(
+        test_db_session, "/api/audit/logs/export",
+        {"format": "csv", "fields": "description,request_data"}
+    )
+    
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "created_at", "description", "request_data"]
+    assert len(rows) == 4
+    assert json.loads(rows[1][3]) == {"email": "user2@example.com"}
+    
+    response = await _admin_request(test_db_session, "/api/audit/logs/export", {"fields": "password"})
+    assert response.status_code == 400
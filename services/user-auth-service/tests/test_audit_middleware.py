@@ -221,11 +221,8 @@ class TestAuditMiddleware:
         
         await _log_endpoint_specific_events(mock_audit_ctx, mock_request, mock_response)
         
-        # Should log login failure
-        mock_audit_ctx.log_event.assert_called_once()
-        call_args = mock_audit_ctx.log_event.call_args
-        assert call_args[1]["action"] == AuditAction.LOGIN_FAILED
-        assert call_args[1]["success"] is False
+        # Login failure is logged by the endpoint (AccountLockoutService), not here
+        mock_audit_ctx.log_event.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_log_endpoint_specific_events_register_success(self, db_session: AsyncSession):
@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, select
+
+from app.models.audit_log import AuditLog, AuditAction
+from app.models.audit_rollup import AuditRollup
+from app.services.audit_rollups import AuditRollupJob, floor_hour
+from app.services.audit_service import AuditService
+
+
+def _event(action: AuditAction, created_at: datetime, success: bool = True, ip: str = None) -> AuditLog:
+  return AuditLog(
+    action=action.value,
+    severity="low",
+    description=action.value,
+    success=success,
+    ip_address=ip,
+    created_at=created_at
+  )
+
+
+def _events(now: datetime):
+  events = []
+  for hours_ago in (1.5, 5, 30, 100):
+    at = now - timedelta(hours=hours_ago)
+    events += [
+      _event(AuditAction.LOGIN_FAILED, at, success=False, ip="10.0.0.1"),
+      _event(AuditAction.LOGIN_FAILED, at, success=False, ip="10.0.0.2"),
+      _event(AuditAction.LOGIN_SUCCESS, at),
+    ]
+  events += [
+    _event(AuditAction.LOGIN_FAILED, now - timedelta(minutes=5), success=False, ip="10.0.0.1"),
+    _event(AuditAction.RATE_LIMIT_EXCEEDED, now - timedelta(hours=2), success=False, ip="10.0.0.3"),
+    _event(AuditAction.SUSPICIOUS_ACTIVITY, now - timedelta(hours=50)),
+  ]
+  return events
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_security_summary_matches_raw_counts_after_rollup(test_db_session, test_db_engine):
+  """Test summaries from rollups equal those computed from audit_logs alone."""
+  now = datetime.utcnow()
+  test_db_session.add_all(_events(now))
+  await test_db_session.commit()
+
+  raw = {hours: await AuditService.get_security_summary(test_db_session, hours=hours) for hours in (24, 168, 720)}
+
+  job = AuditRollupJob(engine=test_db_engine, retention_days=0)
+  computed = await job.run_once(now)
+  assert computed == int((floor_hour(now) - floor_hour(now - timedelta(hours=100))) / timedelta(hours=1))
+
+  for hours, expected in raw.items():
+    summary = await AuditService.get_security_summary(test_db_session, hours=hours)
+    for key in ("total_events", "failed_authentications", "suspicious_activities", "rate_limit_violations"):
+      assert summary[key] == expected[key]
+    assert summary["top_failing_ips"] == expected["top_failing_ips"]
+
+  week = await AuditService.get_security_summary(test_db_session, hours=168)
+  assert week["total_events"] == 15
+  assert week["failed_authentications"] == 9
+  assert week["top_failing_ips"][0] == {"ip": "10.0.0.1", "failed_attempts": 5}
+
+  # Whole hours are now read from the rollups rather than audit_logs
+  await test_db_session.execute(delete(AuditLog).where(AuditLog.created_at < now - timedelta(hours=80)))
+  await test_db_session.commit()
+  week = await AuditService.get_security_summary(test_db_session, hours=168)
+  assert week["total_events"] == 15
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_rollup_recomputes_recent_hours(test_db_session, test_db_engine):
+  """Test events committed late into recently rolled-up hours are picked up."""
+  now = datetime.utcnow()
+  test_db_session.add(_event(AuditAction.LOGIN_SUCCESS, now - timedelta(hours=3)))
+  await test_db_session.commit()
+
+  job = AuditRollupJob(engine=test_db_engine, recompute_hours=2, retention_days=0)
+  await job.run_once(now)
+
+  test_db_session.add(_event(AuditAction.LOGIN_FAILED, now - timedelta(hours=1, minutes=30), success=False))
+  await test_db_session.commit()
+  assert await job.run_once(now) == 2
+
+  result = await test_db_session.execute(select(func.sum(AuditRollup.event_count)))
+  assert result.scalar() == 2
+  assert job.get_metrics()["rolled_until"] == floor_hour(now).isoformat()
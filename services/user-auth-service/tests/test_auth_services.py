@@ -1,5 +1,7 @@
+import hashlib
 import pytest
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
 
 from app.services.password_service import PasswordService
 from app.services.jwt_service import JWTService
@@ -294,6 +296,21 @@ async def test_session_retrieval(test_db_session):
   assert retrieved_session.refresh_token == refresh_token
 
 
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_session_stores_token_digest(test_db_session):
+  """Test sessions are stored under a fixed-width digest, not the raw token."""
+  refresh_token = "digest_token_" + "x" * 200
+
+  await SessionService.create_session(test_db_session, 1, refresh_token)
+
+  result = await test_db_session.execute(text("SELECT * FROM user_sessions"))
+  row = result.mappings().one()
+  assert "refresh_token" not in row
+  assert row["token_hash"] == hashlib.sha256(refresh_token.encode()).digest()
+  assert len(row["token_hash"]) == 32
+
+
 @pytest.mark.asyncio
 @pytest.mark.unit
 async def test_session_revocation(test_db_session):
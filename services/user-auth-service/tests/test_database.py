@@ -1,7 +1,14 @@
 import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import (
+  READ_ONLY_EXECUTION_OPTIONS,
+  async_read_session_factory,
+  get_db,
+)
+from app.models.user import User
 
 
 @pytest.mark.asyncio
@@ -28,4 +35,26 @@ async def test_database_connection(test_db_session: AsyncSession):
   row = result.fetchone()
   
   assert row is not None
-  assert row[0] == 1
\ No newline at end of file
+  assert row[0] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_read_only_session_rejects_writes(test_db_engine):
+  """Test read-only sessions never autoflush and refuse to persist changes."""
+  read_only_engine = test_db_engine.execution_options(**READ_ONLY_EXECUTION_OPTIONS)
+  async with async_read_session_factory(bind=read_only_engine) as session:
+    assert session.autoflush is False
+
+    session.add(User(
+      email="readonly@example.com",
+      password_hash="hash",
+      first_name="Read",
+      last_name="Only"
+    ))
+    # No autoflush: the query does not try to write the pending user
+    result = await session.execute(select(User))
+    assert result.scalars().all() == []
+
+    with pytest.raises(InvalidRequestError):
+      await session.flush()
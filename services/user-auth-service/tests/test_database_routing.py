@@ -0,0 +1,131 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from starlette.responses import Response
+
+from app.core import database
+from app.core.database_routing import DatabaseRouter
+from app.models.audit_log import AuditAction, AuditLog
+
+
+@pytest_asyncio.fixture
+async def engines(tmp_path):
+  """Primary and two replicas as separate SQLite files."""
+  primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+  replicas = [
+    create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica_{i}.db") for i in range(2)
+  ]
+  yield primary, replicas
+  for engine in (primary, *replicas):
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_round_robin_over_replicas(engines):
+  """Test reads are spread over replicas and the primary is not used."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas)
+
+  chosen = [await router.read_engine() for _ in range(4)]
+
+  assert chosen == [replicas[0], replicas[1], replicas[0], replicas[1]]
+
+
+@pytest.mark.asyncio
+async def test_reads_use_primary_without_replicas(engines):
+  """Test the router is a no-op when no replicas are configured."""
+  primary, _ = engines
+  router = DatabaseRouter(primary, [])
+
+  assert router.pin_token() is None
+  assert await router.read_engine() is primary
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_stickiness(engines, monkeypatch):
+  """Test a client holding a pin reads from the primary until the window ends."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas, sticky_seconds=5, pin_secret="secret")
+  clock = [1000.0]
+  monkeypatch.setattr("app.core.database_routing.time.time", lambda: clock[0])
+
+  pin = router.pin_token()
+
+  assert await router.read_engine(pin) is primary
+  assert await router.read_engine() in replicas
+
+  clock[0] += 6
+  assert await router.read_engine(pin) in replicas
+
+
+@pytest.mark.asyncio
+async def test_pin_is_shared_by_workers_and_cannot_be_forged(engines):
+  """Test a pin is honoured by any router with the same secret, and only then."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas, pin_secret="secret")
+  other_worker = DatabaseRouter(primary, replicas, pin_secret="secret")
+  other_service = DatabaseRouter(primary, replicas, pin_secret="other")
+
+  pin = router.pin_token()
+  expires_ms, _, signature = pin.partition(".")
+
+  assert other_worker.is_pinned(pin)
+  assert not other_service.is_pinned(pin)
+  assert not router.is_pinned(f"{int(expires_ms) + 60000}.{signature}")
+  assert not router.is_pinned("garbage")
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_skipped(engines):
+  """Test replicas beyond the lag threshold fall back to the next candidate."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas, max_lag_seconds=5, lag_check_interval=60)
+  for state in router.replicas:
+    state.checked_at = 10 ** 9
+
+  router.replicas[0].lag = 30.0
+  router.replicas[1].lag = 1.0
+  assert await router.read_engine() is replicas[1]
+
+  router.replicas[1].lag = 30.0
+  assert await router.read_engine() is primary
+
+
+@pytest.mark.asyncio
+async def test_failed_replica_is_taken_out_of_rotation(engines):
+  """Test a replica marked as failed is not chosen until the retry delay passes."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas[:1], retry_after_seconds=30)
+
+  router.mark_failed(replicas[0])
+
+  assert await router.read_engine() is primary
+
+
+@pytest.mark.asyncio
+async def test_routed_engines_are_usable(engines):
+  """Test routed SQLite stand-ins serve queries independently."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas[:1])
+
+  async with (await router.read_engine()).connect() as conn:
+    assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+
+
+@pytest.mark.asyncio
+async def test_write_sets_pin_cookie(engines, test_db_session, monkeypatch):
+  """Test the first flush of a get_db session hands the client a pin cookie."""
+  primary, replicas = engines
+  router = DatabaseRouter(primary, replicas, pin_secret="secret")
+  monkeypatch.setattr(database, "db_router", router)
+  response = Response()
+
+  test_db_session.info["response"] = response
+  test_db_session.add(AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description="pinned"))
+  await test_db_session.flush()
+
+  cookie = response.headers["set-cookie"]
+  assert cookie.startswith(f"{database.READ_PIN_COOKIE}=")
+  assert router.is_pinned(cookie.split(";")[0].split("=", 1)[1])
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+
+from app.models.password_history import PasswordHistory
+from app.models.role import UserSession
+from app.models.service import ServiceToken
+from app.services.garbage_collector import GarbageCollector
+from app.services.password_service import PasswordPolicyConfig
+
+
+def _session(token: str, expires_in: timedelta, revoked: bool = False, age: timedelta = timedelta()) -> UserSession:
+  now = datetime.now(timezone.utc)
+  return UserSession(
+    user_id=1,
+    refresh_token=token,
+    expires_at=now + expires_in,
+    created_at=now - age,
+    is_revoked=revoked
+  )
+
+
+async def _count(db, model) -> int:
+  result = await db.execute(select(func.count()).select_from(model))
+  return result.scalar()
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_gc_deletes_in_bounded_batches(test_db_session, test_db_engine):
+  """Test the collector removes stale rows in batches and keeps live ones."""
+  now = datetime.now(timezone.utc)
+  test_db_session.add_all([_session(f"expired-{i}", timedelta(days=-1)) for i in range(25)])
+  test_db_session.add_all([
+    _session("old-revoked", timedelta(days=1), revoked=True, age=timedelta(days=60)),
+    _session("recent-revoked", timedelta(days=1), revoked=True),
+    _session("live", timedelta(days=1)),
+  ])
+  test_db_session.add_all([
+    ServiceToken(service_id=1, token_hash="expired", scopes=[], expires_at=now - timedelta(hours=1)),
+    ServiceToken(service_id=1, token_hash="valid", scopes=[], expires_at=now + timedelta(hours=1)),
+  ])
+  history_count = PasswordPolicyConfig.PASSWORD_HISTORY_COUNT + 3
+  test_db_session.add_all([
+    PasswordHistory(user_id=1, password_hash=f"hash-{i}", created_at=datetime.utcnow() - timedelta(days=i))
+    for i in range(history_count)
+  ])
+  await test_db_session.commit()
+
+  collector = GarbageCollector(engine=test_db_engine, batch_size=10, batch_pause_seconds=0)
+  deleted = await collector.run_once()
+
+  assert deleted == {
+    "expired_sessions": 25,
+    "revoked_sessions": 1,
+    "service_tokens": 1,
+    "password_history": 3,
+  }
+  assert await _count(test_db_session, UserSession) == 2
+  assert await _count(test_db_session, ServiceToken) == 1
+
+  # The newest history entries are kept
+  result = await test_db_session.execute(select(PasswordHistory.password_hash))
+  kept = set(result.scalars().all())
+  assert kept == {f"hash-{i}" for i in range(PasswordPolicyConfig.PASSWORD_HISTORY_COUNT)}
+
+  metrics = collector.get_metrics()
+  assert metrics["runs"] == 1
+  assert metrics["deleted"]["expired_sessions"] == 25
+  # 25 expired sessions in batches of 10 take three, every other task one
+  assert metrics["batches"] == 6
+  assert metrics["current_task"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_gc_worker_start_stop(test_db_engine):
+  """Test the periodic worker runs a pass on start and stops cleanly."""
+  collector = GarbageCollector(engine=test_db_engine, interval_seconds=3600, batch_pause_seconds=0)
+  collector.start()
+  assert collector.running
+  for _ in range(50):
+    if collector.metrics["runs"]:
+      break
+    await asyncio.sleep(0.01)
+  await collector.stop()
+
+  assert not collector.running
+  assert collector.metrics["runs"] == 1
@@ -0,0 +1,104 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.models.audit_log import AuditAction, AuditLog
+from app.models.role import UserSession
+from app.models.user import User
+from app.services.audit_writer import AuditWriter
+from app.services.password_service import PasswordService
+from app.core.database import get_db
+
+
+async def _create_user(db, email="pipeline@example.com", password="PipelinePass123!", failed_attempts=0):
+    user = User(
+        email=email,
+        password_hash=PasswordService.hash_password(password),
+        first_name="Pipeline",
+        last_name="User",
+        failed_login_attempts=failed_attempts
+    )
+    db.add(user)
+    await db.commit()
+    return user, password
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_login_commits_once(test_db_session, test_db_engine):
+    """Test a successful login is a single unit of work."""
+    user, password = await _create_user(test_db_session, failed_attempts=2)
+    commits = []
+
+    def count_commit(conn):
+        commits.append(conn)
+
+    event.listen(test_db_engine.sync_engine, "commit", count_commit)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        app.dependency_overrides[get_db] = lambda: test_db_session
+        response = await client.post("/api/auth/login", json={"email": user.email, "password": password})
+        app.dependency_overrides.clear()
+
+    event.remove(test_db_engine.sync_engine, "commit", count_commit)
+    assert response.status_code == 200
+    assert len(commits) == 1
+
+    # Lockout reset, session row and (without a running writer) audit rows
+    # were all committed together
+    await test_db_session.refresh(user)
+    assert user.failed_login_attempts == 0
+    sessions = await test_db_session.execute(select(UserSession).where(UserSession.user_id == user.id))
+    assert len(sessions.scalars().all()) == 1
+    actions = await test_db_session.execute(select(AuditLog.action).where(AuditLog.user_id == user.id))
+    assert set(actions.scalars().all()) == {AuditAction.LOGIN_SUCCESS.value, AuditAction.ACCOUNT_UNLOCKED.value}
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_audit_writer_batches_entries(test_db_session, test_db_engine):
+    """Test queued audit entries are written by the background writer."""
+    session_factory = sessionmaker(bind=test_db_engine, class_=AsyncSession, expire_on_commit=False)
+    writer = AuditWriter(session_factory=session_factory, batch_size=10)
+
+    entry = AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description="queued")
+    assert writer.emit(entry) is False  # Not started yet
+
+    writer.start()
+    for i in range(25):
+        assert writer.emit(AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description=f"queued {i}"))
+    await writer.stop()
+
+    result = await test_db_session.execute(select(AuditLog).where(AuditLog.description.like("queued %")))
+    assert len(result.scalars().all()) == 25
+    assert not writer.running
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_audit_writer_retries_and_drops_only_failing_entries(test_db_session, test_db_engine):
+    """Test a failing batch is retried, then written row by row."""
+    from app.services.audit_writer import AUDIT_ENTRIES_DROPPED
+
+    session_factory = sessionmaker(bind=test_db_engine, class_=AsyncSession, expire_on_commit=False)
+    writer = AuditWriter(session_factory=session_factory, max_retries=1, retry_backoff=0)
+    dropped_before = AUDIT_ENTRIES_DROPPED._value.get()
+
+    # The entry without a description violates NOT NULL and fails the batch
+    invalid = AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description="retried invalid")
+    invalid.description = None
+    batch = [
+        AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description="retried 1"),
+        invalid,
+        AuditLog.create_log(action=AuditAction.LOGIN_SUCCESS, description="retried 2"),
+    ]
+    await writer._write(batch)
+
+    result = await test_db_session.execute(
+        select(AuditLog.description).where(AuditLog.description.like("retried %"))
+    )
+    assert sorted(result.scalars().all()) == ["retried 1", "retried 2"]
+    assert AUDIT_ENTRIES_DROPPED._value.get() == dropped_before + 1
@@ -0,0 +1,60 @@
+import pytest
+from fakeredis import aioredis as fake_aioredis
+from prometheus_client import REGISTRY
+
+from app.core.metrics import instrument_engine, instrument_redis
+
+
+def sample(name, **labels):
+  return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_recorded_per_route_template(test_client, test_db_engine):
+  instrument_engine(test_db_engine)
+  labels = {"method": "GET", "route": "/api/admin/users/{user_id}"}
+  requests_before = sample("http_request_duration_seconds_count", **labels)
+  unauthorized_before = sample("http_requests_total", status="4xx", **labels)
+  unmatched_before = sample("http_request_duration_seconds_count", method="GET", route="<unmatched>")
+
+  await test_client.get("/api/admin/users/1")
+  await test_client.get("/api/admin/users/2")
+  await test_client.get("/no/such/path")
+
+  assert sample("http_request_duration_seconds_count", **labels) == requests_before + 2
+  assert sample("http_requests_total", status="4xx", **labels) == unauthorized_before + 2
+  assert sample("http_request_duration_seconds_count", method="GET", route="<unmatched>") == unmatched_before + 1
+
+  response = await test_client.get("/metrics")
+  assert response.status_code == 200
+  assert 'http_request_duration_seconds_count{method="GET",route="/api/admin/users/{user_id}"}' in response.text
+
+
+@pytest.mark.asyncio
+async def test_database_queries_are_counted_per_request(test_client, test_db_engine):
+  instrument_engine(test_db_engine)
+  labels = {"method": "POST", "route": "/api/auth/login"}
+  queries_before = sample("http_request_db_queries_sum", **labels)
+  selects_before = sample("db_query_duration_seconds_count", operation="select")
+
+  response = await test_client.post("/api/auth/login", json={"email": "nobody@example.com", "password": "Whatever123!"})
+
+  assert response.status_code == 401
+  assert sample("http_request_db_queries_sum", **labels) > queries_before
+  assert sample("db_query_duration_seconds_count", operation="select") > selects_before
+
+
+@pytest.mark.asyncio
+async def test_redis_commands_are_timed():
+  client = instrument_redis(fake_aioredis.FakeRedis(decode_responses=True))
+  sets_before = sample("redis_command_duration_seconds_count", command="SET")
+  pipelines_before = sample("redis_command_duration_seconds_count", command="PIPELINE")
+
+  await client.set("key", "value")
+  async with client.pipeline() as pipe:
+    pipe.get("key")
+    pipe.incr("counter")
+    assert await pipe.execute() == ["value", 1]
+
+  assert sample("redis_command_duration_seconds_count", command="SET") == sets_before + 1
+  assert sample("redis_command_duration_seconds_count", command="PIPELINE") == pipelines_before + 1
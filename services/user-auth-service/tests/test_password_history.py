@@ -0,0 +1,86 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.metrics import RequestStats, _request_stats
+from app.models.password_history import PasswordHistory
+from app.services.password_service import BCRYPT_POOL_TASKS, PasswordPolicyConfig, PasswordService
+
+
+@pytest.fixture
+def fast_bcrypt(monkeypatch):
+  monkeypatch.setattr(PasswordService, "SALT_ROUNDS", 4)
+
+
+@pytest.mark.asyncio
+async def test_history_is_compared_off_the_event_loop(test_db_session, fast_bcrypt, monkeypatch):
+  test_db_session.add_all([
+    PasswordHistory(
+      user_id=1,
+      password_hash=PasswordService.hash_password(f"OldPassword{i}!"),
+      created_at=datetime.utcnow() - timedelta(days=i)
+    )
+    for i in range(PasswordPolicyConfig.PASSWORD_HISTORY_COUNT)
+  ])
+  await test_db_session.commit()
+
+  threads = set()
+  verify_password = PasswordService.verify_password.__func__
+
+  def recording_verify(cls, password, password_hash):
+    threads.add(threading.current_thread().name)
+    return verify_password(cls, password, password_hash)
+
+  monkeypatch.setattr(PasswordService, "verify_password", classmethod(recording_verify))
+
+  assert await PasswordService.check_password_history(test_db_session, 1, "OldPassword3!") is False
+  assert await PasswordService.check_password_history(test_db_session, 1, "NewPassword1!") is True
+  assert threads and all(name.startswith("bcrypt") for name in threads)
+  # Comparisons cancelled after the first match left the queue too
+  assert BCRYPT_POOL_TASKS.labels("queued")._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_comparisons_are_timed_and_counted(fast_bcrypt):
+  password_hash = PasswordService.hash_password("OldPassword1!")
+  stats = RequestStats()
+  stats.timings = {}
+  token = _request_stats.set(stats)
+  try:
+    results = await asyncio.gather(*(
+      PasswordService.verify_password_async("OldPassword1!", password_hash) for _ in range(8)
+    ))
+  finally:
+    _request_stats.reset(token)
+
+  assert all(results)
+  # Every comparison's duration reached the request, none lost to races
+  assert stats.timings["bcrypt"] > 0
+  for state in ("queued", "running"):
+    assert BCRYPT_POOL_TASKS.labels(state)._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_history_keeps_the_newest_entries(test_db_session):
+  history_count = PasswordPolicyConfig.PASSWORD_HISTORY_COUNT
+  test_db_session.add_all([
+    PasswordHistory(user_id=user_id, password_hash=f"hash-{user_id}-{i}", created_at=datetime.utcnow() - timedelta(days=i + 1))
+    for user_id in (1, 2)
+    for i in range(history_count + 2)
+  ])
+  await test_db_session.commit()
+
+  await PasswordService.add_to_password_history(test_db_session, 1, "hash-new")
+
+  result = await test_db_session.execute(
+    select(PasswordHistory.password_hash).where(PasswordHistory.user_id == 1)
+  )
+  assert set(result.scalars().all()) == {"hash-new"} | {f"hash-1-{i}" for i in range(history_count - 1)}
+  # Other users' history is untouched
+  result = await test_db_session.execute(
+    select(PasswordHistory.id).where(PasswordHistory.user_id == 2)
+  )
+  assert len(result.scalars().all()) == history_count + 2
@@ -7,7 +7,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.main import app
-from app.services.password_service import PasswordService, PasswordPolicyConfig
+from app.services.password_service import PasswordService, PasswordPolicyConfig, _policy
 from app.models.password_history import PasswordHistory
 from tests.conftest import create_test_user, get_test_token
 
@@ -133,16 +133,11 @@ class TestPasswordPolicyService:
         assert len(result["violations"]) == 0
         assert len(result["feedback"]) == 0
     
-    def test_password_entropy_calculation(self):
-        """Test password entropy calculation."""
-        # Simple password
-        entropy1 = PasswordService._estimate_entropy("password")
-        
-        # Complex password
-        entropy2 = PasswordService._estimate_entropy("MyC0mpl3x!P@ssw0rd")
-        
-        assert entropy2 > entropy1
-        assert entropy2 > 50  # Should have good entropy
+    def test_password_sequence_detection(self):
+        """Test ascending and descending character runs are detected."""
+        assert _policy.first_sequence("xkabcq") == "abc"
+        assert _policy.first_sequence("x9876") == "987"
+        assert _policy.first_sequence("acegik") is None
     
     def test_password_complexity_scoring(self):
         """Test password complexity scoring system."""
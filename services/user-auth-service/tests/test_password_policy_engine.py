@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from app.services import password_service
+from app.services.password_policy import (
+  BloomFilter,
+  BreachedPasswordIndex,
+  CompiledPasswordPolicy,
+  build_breached_index,
+  combine_patterns,
+)
+from app.services.password_service import PasswordPolicyConfig, PasswordService
+
+
+def test_combined_patterns_keep_their_backreferences():
+  pattern = combine_patterns([r"(x)y", r"(.)\1{3,}", r"(ab)\1"])
+
+  assert pattern.search("zzzz")
+  assert pattern.search("abab")
+  assert not pattern.search("xzab")
+
+
+def test_single_pass_reports_every_rule():
+  policy = CompiledPasswordPolicy(PasswordPolicyConfig)
+  context = {"email": "john.doe@example.com", "first_name": "John"}
+
+  result = policy.evaluate("johnaaa321qwer", context)
+
+  assert result["violations"] == [
+    "missing_uppercase", "missing_special", "repeated_chars",
+    "sequential_patterns", "forbidden_patterns", "personal_info",
+  ]
+  assert "Password contains too many repeated characters (a repeated 3 times)" in result["feedback"]
+  assert "Password contains sequential characters: 321" in result["feedback"]
+  assert policy.evaluate("MyStr0ng!P@ssw0rd")["is_valid"] is True
+
+
+def test_breached_passwords_are_rejected_as_common(tmp_path):
+  wordlist = tmp_path / "breached.txt"
+  wordlist.write_text("Tr0ub4dor&3\n\ncorrecthorsebatterystaple\n")
+  policy = CompiledPasswordPolicy(PasswordPolicyConfig, BloomFilter.from_file(str(wordlist)))
+
+  assert len(policy.breached) == 2
+  assert "common_password" in policy.evaluate("TR0UB4DOR&3")["violations"]
+  assert "common_password" not in policy.evaluate("MyStr0ng!P@ssw0rd")["violations"]
+
+
+def test_breached_password_index(tmp_path, monkeypatch):
+  wordlist = tmp_path / "breached.txt"
+  passwords = [f"leaked{i}" for i in range(500)]
+  wordlist.write_text("\n".join(passwords + ["LEAKED7", "", "Tr0ub4dor&3"]) + "\n")
+  index_path = str(tmp_path / "breached.idx")
+
+  # Several sorted runs, merged without the duplicate
+  assert build_breached_index(str(wordlist), index_path, chunk_size=64) == 501
+
+  monkeypatch.setattr(password_service._policy, "breached", None)
+  assert PasswordService.load_breached_passwords(index_path) == 501
+  index = password_service._policy.breached
+  assert isinstance(index, BreachedPasswordIndex)
+  assert all(password in index for password in passwords)
+  assert "leaked500" not in index
+  assert "common_password" in PasswordService.validate_password_policy("TR0UB4DOR&3")["violations"]
+  index.close()
+
+
+def test_strength_check_and_feedback_share_one_evaluation():
+  with patch.object(password_service._policy, "evaluate", wraps=password_service._policy.evaluate) as evaluate:
+    assert PasswordService.is_password_strong("weakpass") is False
+    feedback = PasswordService.generate_password_strength_feedback("weakpass")
+    feedback.append("amended by the caller")
+
+    assert evaluate.call_count == 1
+    assert "amended by the caller" not in PasswordService.generate_password_strength_feedback("weakpass")
+    PasswordService.validate_password_policy("weakpass", {"first_name": "Weak"})
+    assert evaluate.call_count == 2
+
+
+def test_reused_evaluation_does_not_keep_the_password():
+  PasswordService.validate_password_policy("Sup3r$ecretValue!", {"email": "jane@example.com"})
+
+  key, _ = password_service._last_evaluation.get()
+  assert b"Sup3r$ecretValue!" not in key
+  assert "Sup3r$ecretValue!" not in repr(password_service._last_evaluation.get())
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+
+from app.models.role import Role, UserRole
+from app.models.user import User
+from app.services import permission_cache as permission_cache_module
+from app.services.permission_cache import MemoryPermissionCache, RedisPermissionCache
+
+
+async def _create_user_with_role(db, permissions=None):
+  user = User(
+    email="cache@example.com",
+    password_hash="hashed_password",
+    first_name="Cache",
+    last_name="User"
+  )
+  role = Role(name="cache-role", permissions=permissions or ["read"])
+  db.add_all([user, role])
+  await db.commit()
+  db.add(UserRole(user_id=user.id, role_id=role.id))
+  await db.commit()
+  return user, role
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_memory_cache_hits_until_invalidated(test_db_session):
+  """Test resolved permissions are cached until the user's version changes."""
+  user, _ = await _create_user_with_role(test_db_session, ["read", "write"])
+  cache = MemoryPermissionCache()
+
+  assert await cache.get_permissions(test_db_session, user.id) == ["read", "write"]
+  assert await cache.get_permissions(test_db_session, user.id) == ["read", "write"]
+  assert (cache.hits, cache.misses) == (1, 1)
+
+  await cache.invalidate_user(user.id)
+  await cache.get_permissions(test_db_session, user.id)
+  assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_committed_role_changes_invalidate_cache(test_db_session, monkeypatch):
+  """Test role assignments and role permission edits invalidate on commit."""
+  cache = MemoryPermissionCache()
+  monkeypatch.setattr(permission_cache_module, "permission_cache", cache)
+  user, role = await _create_user_with_role(test_db_session, ["read"])
+  await asyncio.sleep(0)
+
+  assert await user.get_permissions(test_db_session) == ["read"]
+
+  # New role assignment
+  admin_role = Role(name="cache-admin", permissions=["manage_users"])
+  test_db_session.add(admin_role)
+  await test_db_session.commit()
+  test_db_session.add(UserRole(user_id=user.id, role_id=admin_role.id))
+  await test_db_session.commit()
+  await asyncio.sleep(0)
+  assert await user.get_permissions(test_db_session) == ["manage_users", "read"]
+
+  # Role permissions edited
+  role.add_permission("write")
+  await test_db_session.commit()
+  await asyncio.sleep(0)
+  assert await user.get_permissions(test_db_session) == ["manage_users", "read", "write"]
+
+  # Resolution in between was served from the cache
+  assert await user.get_permissions(test_db_session) == ["manage_users", "read", "write"]
+  assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_redis_cache_shared_between_workers(test_db_session):
+  """Test entries and invalidations are shared through Redis."""
+  fakeredis = pytest.importorskip("fakeredis")
+  client = fakeredis.FakeAsyncRedis(decode_responses=True)
+  worker_a = RedisPermissionCache(client)
+  worker_b = RedisPermissionCache(client)
+  user, _ = await _create_user_with_role(test_db_session, ["read"])
+
+  assert await worker_a.get_permissions(test_db_session, user.id) == ["read"]
+  assert await worker_b.get_permissions(test_db_session, user.id) == ["read"]
+  assert worker_b.hits == 1
+
+  await worker_a.invalidate_roles()
+  await worker_b.get_permissions(test_db_session, user.id)
+  assert worker_b.misses == 1
+  assert 0 < await client.ttl("perm:user:%d" % user.id) <= worker_a.ttl_seconds
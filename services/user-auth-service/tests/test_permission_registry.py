@@ -0,0 +1,138 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.permission_bit import PermissionBit
+from app.models.role import Role
+from app.schemas.auth import CurrentUser
+from app.services.jwt_service import JWTService
+from app.services.permission_registry import (
+  PermissionRegistry,
+  decode_mask,
+  encode_mask,
+  permission_registry,
+)
+
+
+@pytest_asyncio.fixture
+async def registry(test_db_session):
+  """Global registry bound to a fresh test database."""
+  permission_registry.clear()
+  await permission_registry.register(
+    test_db_session, ["read", "write", "manage_users", "manage_roles"]
+  )
+  yield permission_registry
+  permission_registry.clear()
+
+
+@pytest.mark.unit
+def test_mask_encoding_round_trip():
+  """Test compact mask encoding is reversible."""
+  for mask in (0, 1, 0b1011, 1 << 70 | 5):
+    assert decode_mask(encode_mask(mask)) == mask
+
+
+@pytest.mark.asyncio
+async def test_register_assigns_stable_bits(test_db_session, registry):
+  """Test bits are persisted and kept when new codes are registered."""
+  read_bit = registry.bit_for("read")
+  await registry.register(test_db_session, ["write", "audit_read"])
+
+  assert registry.bit_for("read") == read_bit
+  assert registry.bit_for("audit_read") == 4
+
+  result = await test_db_session.execute(select(PermissionBit.code).order_by(PermissionBit.bit_index))
+  assert result.scalars().all() == ["manage_roles", "manage_users", "read", "write", "audit_read"]
+
+  other = PermissionRegistry()
+  await other.load(test_db_session)
+  assert other.bit_for("audit_read") == 4
+
+
+@pytest.mark.asyncio
+async def test_permission_set_checks(registry):
+  """Test all-of / any-of checks including unregistered codes."""
+  permission_set = registry.build(["read", "manage_users", "legacy_code"])
+
+  assert "read" in permission_set
+  assert "write" not in permission_set
+  assert "legacy_code" in permission_set
+  assert permission_set.has_all(["read", "manage_users"])
+  assert not permission_set.has_all(["read", "write"])
+  assert permission_set.has_any(["write", "legacy_code"])
+  assert not permission_set.has_any(["write", "manage_roles"])
+  assert permission_set.missing(["write", "read", "other"]) == ["write", "other"]
+  assert sorted(permission_set.to_list()) == ["legacy_code", "manage_users", "read"]
+  assert permission_set.encode() is None
+
+  combined = permission_set | registry.build(["write"])
+  assert combined.has_all(["read", "write", "legacy_code"])
+
+
+@pytest.mark.unit
+def test_mask_cache_is_bounded():
+  """Test memoized masks are capped, evicting the least recently used."""
+  registry = PermissionRegistry(max_cached_masks=2)
+  registry.mask_for(("read",))
+  registry.mask_for(("write",))
+  registry.mask_for(("read",))
+  registry.mask_for(("user", "specific"))
+
+  assert list(registry._mask_cache) == [("read",), ("user", "specific")]
+
+
+@pytest.mark.asyncio
+async def test_current_user_permission_helpers(registry):
+  """Test CurrentUser checks go through the permission bitset."""
+  user = CurrentUser(user_id=1, email="user@example.com", permissions=["read", "manage_users"])
+
+  assert user.has_permission("manage_users")
+  assert not user.has_permission("manage_roles")
+  assert user.has_all_permissions(["read", "manage_users"])
+  assert user.has_any_permission(["manage_roles", "read"])
+
+
+@pytest.mark.asyncio
+async def test_compact_access_token(registry, monkeypatch):
+  """Test tokens carry a bitmask when compact encoding is enabled."""
+  monkeypatch.setattr(settings, "compact_permission_tokens", True)
+
+  token = JWTService.create_access_token(7, ["read", "manage_roles"])
+  payload = JWTService.verify_access_token(token)
+
+  assert "pbits" in payload
+  assert sorted(payload["permissions"]) == ["manage_roles", "read"]
+  assert "permissions_incomplete" not in payload
+
+  # Unregistered codes fall back to the plain permission list
+  token = JWTService.create_access_token(7, ["read", "unregistered"])
+  payload = JWTService.verify_access_token(token)
+  assert "pbits" not in payload
+  assert payload["permissions"] == ["read", "unregistered"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_reloads_unknown_bits(test_db_session, registry, monkeypatch):
+  """Test a worker that missed a registration reloads bits on demand."""
+  monkeypatch.setattr(settings, "compact_permission_tokens", True)
+  await registry.register(test_db_session, ["export_data"])
+  token = JWTService.create_access_token(3, ["export_data"])
+
+  registry.clear()
+  payload = JWTService.verify_access_token(token)
+  assert payload["permissions_incomplete"] is True
+
+  permission_set = await registry.resolve_token_permissions(test_db_session, payload)
+  assert permission_set.to_list() == ["export_data"]
+
+
+@pytest.mark.asyncio
+async def test_sync_from_roles(test_db_session, registry):
+  """Test role permissions are registered at startup."""
+  test_db_session.add(Role(name="auditor", permissions=["read", "view_audit_logs"]))
+  await test_db_session.commit()
+
+  await registry.sync_from_roles(test_db_session)
+
+  assert registry.bit_for("view_audit_logs") is not None
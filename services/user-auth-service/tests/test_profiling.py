@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import (
+  ProfilingMiddleware,
+  StackSampler,
+  create_profile_token,
+  verify_profile_token,
+)
+from app.services.password_service import PasswordService
+
+SECRET = "profiling-secret"
+
+
+def blocking_handler_work():
+  time.sleep(0.05)
+
+
+def create_profiled_app(sample_rate=0.0, sampler=None) -> FastAPI:
+  test_app = FastAPI()
+  password_hash = PasswordService.hash_password("Secret123!")
+
+  @test_app.post("/login")
+  async def login():
+    return {"valid": PasswordService.verify_password("Secret123!", password_hash)}
+
+  @test_app.get("/slow")
+  async def slow():
+    blocking_handler_work()
+    return {}
+
+  test_app.add_middleware(ProfilingMiddleware, secret=SECRET, sample_rate=sample_rate, sampler=sampler)
+  test_app.add_middleware(MetricsMiddleware)
+  return test_app
+
+
+def test_profile_tokens():
+  token = create_profile_token(SECRET, 60)
+
+  assert verify_profile_token(SECRET, token)
+  assert not verify_profile_token("other-secret", token)
+  assert not verify_profile_token(SECRET, token + "0")
+  assert not verify_profile_token(SECRET, create_profile_token(SECRET, -1))
+  assert not verify_profile_token(SECRET, "garbage")
+
+
+@pytest.mark.asyncio
+async def test_profiled_request_gets_server_timing_breakdown():
+  test_app = create_profiled_app()
+
+  async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
+    profiled = await client.post("/login", headers={"X-Profile-Token": create_profile_token(SECRET, 60)})
+    forged = await client.post("/login", headers={"X-Profile-Token": create_profile_token("guess", 60)})
+
+  timings = {}
+  for entry in profiled.headers["server-timing"].split(", "):
+    name, duration = entry.split(";")[:2]
+    timings[name] = float(duration.removeprefix("dur="))
+  assert list(timings) == ["db", "redis", "http", "bcrypt", "serialize", "app", "total"]
+  assert timings["bcrypt"] > 0
+  assert timings["serialize"] > 0
+  assert timings["total"] >= timings["bcrypt"]
+  assert "server-timing" not in forged.headers
+
+
+@pytest.mark.asyncio
+async def test_sampled_requests_are_folded_into_stacks():
+  sampler = StackSampler(interval=0.001)
+  test_app = create_profiled_app(sample_rate=1.0, sampler=sampler)
+
+  try:
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
+      await client.get("/slow")
+    folded = sampler.folded(reset=True)
+  finally:
+    sampler.stop()
+
+  stack, count = folded.splitlines()[0].rsplit(" ", 1)
+  assert int(count) > 0
+  assert stack.endswith("test_profiling:blocking_handler_work")
+  assert sampler.folded() == ""
@@ -0,0 +1,59 @@
+import pytest
+
+from app.middleware.audit_middleware import _is_security_endpoint
+from app.middleware.rate_limiting import get_endpoint_limits
+from app.middleware.route_policy import RoutePolicyRegistry, compile_patterns
+
+
+def test_default_policies():
+    assert get_endpoint_limits("/api/auth/login", "POST") == (5, 60)
+    assert get_endpoint_limits("/api/auth/register", "POST") == (3, 60)
+    assert get_endpoint_limits("/api/auth/change-password", "POST") == (3, 300)
+    assert get_endpoint_limits("/api/admin/users/1", "GET") == (200, 60)
+    assert get_endpoint_limits("/api/services/token", "POST") == (50, 60)
+    assert get_endpoint_limits("/health", "GET") == (60, 60)
+    # Exact rules do not apply to longer paths
+    assert get_endpoint_limits("/health/db", "GET") == (100, 60)
+    assert get_endpoint_limits("/api/profile/me", "GET") == (100, 60)
+
+    assert _is_security_endpoint("/api/validate/user-token") is True
+    assert _is_security_endpoint("/api/public/info") is False
+
+
+def test_rules_inherit_from_shorter_prefixes():
+    registry = RoutePolicyRegistry()
+
+    login = registry.lookup("/api/auth/login")
+    assert login.audit_class == "auth"
+    assert login.sensitive is True
+
+    me = registry.lookup("/api/auth/me")
+    assert (me.limit, me.audit_class, me.sensitive) == (100, "auth", False)
+
+    token = registry.lookup("/api/services/token")
+    assert (token.limit, token.audit_class, token.sensitive) == (50, "service", True)
+
+
+def test_settings_overrides_merge_over_defaults():
+    registry = RoutePolicyRegistry(overrides={
+        "/api/auth/login": {"limit": 10},
+        "/api/reports/": {"audit_class": "reports", "sensitive": True},
+        "/health": {"exact": True, "limit": 120},
+    })
+
+    login = registry.lookup("/api/auth/login")
+    assert (login.limit, login.window, login.sensitive) == (10, 60, True)
+    assert registry.lookup("/api/reports/daily").audit_class == "reports"
+    assert registry.lookup("/health").limit == 120
+
+    with pytest.raises(ValueError):
+        RoutePolicyRegistry(overrides={"/api/": {"limits": 1}})
+
+
+def test_compiled_patterns():
+    pattern = compile_patterns(["select ", "../"])
+
+    assert pattern.search("/api/users?q=SELECT * from users")
+    assert pattern.search("/static/../etc/passwd")
+    assert not pattern.search("/api/auth/selection")
+    assert compile_patterns([]) is None
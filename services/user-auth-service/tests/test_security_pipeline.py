@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from httpx import AsyncClient, ASGITransport
+
+from app.main import app
+from app.models.audit_log import AuditAction
+from app.services.jwt_service import JWTService
+from app.middleware.rate_limiting import SecurityRateLimiter, get_rate_limit_key, should_skip_rate_limiting
+from app.middleware.security_headers import SecurityHeaders
+from app.middleware.security_pipeline import (
+    AuditStage,
+    ContentSecurityStage,
+    RateLimitStage,
+    RequestIdStage,
+    SecurityHeadersStage,
+    SecurityMonitoringStage,
+    SecurityPipelineMiddleware,
+    classify_path,
+)
+
+
+def create_pipeline_app(stages) -> FastAPI:
+    test_app = FastAPI()
+
+    @test_app.get("/api/echo")
+    async def echo(request: Request):
+        return {"request_id": request.state.request_id}
+
+    @test_app.get("/api/custom")
+    async def custom():
+        return JSONResponse({}, headers={"Cache-Control": "public, max-age=60", "X-Custom": "1"})
+
+    @test_app.post("/api/items")
+    async def create_item():
+        return {"created": True}
+
+    test_app.add_middleware(SecurityPipelineMiddleware, stages=stages)
+    return test_app
+
+
+def test_classify_path():
+    assert classify_path("/api/auth/login") == "api"
+    assert classify_path("/docs") == "docs"
+    assert classify_path("/openapi.json") == "docs"
+    assert classify_path("/health") == "other"
+
+
+@pytest.mark.asyncio
+async def test_app_responses_carry_security_headers():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="https://test") as client:
+        health = await client.get("/health")
+        docs = await client.get("/openapi.json")
+
+    assert health.headers["x-content-type-options"] == "nosniff"
+    assert health.headers["x-frame-options"] == "DENY"
+    assert health.headers["content-security-policy"] == SecurityHeaders.CSP_POLICY
+    assert "x-request-id" in health.headers
+    # API-only headers stay off other paths
+    assert "api-version" not in health.headers
+
+    assert "cdn.jsdelivr.net" in docs.headers["content-security-policy"]
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_exposed_to_handlers_and_echoed():
+    pipeline_app = create_pipeline_app([RequestIdStage(), SecurityHeadersStage(debug=True)])
+
+    async with AsyncClient(transport=ASGITransport(app=pipeline_app), base_url="http://test") as client:
+        first = await client.get("/api/echo")
+        second = await client.get("/api/echo")
+
+    assert first.json()["request_id"] == first.headers["x-request-id"]
+    assert first.headers["x-request-id"] != second.headers["x-request-id"]
+    assert first.headers["api-version"] == "1.0"
+    # HTTPS-only headers are left out over plain HTTP in debug mode
+    assert "strict-transport-security" not in first.headers
+
+
+@pytest.mark.asyncio
+async def test_security_headers_replace_application_values():
+    pipeline_app = create_pipeline_app([SecurityHeadersStage(debug=True)])
+
+    async with AsyncClient(transport=ASGITransport(app=pipeline_app), base_url="http://test") as client:
+        response = await client.get("/api/custom")
+
+    assert response.headers.get_list("cache-control") == ["no-store, no-cache, must-revalidate, private"]
+    assert response.headers["x-custom"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_content_security_stage_rejects_unsupported_media_type():
+    pipeline_app = create_pipeline_app([RequestIdStage(), ContentSecurityStage(), SecurityHeadersStage()])
+
+    async with AsyncClient(transport=ASGITransport(app=pipeline_app), base_url="http://test") as client:
+        rejected = await client.post("/api/items", content=b"<x/>", headers={"Content-Type": "application/xml"})
+        accepted = await client.post("/api/items", json={})
+
+    assert rejected.status_code == 415
+    assert rejected.json()["detail"] == "Unsupported media type"
+    assert "x-request-id" in rejected.headers
+    # Later stages never saw the request
+    assert "x-content-type-options" not in rejected.headers
+    assert accepted.status_code == 200
+    assert accepted.headers["x-content-type-options"] == "nosniff"
+
+
+@pytest.mark.asyncio
+async def test_content_security_stage_rejects_malformed_content_length():
+    pipeline_app = create_pipeline_app([ContentSecurityStage()])
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await pipeline_app({
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/items",
+        "raw_path": b"/api/items",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", b"12abc")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }, receive, send)
+
+    assert messages[0]["status"] == 400
+    assert messages[1]["body"] == ContentSecurityStage.INVALID_LENGTH_BODY
+
+
+@pytest.mark.asyncio
+async def test_security_monitoring_stage_logs_suspicious_requests(caplog):
+    stage = SecurityMonitoringStage()
+    scope = {"method": "GET", "path": "/api/users", "headers": [(b"user-agent", b"sqlmap/1.7")]}
+
+    with caplog.at_level("WARNING", logger="app.middleware.security_pipeline"):
+        await stage.on_request(scope, {})
+
+    assert "suspicious_user_agent" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_stage_rejects_over_the_route_limit():
+    pipeline_app = create_pipeline_app([RequestIdStage(), RateLimitStage(SecurityRateLimiter())])
+
+    async with AsyncClient(transport=ASGITransport(app=pipeline_app), base_url="http://test") as client:
+        responses = [await client.get("/api/echo") for _ in range(101)]
+
+    assert responses[0].status_code == 200
+    assert responses[0].headers["x-ratelimit-limit"] == "100"
+    assert responses[0].headers["x-ratelimit-remaining"] == "100"
+    assert responses[-1].status_code == 429
+    assert responses[-1].json()["error"] == "too_many_requests"
+    assert responses[-1].headers["retry-after"] == "60"
+    assert "x-request-id" in responses[-1].headers
+
+
+@pytest.mark.asyncio
+async def test_audit_stage_logs_outcomes_and_rejections():
+    pipeline_app = create_pipeline_app([
+        RequestIdStage(), AuditStage(), RateLimitStage(SecurityRateLimiter())
+    ])
+
+    @pipeline_app.get("/api/admin/users")
+    async def admin_users(request: Request):
+        assert request.state.audit_context.request.url.path == "/api/admin/users"
+        return JSONResponse({"detail": "Not authenticated"}, status_code=401)
+
+    with patch("app.middleware.audit_middleware.AuditService.log_action", new_callable=AsyncMock) as log_action:
+        async with AsyncClient(transport=ASGITransport(app=pipeline_app), base_url="http://test") as client:
+            await client.get("/api/admin/users")
+            for _ in range(100):
+                await client.get("/api/echo")
+
+    actions = [call.kwargs["action"] for call in log_action.call_args_list]
+    assert actions == [
+        AuditAction.ADMIN_ACTION,  # sensitive endpoint accessed
+        AuditAction.UNAUTHORIZED_ACCESS,
+        AuditAction.RATE_LIMIT_EXCEEDED,
+    ]
+    assert log_action.call_args_list[1].kwargs["request"].state.request_id
+    # Written by the background audit writer, not on the request path
+    assert all(call.kwargs["defer"] for call in log_action.call_args_list)
+
+
+def _request(path="/api/auth/me", client="172.18.0.5", headers=()):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+        "client": (client, 40000),
+    })
+
+
+def test_rate_limit_key_uses_principal_and_trusted_forwarded_for():
+    user_token = JWTService.create_access_token(user_id=7, permissions=[])
+
+    assert get_rate_limit_key(_request(headers=[("Authorization", f"Bearer {user_token}")])) == "user:7"
+    # Behind the gateway: the nearest untrusted hop
+    assert get_rate_limit_key(_request(headers=[("X-Forwarded-For", "203.0.113.9, 10.0.0.3")])) == "ip:203.0.113.9"
+    # Forwarded-For from an untrusted peer is ignored
+    assert get_rate_limit_key(_request(client="198.51.100.1", headers=[("X-Forwarded-For", "203.0.113.9")])) == "ip:198.51.100.1"
+
+
+def test_service_token_validation_is_not_rate_limited():
+    service_token = JWTService.create_service_token(
+        {"service_id": 3, "service_name": "partners", "scopes": ["token:validate"], "type": "service_token"},
+        datetime.now(timezone.utc) + timedelta(minutes=5)
+    )
+    headers = [("Authorization", f"Bearer {service_token}")]
+
+    assert should_skip_rate_limiting(_request("/api/validate/user-token", headers=headers))
+    assert not should_skip_rate_limiting(_request("/api/validate/user-token"))
+    assert not should_skip_rate_limiting(_request("/api/auth/me", headers=headers))
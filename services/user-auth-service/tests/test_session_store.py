@@ -0,0 +1,150 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models.role import UserSession
+from app.models.user import User
+from app.services.password_service import PasswordService
+from app.services.session_store import SESSION_WRITES_DROPPED, RedisSessionStore, SessionWriteBehind
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _new_session(user_id: int, refresh_token: str, days: int = 7) -> UserSession:
+  return UserSession(
+    user_id=user_id,
+    refresh_token=refresh_token,
+    expires_at=datetime.now(timezone.utc) + timedelta(days=days),
+    ip_address="127.0.0.1"
+  )
+
+
+async def _create_user(db) -> User:
+  user = User(
+    email="store@example.com",
+    password_hash=PasswordService.hash_password("StorePass123!"),
+    first_name="Store",
+    last_name="User"
+  )
+  db.add(user)
+  await db.commit()
+  return user
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_redis_store_create_lookup_revoke(test_db_session):
+  """Test sessions round-trip through Redis with a native TTL."""
+  client = fakeredis.FakeAsyncRedis(decode_responses=True)
+  store = RedisSessionStore(client)
+
+  await store.create(test_db_session, _new_session(1, "token-a", days=1))
+
+  session = await store.get(test_db_session, "token-a")
+  assert session is not None
+  assert session.user_id == 1
+  assert session.is_valid
+
+  key = f"session:{RedisSessionStore.token_digest('token-a')}"
+  assert 0 < await client.ttl(key) <= 86400
+
+  assert await store.revoke(test_db_session, "token-a") is True
+  assert await store.get(test_db_session, "token-a") is None
+  assert await store.revoke(test_db_session, "token-a") is False
+
+  # Nothing was written to the database without write-behind configured
+  rows = await test_db_session.execute(select(UserSession))
+  assert rows.scalars().all() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_redis_store_revoke_all_and_list(test_db_session):
+  """Test revoke-all and listing use the per-user set."""
+  client = fakeredis.FakeAsyncRedis(decode_responses=True)
+  store = RedisSessionStore(client)
+
+  for token in ("t1", "t2", "t3"):
+    await store.create(test_db_session, _new_session(7, token))
+  await store.create(test_db_session, _new_session(8, "other"))
+  await store.revoke(test_db_session, "t1")
+
+  # Stale set members are pruned while listing
+  assert len(await store.list_active(test_db_session, 7)) == 2
+  assert await client.scard("session:user:7") == 2
+
+  assert await store.revoke_all(test_db_session, 7) == 2
+  assert await store.get(test_db_session, "t2") is None
+  assert await store.list_active(test_db_session, 7) == []
+  assert await store.get(test_db_session, "other") is not None
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_redis_store_write_behind(test_db_session, test_db_engine):
+  """Test session changes are replayed to user_sessions in the background."""
+  user = await _create_user(test_db_session)
+  session_factory = sessionmaker(bind=test_db_engine, class_=AsyncSession, expire_on_commit=False)
+  persistence = SessionWriteBehind(session_factory=session_factory)
+  store = RedisSessionStore(fakeredis.FakeAsyncRedis(decode_responses=True), persistence=persistence)
+
+  await store.start()
+  await store.create(test_db_session, _new_session(user.id, "wb-1"))
+  await store.create(test_db_session, _new_session(user.id, "wb-2"))
+  await store.revoke(test_db_session, "wb-1")
+  await store.touch(test_db_session, "wb-2", "10.0.0.2")
+  await persistence.stop()
+
+  # The request session was never written to
+  assert not test_db_session.new
+
+  result = await test_db_session.execute(select(UserSession))
+  rows = {row.token_hash: row for row in result.scalars().all()}
+  assert len(rows) == 2
+  assert rows[UserSession.hash_token("wb-1")].is_revoked is True
+  assert rows[UserSession.hash_token("wb-2")].is_revoked is False
+  assert rows[UserSession.hash_token("wb-2")].ip_address == "10.0.0.2"
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_write_behind_drops_only_failing_changes(test_db_session, test_db_engine):
+  """Test a failed batch is retried, then applied one change at a time."""
+  user = await _create_user(test_db_session)
+  session_factory = sessionmaker(bind=test_db_engine, class_=AsyncSession, expire_on_commit=False)
+  persistence = SessionWriteBehind(session_factory=session_factory, max_retries=1, retry_backoff=0)
+  dropped_before = SESSION_WRITES_DROPPED._value.get()
+
+  # Without a user the insert violates NOT NULL and fails the batch
+  orphan = _new_session(user.id, "wb-orphan")
+  orphan.user_id = None
+  await persistence._write([
+    ("create", _new_session(user.id, "wb-kept")),
+    ("create", orphan),
+    ("revoke", "wb-kept"),
+  ])
+
+  result = await test_db_session.execute(select(UserSession))
+  rows = result.scalars().all()
+  assert [row.token_hash for row in rows] == [UserSession.hash_token("wb-kept")]
+  assert rows[0].is_revoked is True
+  assert SESSION_WRITES_DROPPED._value.get() == dropped_before + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_write_behind_falls_back_to_request_session(test_db_session):
+  """Test changes go through the caller's session when the worker is not running."""
+  user = await _create_user(test_db_session)
+  store = RedisSessionStore(fakeredis.FakeAsyncRedis(decode_responses=True), persistence=SessionWriteBehind())
+
+  await store.create(test_db_session, _new_session(user.id, "fallback"))
+  await store.revoke_all(test_db_session, user.id)
+  await test_db_session.commit()
+
+  result = await test_db_session.execute(select(UserSession))
+  rows = result.scalars().all()
+  assert len(rows) == 1
+  assert rows[0].is_revoked is True
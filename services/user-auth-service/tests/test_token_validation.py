@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import json
 from datetime import datetime, timedelta, timezone
@@ -10,6 +11,9 @@ from app.services.service_auth import ServiceAuthService
 from app.services.password_service import PasswordService
 from app.services.jwt_service import JWTService
 from app.core.database import get_db
+from app.routers.token_validation import MAX_BATCH_SIZE
+from app.utils.service_discovery import BatchCoalescer
+from sqlalchemy import event
 
 
 async def create_test_service_with_validation_scope(test_db_session):
@@ -506,4 +510,148 @@ async def test_validation_endpoints_require_validate_scope(test_db_session):
             # Should fail because service doesn't have validate:tokens scope
             assert response.status_code == 403, f"Endpoint {method} {endpoint} should require validate:tokens scope"
         
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+
+# Batch Endpoint Tests
+
+async def _service_post(test_db_session, path, data, count_statements=False):
+    """POST to a validation endpoint as a service with validate:tokens scope."""
+    service, service_secret = await create_test_service_with_validation_scope(test_db_session)
+    service_obj, service_token, scopes = await ServiceAuthService.authenticate_service(
+        test_db_session, service.service_name, service_secret, ["validate:tokens"]
+    )
+    engine = test_db_session.bind.sync_engine
+    statements = []
+    
+    def _count(*args):
+        statements.append(args[2])
+    
+    async with AsyncClient(
+        transport=ASGITransport(app=app), 
+        base_url="http://test"
+    ) as client:
+        app.dependency_overrides[get_db] = lambda: test_db_session
+        
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            headers = {"Authorization": f"Bearer {service_token}"}
+            response = await client.post(path, json=data, headers=headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        
+        app.dependency_overrides.pop(get_db, None)
+    
+    if count_statements:
+        return response, len(statements)
+    return response
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_validate_user_tokens_batch(test_db_session):
+    """Test batch token validation returns a result per input token."""
+    reader = await create_test_user_with_permissions(test_db_session, ["read"])
+    writer = await create_test_user_with_permissions(test_db_session, ["read", "write"])
+    reader_token = JWTService.create_access_token(reader.id, ["read"])
+    writer_token = JWTService.create_access_token(writer.id, ["read", "write"])
+    unknown_token = JWTService.create_access_token(999999, ["read", "write"])
+    
+    response = await _service_post(test_db_session, "/api/validate/user-token/batch", {
+        "tokens": [reader_token, writer_token, unknown_token, "invalid.token.here"],
+        "required_permissions": ["write"]
+    })
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 4
+    
+    assert results[writer_token]["valid"] is True
+    assert results[writer_token]["user_id"] == writer.id
+    assert results[writer_token]["email"] == writer.email
+    assert results[reader_token]["valid"] is False
+    assert "write" in results[reader_token]["error"]
+    assert results[unknown_token]["error"] == "User not found"
+    assert results["invalid.token.here"]["error"] == "Invalid or expired user token"
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_get_user_info_batch_query_count_independent_of_size(test_db_session):
+    """Test batch user info resolves users, permissions and roles with fixed queries."""
+    users = [await create_test_user_with_permissions(test_db_session, ["read"]) for _ in range(2)]
+    small, small_count = await _service_post(test_db_session, "/api/validate/user-info/batch", {
+        "user_ids": [user.id for user in users],
+        "include_roles": True
+    }, count_statements=True)
+    
+    users += [await create_test_user_with_permissions(test_db_session, ["write"]) for _ in range(6)]
+    large, large_count = await _service_post(test_db_session, "/api/validate/user-info/batch", {
+        "user_ids": [user.id for user in users] + [999999],
+        "include_roles": True
+    }, count_statements=True)
+    
+    assert small.status_code == 200
+    assert large.status_code == 200
+    assert large_count == small_count
+    
+    infos = large.json()["users"]
+    assert infos["999999"] is None
+    for user in users:
+        info = infos[str(user.id)]
+        assert info["email"] == user.email
+        assert len(info["roles"]) == 1
+    assert infos[str(users[0].id)]["permissions"] == ["read"]
+    assert infos[str(users[-1].id)]["permissions"] == ["write"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_get_user_permissions_batch(test_db_session):
+    """Test batch permissions reports unknown and inactive users as errors."""
+    active = await create_test_user_with_permissions(test_db_session, ["read", "write"])
+    inactive = await create_test_user_with_permissions(test_db_session, ["read"])
+    inactive.is_active = False
+    await test_db_session.commit()
+    
+    response = await _service_post(test_db_session, "/api/validate/permissions/batch", {
+        "user_ids": [active.id, inactive.id, 999999]
+    })
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["permissions"] == {str(active.id): ["read", "write"]}
+    assert data["errors"] == {str(inactive.id): "User is inactive", "999999": "User not found"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.integration
+async def test_batch_endpoints_limit_batch_size(test_db_session):
+    """Test batch requests above the size limit are rejected."""
+    response = await _service_post(test_db_session, "/api/validate/user-info/batch", {
+        "user_ids": list(range(1, MAX_BATCH_SIZE + 2))
+    })
+    
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_batch_coalescer_merges_concurrent_lookups():
+    """Test concurrent single lookups are resolved by one batch call."""
+    calls = []
+    
+    async def batch_fn(keys):
+        calls.append(sorted(keys))
+        return {key: key * 10 for key in keys if key != 3}
+    
+    coalescer = BatchCoalescer(batch_fn, window=0.01, max_batch_size=10)
+    results = await asyncio.gather(*(coalescer.load(key) for key in [1, 2, 2, 3]))
+    
+    assert results == [10, 20, 20, None]
+    assert calls == [[1, 2, 3]]
+    
+    # A full batch is dispatched without waiting for the window
+    coalescer = BatchCoalescer(batch_fn, window=60, max_batch_size=2)
+    results = await asyncio.wait_for(asyncio.gather(coalescer.load(4), coalescer.load(5)), timeout=1)
+    assert results == [40, 50]
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis as fake_aioredis
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from sqlalchemy import text
+
+from app.core.tracing import (
+  TracingMiddleware,
+  configure_tracing,
+  shutdown_tracing,
+  trace_engine,
+  trace_http_client,
+  trace_redis,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest_asyncio.fixture
+async def exporter():
+  exporter = InMemorySpanExporter()
+  configure_tracing("user-auth-service", exporter, sample_rate=1.0)
+  yield exporter
+  shutdown_tracing()
+
+
+def create_traced_app(engine, outgoing_headers) -> FastAPI:
+  test_app = FastAPI()
+  redis_client = trace_redis(fake_aioredis.FakeRedis(decode_responses=True))
+
+  def echo_headers(request):
+    outgoing_headers.append(request.headers)
+    return httpx.Response(200)
+
+  http_client = trace_http_client(httpx.AsyncClient(transport=httpx.MockTransport(echo_headers)))
+
+  @test_app.get("/api/items/{item_id}")
+  async def get_item(item_id: int):
+    async with engine.connect() as connection:
+      await connection.execute(text("SELECT 1"))
+    await redis_client.set("item", item_id)
+    await http_client.get("http://company-partner-service/api/v1/companies")
+    return {}
+
+  test_app.add_middleware(TracingMiddleware)
+  return test_app
+
+
+@pytest.mark.asyncio
+async def test_trace_continues_across_services(exporter, test_db_engine):
+  trace_engine(test_db_engine)
+  outgoing_headers = []
+  test_app = create_traced_app(test_db_engine, outgoing_headers)
+
+  async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
+    response = await client.get("/api/items/7", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+  assert response.status_code == 200
+  shutdown_tracing()
+
+  spans = {span.name: span for span in exporter.get_finished_spans()}
+  server = spans["GET /api/items/{item_id}"]
+  assert format(server.context.trace_id, "032x") == TRACE_ID
+  assert server.parent.span_id == 0x00f067aa0ba902b7
+  for name in ("SELECT", "redis SET", "GET company-partner-service"):
+    assert spans[name].context.trace_id == server.context.trace_id
+    assert spans[name].parent.span_id == server.context.span_id
+
+  outgoing = spans["GET company-partner-service"]
+  assert outgoing_headers[0]["traceparent"] == f"00-{TRACE_ID}-{outgoing.context.span_id:016x}-01"
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traces_only_propagate(exporter, test_db_engine):
+  trace_engine(test_db_engine)
+  outgoing_headers = []
+  test_app = create_traced_app(test_db_engine, outgoing_headers)
+
+  async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as client:
+    await client.get("/api/items/7", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"})
+  shutdown_tracing()
+
+  assert exporter.get_finished_spans() == ()
+  # Same trace, still not sampled
+  version, trace_id, span_id, flags = outgoing_headers[0]["traceparent"].split("-")
+  assert (trace_id, flags) == (TRACE_ID, "00")